@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark the trigram contact index against the old LIKE lookup
+Runs on a synthetic 100k-contact table and on the shipped contacts.csv
+"""
+
+import csv
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from engine.contact_index import ContactIndex
+
+FIRST_NAMES = ["aahan", "mitali", "rahul", "priya", "arjun", "sneha", "vikram", "ananya",
+               "rohan", "kavya", "manish", "mahesh", "mayank", "meera", "dhruv", "ishaan"]
+LAST_NAMES = ["sharma", "verma", "soni", "gupta", "patel", "reddy", "iyer", "khan",
+              "singh", "mehta", "joshi", "nair", "das", "kapoor", "malhotra", "bose"]
+QUERIES = ["ma", "mitali", "mitaly", "aahan sharma", "rahul", "dhruv soni", "priya pate", "zzz"]
+
+
+def create_table(conn, contacts):
+    cursor = conn.cursor()
+    cursor.execute('''CREATE TABLE contacts(id integer primary key, name VARCHAR(200),
+                      mobile_no VARCHAR(255), email VARCHAR(255) NULL)''')
+    cursor.executemany('INSERT INTO contacts (name, mobile_no) VALUES (?, ?)', contacts)
+    conn.commit()
+
+
+def synthetic_contacts(count, seed=1):
+    rng = random.Random(seed)
+    contacts = []
+    for i in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if i % 3 == 0:
+            name += f" {rng.randint(1, 999)}"
+        contacts.append((name, f"9{rng.randint(100000000, 999999999)}"))
+    return contacts
+
+
+def csv_contacts(path='contacts.csv'):
+    contacts = []
+    with open(path, 'r', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile):
+            name = " ".join(row.get(col, "") for col in ("First Name", "Middle Name", "Last Name")).strip()
+            mobile = row.get("Phone 1 - Value", "").strip()
+            if name and mobile:
+                contacts.append((name, mobile))
+    return contacts
+
+
+def like_lookup(cursor, query):
+    cursor.execute("SELECT mobile_no FROM contacts WHERE LOWER(name) LIKE ? OR LOWER(name) LIKE ?",
+                   ('%' + query + '%', query + '%'))
+    return cursor.fetchall()
+
+
+def time_ms(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def run(label, contacts, queries, repeats):
+    print(f"\n=== {label}: {len(contacts)} contacts ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, 'bench.db'))
+        create_table(conn, contacts)
+        cursor = conn.cursor()
+
+        index = ContactIndex()
+        start = time.perf_counter()
+        index.build(conn)
+        print(f"Index build: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        print(f"{'query':<16}{'LIKE ms':>10}{'index ms':>10}  LIKE first row -> index top match")
+        for query in queries:
+            like_ms = time_ms(lambda: like_lookup(cursor, query), repeats)
+            index_ms = time_ms(lambda: index.search(query), repeats)
+            rows = like_lookup(cursor, query)
+            first = rows[0][0] if rows else "-"
+            top = index.search(query)
+            best = f"{top[0].name} ({top[0].mobile_no})" if top else "-"
+            print(f"{query:<16}{like_ms:>10.3f}{index_ms:>10.3f}  {first} -> {best}")
+
+        cursor.execute("INSERT INTO contacts (name, mobile_no) VALUES ('mitali new', '9000000000')")
+        conn.commit()
+        start = time.perf_counter()
+        applied = index.refresh(conn)
+        print(f"Incremental refresh of {applied} change: {(time.perf_counter() - start) * 1000:.3f} ms")
+        conn.close()
+
+
+def main():
+    run("Synthetic table", synthetic_contacts(100_000), QUERIES, repeats=5)
+    if os.path.exists('contacts.csv'):
+        contacts = csv_contacts()
+        sample = [name.split()[0].lower() for name, _ in contacts[:5] if name.split()]
+        run("contacts.csv", contacts, QUERIES + sample, repeats=200)
+    else:
+        print("\ncontacts.csv not found, skipping shipped-data benchmark")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Measure the CPU cost of the hotword capture loop per second of audio
+Feeds a 16 kHz mono 16-bit WAV through the old struct.unpack_from loop and the
+FrameRing loop, with a detector that converts frames the way pvporcupine does.
+
+Usage: python bench_hotword.py [audio.wav]
+(without a file, 60 s of synthetic noise is used)
+"""
+
+import ctypes
+import random
+import struct
+import sys
+import time
+import wave
+
+from engine.audio_frames import FrameRing, VIEW_MEMORYVIEW, VIEW_NUMPY, VIEW_STRUCT, np
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 512
+
+
+class FakeDetector:
+    """Stands in for porcupine.process: length check plus the ctypes copy it makes"""
+
+    def __init__(self, frame_length):
+        self.frame_length = frame_length
+        self.frame_type = ctypes.c_short * frame_length
+
+    def process(self, pcm):
+        if len(pcm) != self.frame_length:
+            raise ValueError("bad frame length")
+        self.frame_type(*pcm)
+        return -1
+
+
+class WavStream:
+    """PyAudio-like stream that replays raw PCM frame by frame"""
+
+    def __init__(self, pcm, frame_length):
+        self.pcm = pcm
+        self.frame_bytes = frame_length * 2
+        self.offset = 0
+
+    def read(self, num_frames, exception_on_overflow=True):
+        if self.offset + self.frame_bytes > len(self.pcm):
+            self.offset = 0
+        chunk = self.pcm[self.offset:self.offset + self.frame_bytes]
+        self.offset += self.frame_bytes
+        return chunk
+
+
+def load_pcm(path):
+    with wave.open(path, 'rb') as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            sys.exit("expected a mono 16-bit WAV")
+        return wav.readframes(wav.getnframes()), wav.getframerate()
+
+
+def synthetic_pcm(seconds=60):
+    rng = random.Random(3)
+    samples = [rng.randint(-2000, 2000) for _ in range(SAMPLE_RATE * seconds)]
+    return struct.pack(f"<{len(samples)}h", *samples), SAMPLE_RATE
+
+
+def old_loop(stream, detector, frames):
+    for _ in range(frames):
+        keyword = stream.read(FRAME_LENGTH)
+        keyword = struct.unpack_from("h" * FRAME_LENGTH, keyword)
+        detector.process(keyword)
+
+
+def ring_loop(view):
+    def loop(stream, detector, frames):
+        ring = FrameRing(FRAME_LENGTH, view=view)
+        for _ in range(frames):
+            keyword = ring.read_frame(stream)
+            if keyword is None:
+                continue
+            detector.process(keyword)
+    return loop
+
+
+def decode_only(loop_name, stream, frames):
+    """CPU spent turning bytes into a frame, without the detector"""
+    if loop_name == "old":
+        for _ in range(frames):
+            struct.unpack_from("h" * FRAME_LENGTH, stream.read(FRAME_LENGTH))
+    else:
+        ring = FrameRing(FRAME_LENGTH, view=loop_name)
+        for _ in range(frames):
+            ring.read_frame(stream)
+
+
+def cpu_seconds(fn, *args):
+    start = time.process_time()
+    fn(*args)
+    return time.process_time() - start
+
+
+def main():
+    pcm, rate = load_pcm(sys.argv[1]) if len(sys.argv) > 1 else synthetic_pcm()
+    frames = len(pcm) // (FRAME_LENGTH * 2)
+    audio_seconds = frames * FRAME_LENGTH / rate
+    detector = FakeDetector(FRAME_LENGTH)
+
+    loops = [("old", old_loop), (VIEW_STRUCT, ring_loop(VIEW_STRUCT)), (VIEW_MEMORYVIEW, ring_loop(VIEW_MEMORYVIEW))]
+    if np is not None:
+        loops.append((VIEW_NUMPY, ring_loop(VIEW_NUMPY)))
+
+    print(f"=== Hotword loop benchmark ({audio_seconds:.0f} s of audio, {frames} frames) ===")
+    print("Frame decode only (ms CPU per second of audio):")
+    for name, _ in loops:
+        seconds = cpu_seconds(decode_only, name, WavStream(pcm, FRAME_LENGTH), frames)
+        print(f"  {name:11s} {seconds / audio_seconds * 1000:7.3f}")
+
+    print("Decode + detector handoff (ms CPU per second of audio):")
+    for name, loop in loops:
+        seconds = cpu_seconds(loop, WavStream(pcm, FRAME_LENGTH), detector, frames)
+        print(f"  {name:11s} {seconds / audio_seconds * 1000:7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bulk contact importer in engine/contact_import.py
+Generates a 100k-row Google-contacts CSV and reports rows/sec for a fresh
+import, an unchanged-file startup check and an incremental re-sync
+
+Usage: python bench_import.py [rows]
+"""
+
+import csv
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+
+from engine.contact_import import import_contacts
+
+HEADER = ["First Name", "Middle Name", "Last Name", "Phonetic First Name", "Phonetic Middle Name",
+          "Phonetic Last Name", "Name Prefix", "Name Suffix", "Nickname", "File As",
+          "Organization Name", "Organization Title", "Organization Department", "Birthday", "Notes",
+          "Photo", "Labels", "Phone 1 - Label", "Phone 1 - Value", "Phone 2 - Label",
+          "Phone 2 - Value", "Website 1 - Label", "Website 1 - Value"]
+FIRST_NAMES = ["Aahan", "Mitali", "Rahul", "Priya", "Arjun", "Sneha", "Vikram", "Ananya", "Dhruv"]
+LAST_NAMES = ["Sharma", "Verma", "Soni", "Gupta", "Patel", "Reddy", "Iyer", "Khan", "Singh"]
+
+
+def write_csv(path, rows, seed=3, renamed=0):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(HEADER)
+        for i in range(rows):
+            record = [""] * len(HEADER)
+            record[0] = rng.choice(FIRST_NAMES) + (" Jr" if i < renamed else "")
+            record[2] = f"{rng.choice(LAST_NAMES)} {i}"
+            record[16] = "* myContacts"
+            record[17] = "Mobile"
+            record[18] = f"+91{9000000000 + i}"
+            writer.writerow(record)
+
+
+def report(label, result):
+    if result["skipped"]:
+        print(f"{label:<28} skipped in {result['seconds'] * 1000:.2f} ms")
+    else:
+        print(f"{label:<28} {result['rows']} rows ({result['added']} new) in {result['seconds']:.2f} s"
+              f" = {result['rows_per_sec']:,.0f} rows/sec")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'contacts.csv')
+        conn = sqlite3.connect(os.path.join(tmp, 'bench.db'))
+
+        print(f"=== Importing a {rows}-row generated CSV ===")
+        write_csv(csv_path, rows)
+        report("Fresh import", import_contacts(conn, csv_path))
+        report("Unchanged file at startup", import_contacts(conn, csv_path))
+
+        os.utime(csv_path)
+        report("Touched, same content", import_contacts(conn, csv_path))
+
+        write_csv(csv_path, rows, renamed=rows // 100)
+        report("1% of rows renamed", import_contacts(conn, csv_path))
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM contacts")
+        print(f"\nContacts in table: {cursor.fetchone()[0]} (no duplicates from re-imports)")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Measure how many re-ask round trips the phonetic fallback saves
+Replays voice-misheard contact names through the findContact tiers with and
+without the phonetic index, using the shipped contacts.csv
+
+Usage: python bench_phonetic.py [misheard.csv]
+(misheard.csv has "heard,intended" rows; a recorded sample is built in)
+"""
+
+import csv
+import os
+import sqlite3
+import sys
+import tempfile
+
+from engine.contact_index import MIN_CONFIDENT_SCORE, MIN_MATCH_SCORE, ContactIndex
+from engine.phonetic import ensure_phonetic_column, phonetic_key, phonetic_lookup
+
+# recognize_google (en-in) transcripts next to the contact that was meant
+MISHEARD = [
+    ("meetali", "~Mitali"),
+    ("mitaly", "~Mitali"),
+    ("aan", "Aahan  Mr Senior"),
+    ("ahan", "Aahan  Mr Senior"),
+    ("abishek", "Abhishek  MR"),
+    ("akshatt", "Akshat"),
+    ("aishwarya", "Aishvarya Mukund Friend"),
+    ("aayushman", "Ayshman  Bhai"),
+    ("chandeshwar", "Chandeshvar  Sir"),
+    ("devansee", "Devanshi❤️"),
+    ("deeksha", "Diksha  Lohia MR"),
+    ("harshith", "Harshit  2"),
+    ("kanishkaa", "Kanishka"),
+    ("mehek", "Mehak  Singh MR"),
+    ("nameeth", "Nameet Driver"),
+    ("neetee", "Neeti"),
+    ("shrabonti", "Shrabanti"),
+    ("khwahish", "Khwaish 2"),
+    ("rishabh", "Rishab  Cult"),
+    ("ritwik", "Ritvik"),
+    ("shripoorna", "Sripurna"),
+    ("tammana", "Tamanna"),
+    ("sandya", "Sandhya  Didi"),
+    ("sudiksha", "Sudeeksha"),
+    ("swasti", "Swasthi Verma MR"),
+    ("vishakha", "Vishakhaaa"),
+    ("yuvaraj", "Yuvraj  Cult"),
+    ("tushaar", "Tushar"),
+    ("kashis", "Kashish sehgal❤  MR"),
+]
+
+
+def load_contacts(conn, path='contacts.csv'):
+    cursor = conn.cursor()
+    cursor.execute('''CREATE TABLE contacts(id integer primary key, name VARCHAR(200),
+                      mobile_no VARCHAR(255), email VARCHAR(255) NULL, phonetic_key VARCHAR(200))''')
+    ensure_phonetic_column(conn)
+    with open(path, 'r', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile):
+            name = " ".join(row.get(col, "") for col in ("First Name", "Middle Name", "Last Name")).strip()
+            mobile = row.get("Phone 1 - Value", "").strip()
+            if name and mobile:
+                cursor.execute('INSERT INTO contacts (name, mobile_no, phonetic_key) VALUES (?, ?, ?)',
+                               (name, mobile, phonetic_key(name)))
+    conn.commit()
+
+
+def lookup(index, cursor, heard, use_phonetic):
+    """The findContact tiers: confident fuzzy, then phonetic, then weak fuzzy"""
+    results = index.search(heard, k=5)
+    if results and results[0].score >= MIN_CONFIDENT_SCORE:
+        return results[0].name
+    if use_phonetic:
+        phonetic_results = phonetic_lookup(cursor, heard)
+        if phonetic_results:
+            return phonetic_results[0][0]
+    return results[0].name if results and results[0].score >= MIN_MATCH_SCORE else None
+
+
+def load_misheard(path):
+    with open(path, 'r', encoding='utf-8') as csvfile:
+        return [(row[0].strip(), row[1].strip()) for row in csv.reader(csvfile) if len(row) >= 2]
+
+
+def main():
+    misheard = load_misheard(sys.argv[1]) if len(sys.argv) > 1 else MISHEARD
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, 'bench.db'))
+        load_contacts(conn)
+        cursor = conn.cursor()
+        index = ContactIndex()
+        index.build(conn)
+
+        print(f"=== {len(misheard)} misheard names against {len(index)} contacts ===")
+        print(f"{'heard':<16}{'without phonetic':<28}{'with phonetic':<28}")
+        reasks = {False: 0, True: 0}
+        for heard, intended in misheard:
+            found = {}
+            for use_phonetic in (False, True):
+                found[use_phonetic] = lookup(index, cursor, heard, use_phonetic)
+                if found[use_phonetic] != intended:
+                    reasks[use_phonetic] += 1
+            marks = ["✓" if found[p] == intended else "✗" for p in (False, True)]
+            print(f"{heard:<16}{marks[0]} {str(found[False])[:25]:<26}{marks[1]} {str(found[True])[:25]:<26}")
+        conn.close()
+
+    print(f"\nRe-ask round trips without phonetic fallback: {reasks[False]}")
+    print(f"Re-ask round trips with phonetic fallback:    {reasks[True]}")
+    print(f"Round trips saved: {reasks[False] - reasks[True]} of {len(misheard)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,760 @@
+#!/usr/bin/env python3
+"""
+Replay benchmark for the whole command pipeline
+Drives allCommand() headlessly: text queries go in as typed messages, voice
+turns are replayed frame by frame through the real listener, VAD and STT
+router. eel, pyttsx3, pyautogui, pywhatkit, webbrowser and the weather/news
+APIs are replaced by local fakes with configurable latency, so the numbers
+measure JARVIS's own glue. Reports throughput, per-stage latency percentiles
+(from engine.tracing spans) and allocations per turn, and compares them with
+a saved baseline.
+
+Usage: python bench_pipeline.py [--corpus DIR] [--queries FILE] [--repeat N]
+       [--stt-latency S] [--tts-latency S] [--http-latency S] [--realtime]
+       [--save-baseline FILE] [--baseline FILE] [--tolerance 0.25]
+(corpus DIR holds 16 kHz mono 16-bit WAVs and transcripts.csv with
+"file,transcript" rows; queries FILE has one text query per line, with the
+answers to follow-up questions after " | ", e.g.
+"send message to mitali | whatsapp | running late")
+Exits with status 1 when a stage regressed against the baseline. Baselines
+only mean something on the machine that recorded them, and tail latencies of
+millisecond stages are noisy on small machines: rerun before trusting one hit.
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_RATE = 16000
+CHUNK = 512
+NOISE_RMS = 150
+# trailing silence after each clip, so the VAD ends a phrase before the next clip starts
+CLIP_PAD_SECONDS = 1.0
+
+DEFAULT_QUERIES = [
+    "open youtube",
+    "open notepad",
+    "open spotify",
+    "play lofi beats on youtube",
+    "weather delhi",
+    "weather in mumbai",
+    "news",
+    "brief me",
+    "send message to mitali | whatsapp | running ten minutes late",
+    "phone call akshat | whatsapp",
+    "video call aahan | whatsapp",
+    "api status",
+    "what is the meaning of life",
+]
+# the subset replayed as audio, exercising listen/VAD/STT as well as dispatch
+DEFAULT_VOICE_QUERIES = [
+    "open youtube",
+    "weather delhi",
+    "send message to mitali | whatsapp | running ten minutes late",
+    "play lofi beats on youtube",
+]
+
+SYS_COMMANDS = [("notepad", "C:\\Windows\\notepad.exe"), ("calculator", "C:\\Windows\\System32\\calc.exe")]
+WEB_COMMANDS = [("youtube", "https://www.youtube.com"), ("google", "https://www.google.com"),
+                ("spotify", "https://open.spotify.com")]
+
+# a stage regressed when it got this much slower relatively AND absolutely
+MIN_REGRESSION_MS = 2.0
+MIN_REGRESSION_KIB = 16.0
+# with fewer spans than this p95 is just the slowest one, so only p50 is compared
+MIN_SPANS_FOR_P95 = 20
+# tails of millisecond stages jitter with thread scheduling, so p95 gets this much more slack
+P95_SLACK = 2.0
+
+
+# ---------------------------------------------------------------- fakes
+
+class FakeEel(types.ModuleType):
+    """eel without a browser: exposed functions stay plain, JS calls are counted"""
+
+    def __init__(self):
+        super().__init__("eel")
+        self.calls = {}
+
+    def expose(self, fn=None, *args):
+        if callable(fn):
+            return fn
+        return lambda f: f
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def start(self, *args, **kwargs):
+        pass
+
+    def spawn(self, fn, *args, **kwargs):
+        thread = threading.Thread(target=fn, args=args, kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        def js_call(*args):
+            self.calls[name] = self.calls.get(name, 0) + 1
+            # eel returns a function that takes an optional callback
+            return lambda callback=None: None
+        return js_call
+
+
+class FakeTTSEngine:
+    """pyttsx3 engine that 'speaks' after first_audio seconds at chars_per_second"""
+
+    def __init__(self, first_audio, chars_per_second):
+        self.first_audio = first_audio
+        self.chars_per_second = chars_per_second
+        self.properties = {'voices': [types.SimpleNamespace(id='bench-voice', name='Bench')], 'rate': 180}
+        self.callbacks = {}
+        self.pending = []
+        self.spoken = 0
+
+    def getProperty(self, name):
+        return self.properties.get(name)
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def connect(self, topic, callback):
+        self.callbacks.setdefault(topic, []).append(callback)
+
+    def say(self, text, name=None):
+        self.pending.append(text)
+
+    def save_to_file(self, text, path, name=None):
+        with open(path, 'wb') as f:
+            f.write(b'RIFF')
+
+    def runAndWait(self):
+        pending, self.pending = self.pending, []
+        for text in pending:
+            time.sleep(self.first_audio)
+            for callback in self.callbacks.get('started-utterance', []):
+                callback(None)
+            if self.chars_per_second:
+                time.sleep(len(text) / self.chars_per_second)
+            self.spoken += 1
+
+
+class ActionLog:
+    """Collects what the fakes were asked to do (open URLs, key presses, ...)"""
+
+    def __init__(self):
+        self.actions = []
+        self._lock = threading.Lock()
+
+    def __call__(self, kind, *args, **kwargs):
+        with self._lock:
+            self.actions.append((kind,) + args)
+        return True
+
+    def count(self, kind):
+        return sum(1 for action in self.actions if action[0] == kind)
+
+
+def install_fakes(args, log):
+    """Put the fakes in sys.modules before any engine module is imported"""
+    eel = FakeEel()
+    sys.modules['eel'] = eel
+
+    tts_engine = FakeTTSEngine(args.tts_latency, args.tts_cps)
+    sys.modules['pyttsx3'] = types.SimpleNamespace(init=lambda driver=None, debug=False: tts_engine)
+
+    sys.modules['pyautogui'] = types.SimpleNamespace(
+        size=lambda: (1920, 1080), click=lambda *a, **k: log('click', *a),
+        press=lambda key, *a, **k: log('press', key), hotkey=lambda *keys, **k: log('hotkey', *keys),
+        keyDown=lambda key: log('keyDown', key), keyUp=lambda key: log('keyUp', key))
+    sys.modules['pywhatkit'] = types.SimpleNamespace(playonyt=lambda term, *a, **k: log('playonyt', term))
+    sys.modules['webbrowser'] = types.SimpleNamespace(open=lambda url, *a, **k: log('browser', url))
+    sys.modules['playsound'] = types.SimpleNamespace(playsound=lambda path, *a, **k: log('sound', path))
+    sys.modules['speech_recognition'] = fake_speech_recognition()
+    return eel, tts_engine
+
+
+def fake_speech_recognition():
+    sr = types.ModuleType('speech_recognition')
+
+    class WaitTimeoutError(Exception):
+        pass
+
+    class RequestError(Exception):
+        pass
+
+    class UnknownValueError(Exception):
+        pass
+
+    class AudioSource:
+        pass
+
+    class AudioData:
+        def __init__(self, frame_data, sample_rate, sample_width):
+            self.frame_data = frame_data
+            self.sample_rate = sample_rate
+            self.sample_width = sample_width
+
+    class Recognizer:
+        def __init__(self):
+            self.energy_threshold = NOISE_RMS * 2
+            self.dynamic_energy_threshold = True
+            self.dynamic_energy_ratio = 1.5
+            self.pause_threshold = 0.8
+
+        def adjust_for_ambient_noise(self, source, duration=1):
+            for _ in range(max(1, int(duration * source.SAMPLE_RATE / source.CHUNK))):
+                source.stream.read(source.CHUNK)
+
+    class Microphone(AudioSource):
+        def __init__(self, device_index=None):
+            raise OSError("no microphone in the benchmark")
+
+    for cls in (WaitTimeoutError, RequestError, UnknownValueError, AudioSource, AudioData, Recognizer, Microphone):
+        setattr(sr, cls.__name__, cls)
+    return sr
+
+
+class ScaledJobs:
+    """engine.jobs stand-in whose sleep() is scaled, for UI settle waits in features"""
+
+    def __init__(self, scheduler, scale):
+        self.scheduler = scheduler
+        self.scale = scale
+
+    def sleep(self, seconds):
+        if self.scale:
+            self.scheduler.sleep(seconds * self.scale)
+        else:
+            self.scheduler.checkpoint()
+
+    def __getattr__(self, name):
+        return getattr(self.scheduler, name)
+
+
+class SandboxOS:
+    """os stand-in that logs startfile/system instead of launching programs"""
+
+    def __init__(self, log):
+        self.log = log
+
+    def startfile(self, path, *args):
+        self.log('startfile', path)
+
+    def system(self, command):
+        self.log('system', command)
+        return 0
+
+    def __getattr__(self, name):
+        return getattr(os, name)
+
+
+# ---------------------------------------------------------------- API stub
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    requests = 0
+
+    def do_GET(self):
+        StubAPIHandler.requests += 1
+        time.sleep(self.latency)
+        path = self.path.split('?')[0]
+        if path.endswith('/data/2.5/weather'):
+            payload = {"main": {"temp": 31.5}, "weather": [{"description": "haze"}], "name": "Delhi"}
+        elif path.endswith('/v2/top-headlines'):
+            payload = {"status": "ok", "articles": [{"title": f"Headline {i}", "url": f"https://example.com/{i}"}
+                                                    for i in range(1, 4)]}
+        else:
+            payload = {"error": "unknown endpoint"}
+        body = json.dumps(payload).encode()
+        self.send_response(200 if "error" not in payload else 404)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_api_stub(latency):
+    StubAPIHandler.latency = latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubAPIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ---------------------------------------------------------------- audio replay
+
+class Clip:
+    def __init__(self, name, samples, transcript):
+        self.name = name
+        self.samples = samples
+        # None plays the part of audio the recogniser can't make words of
+        self.transcript = transcript
+
+
+class ReplayStream:
+    def __init__(self, source):
+        self.source = source
+
+    def read(self, size, exception_on_overflow=False):
+        return self.source.next_chunk(size)
+
+
+class ReplaySource:
+    """AudioSource that plays queued clips, then room noise, in CHUNK-sized reads
+
+    With realtime on, reads block until the audio would have been captured.
+    """
+
+    SAMPLE_RATE = SAMPLE_RATE
+    SAMPLE_WIDTH = 2
+    CHUNK = CHUNK
+
+    def __init__(self, realtime=False, seed=5):
+        self.realtime = realtime
+        self.stream = ReplayStream(self)
+        self.clips = []
+        self.current = None
+        self.rng = np.random.default_rng(seed)
+        self._position = 0
+        self._origin = None
+        self._served = 0
+        self._lock = threading.Lock()
+
+    def queue(self, clips):
+        with self._lock:
+            self.clips.extend(clips)
+
+    @property
+    def transcript(self):
+        return self.current.transcript if self.current is not None else None
+
+    def next_chunk(self, size):
+        with self._lock:
+            if self.current is None or self._position >= len(self.current.samples):
+                if self.clips:
+                    self.current = self.clips.pop(0)
+                    self._position = 0
+                else:
+                    self.current = None
+            if self.current is not None:
+                chunk = self.current.samples[self._position:self._position + size]
+                self._position += size
+                if len(chunk) < size:
+                    chunk = np.concatenate([chunk, self._noise(size - len(chunk))])
+            else:
+                chunk = self._noise(size)
+        if self.realtime:
+            self._pace(size)
+        return chunk.astype(np.int16).tobytes()
+
+    def _noise(self, count):
+        return np.clip(self.rng.normal(0, NOISE_RMS, count), -32768, 32767).astype(np.int16)
+
+    def _pace(self, size):
+        now = time.perf_counter()
+        if self._origin is None or now - self._due() > 0.5:
+            # idle for a while (processing a command): the backlog is gone, restart the clock
+            self._origin, self._served = now, 0
+        self._served += size
+        delay = self._due() - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def _due(self):
+        return self._origin + self._served / self.SAMPLE_RATE
+
+
+def make_replay_backend(source, latency):
+    from engine.stt import STTBackend
+    import speech_recognition as sr
+
+    class ReplayBackend(STTBackend):
+        """Answers with the transcript of the clip being replayed"""
+
+        name = 'replay'
+        offline = True
+
+        def transcribe(self, recognizer, audio):
+            transcript = source.transcript
+            time.sleep(latency)
+            if not transcript:
+                raise sr.UnknownValueError()
+            return transcript, 0.92
+
+    return ReplayBackend()
+
+
+def parse_query(line):
+    parts = [part.strip() for part in line.split('|')]
+    return parts[0], parts[1:]
+
+
+def synthetic_clips(texts, rng):
+    """One synthetic utterance per transcript (None for an unintelligible one)"""
+    from bench_vad import synthetic_command
+    clips = []
+    for text in texts:
+        samples, _ = synthetic_command(rng, SAMPLE_RATE, NOISE_RMS)
+        clips.append(Clip(f"synthetic:{text}", samples, text))
+    return clips
+
+
+def padded(samples, rng):
+    noise = rng.normal(0, NOISE_RMS, int(CLIP_PAD_SECONDS * SAMPLE_RATE))
+    return np.concatenate([samples, np.clip(noise, -32768, 32767).astype(np.int16)])
+
+
+def load_wav_corpus(path, rng):
+    transcripts = {}
+    transcript_file = os.path.join(path, "transcripts.csv")
+    if os.path.exists(transcript_file):
+        with open(transcript_file, newline='', encoding='utf-8') as f:
+            transcripts = {row[0]: row[1] for row in csv.reader(f) if len(row) >= 2 and not row[0].startswith('#')}
+
+    sessions = []
+    for name in sorted(os.listdir(path)):
+        if not name.lower().endswith('.wav'):
+            continue
+        with wave.open(os.path.join(path, name), 'rb') as wav:
+            if wav.getnchannels() != 1 or wav.getsampwidth() != 2 or wav.getframerate() != SAMPLE_RATE:
+                print(f"skipping {name}: expected {SAMPLE_RATE} Hz mono 16-bit")
+                continue
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        if name not in transcripts:
+            print(f"skipping {name}: no transcript in transcripts.csv")
+            continue
+        query, followups = parse_query(transcripts[name])
+        sessions.append((query, [Clip(name, padded(samples, rng), query)], followups))
+    return sessions
+
+
+# ---------------------------------------------------------------- setup
+
+def prepare_workdir(workdir, api_url):
+    """Sandbox cwd with its own JARVIS.db, and env pointing every API at the stub"""
+    shutil.copy(os.path.join(REPO_DIR, 'contacts.csv'), workdir)
+    os.chdir(workdir)
+    os.environ.update({
+        'OPENWEATHER_API_KEY': 'bench-key',
+        'NEWS_API_KEY': 'bench-key',
+        'JARVIS_OPENWEATHERMAP_URL': api_url,
+        'JARVIS_NEWSAPI_URL': api_url,
+        # every weather/news query goes over HTTP to the stub
+        'JARVIS_CACHE_TTL_OPENWEATHERMAP': '0',
+        'JARVIS_CACHE_TTL_NEWSAPI': '0',
+        'JARVIS_BRIEFING_YOUTUBE': '',
+        'JARVIS_BRIEFING_AI_PROMPT': '',
+        'JARVIS_STT_BACKENDS': '',
+        'JARVIS_STT_HEDGE': '0',
+        'JARVIS_TRACE': '1',
+        'JARVIS_TRACE_DIR': os.path.join(workdir, 'traces'),
+    })
+
+
+def seed_database():
+    from engine.contact_import import import_contacts
+    from engine.database import database
+
+    conn = database.connection()
+    with conn:
+        conn.execute('CREATE TABLE IF NOT EXISTS sys_command(id integer primary key, name VARCHAR(100), path VARCHAR(1000))')
+        conn.execute('CREATE TABLE IF NOT EXISTS web_command(id integer primary key, name VARCHAR(100), url VARCHAR(1000))')
+        conn.executemany('INSERT INTO sys_command (name, path) VALUES (?, ?)', SYS_COMMANDS)
+        conn.executemany('INSERT INTO web_command (name, url) VALUES (?, ?)', WEB_COMMANDS)
+    return import_contacts(conn, 'contacts.csv')
+
+
+class Pipeline:
+    """The real command pipeline wired to the replay source and fakes"""
+
+    def __init__(self, args, log):
+        import engine.features as features
+        from engine import command, stt, tracing
+        from engine.jobs import jobs
+        from engine.listener import listener
+        from engine.tts import speech_service
+
+        features.jobs = ScaledJobs(jobs, args.sleep_scale)
+        features.subprocess = types.SimpleNamespace(run=lambda command, *a, **k: log('subprocess', command))
+        features.os = SandboxOS(log)
+
+        self.command = command
+        self.jobs = jobs
+        self.tracing = tracing
+        self.speech = speech_service
+        self.source = ReplaySource(realtime=args.realtime)
+
+        import speech_recognition as sr
+        listener.recognizer = sr.Recognizer()
+        listener.source = self.source
+        # no background calibration: it would eat the clips queued for the next turn
+        listener._start_calibrator = lambda: None
+        router = stt.STTRouter([make_replay_backend(self.source, args.stt_latency)], hedge=False)
+        stt.stt_router = command.stt_router = router
+
+        speech_service.start()
+        # turns that only end a voice session; left out of the stage summary
+        self.closing_turns = set()
+
+    def run_text(self, query, clips):
+        # follow-up questions ("whatsapp or mobile?") are answered from the queued clips
+        self.source.queue(clips)
+        self.command.allCommand(query)
+        # network and WhatsApp handlers finish on the job pool after allCommand returns
+        self.jobs.wait_idle()
+        self.speech.wait_idle()
+
+    def run_voice(self, clips):
+        self.source.queue(clips)
+        self.command.allCommand()
+        self.closing_turns.add(self.tracing.current_turn())
+        self.jobs.wait_idle()
+        self.speech.wait_idle()
+
+
+def build_turns(args):
+    if args.queries:
+        with open(args.queries, encoding='utf-8') as f:
+            text_lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    else:
+        text_lines = DEFAULT_QUERIES
+    # every clip is generated up front so synthesis isn't timed as part of a turn
+    rng = np.random.default_rng(17)
+    turns = [("text", query, synthetic_clips(followups, rng)) for query, followups in map(parse_query, text_lines)]
+
+    if args.corpus:
+        sessions = load_wav_corpus(args.corpus, rng)
+    elif args.text_only:
+        sessions = []
+    else:
+        sessions = []
+        for query, followups in map(parse_query, DEFAULT_VOICE_QUERIES):
+            sessions.append((query, synthetic_clips([query], rng), followups))
+    for query, clips, followups in sessions:
+        # a mumble the recogniser can't transcribe ends the voice session
+        turns.append(("voice", query, clips + synthetic_clips(followups + [None], rng)))
+    return turns
+
+
+def run_turn(pipeline, turn):
+    mode, query, clips = turn
+    if mode == "voice":
+        pipeline.run_voice(clips)
+    else:
+        pipeline.run_text(query, clips)
+
+
+def silence_output():
+    """The pipeline prints a lot; keep the benchmark's own output readable"""
+    real = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    return real
+
+
+# ---------------------------------------------------------------- measurement
+
+def timing_pass(pipeline, turns, repeat, trace_dir):
+    from engine import tracing
+
+    tracing.writer.flush()
+    shutil.rmtree(trace_dir, ignore_errors=True)
+    totals = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for turn in turns:
+            began = time.perf_counter()
+            run_turn(pipeline, turn)
+            totals.append((time.perf_counter() - began) * 1000)
+    wall = time.perf_counter() - started
+    tracing.writer.flush(10)
+
+    spans = [span for span in tracing.load_spans(trace_dir) if span.get("turn") not in pipeline.closing_turns]
+    stages = tracing.stage_summary(spans)
+    stages["bench.turn_total"] = summarise(totals)
+    overhead = stt_overhead(spans)
+    if overhead:
+        stages["stt.overhead"] = summarise(overhead)
+    return {"turns": len(totals), "seconds": wall, "throughput": len(totals) / wall, "stages": stages}
+
+
+def stt_overhead(spans):
+    """Per recognition, time in the STT glue around the backend call (stt minus stt.replay)"""
+    by_turn = {}
+    for span in spans:
+        if span["stage"] in ("stt", "stt.replay"):
+            by_turn.setdefault(span.get("turn"), {}).setdefault(span["stage"], []).append(span)
+    overhead = []
+    for stages in by_turn.values():
+        outer = sorted(stages.get("stt", []), key=lambda s: s["mono"])
+        inner = sorted(stages.get("stt.replay", []), key=lambda s: s["mono"])
+        overhead += [max(0.0, o["ms"] - i["ms"]) for o, i in zip(outer, inner)]
+    return overhead
+
+
+def summarise(values):
+    from engine.tracing import percentile
+    return {"count": len(values), "p50": percentile(values, 50), "p95": percentile(values, 95),
+            "p99": percentile(values, 99), "max": max(values), "errors": 0}
+
+
+def allocation_pass(pipeline, turns):
+    """Peak and retained traced memory per turn, by turn kind"""
+    by_kind = {}
+    tracemalloc.start()
+    try:
+        for turn in turns:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            run_turn(pipeline, turn)
+            current, peak = tracemalloc.get_traced_memory()
+            kind = turn[0]
+            by_kind.setdefault(kind, {"peak": [], "retained": []})
+            by_kind[kind]["peak"].append((peak - before) / 1024)
+            by_kind[kind]["retained"].append((current - before) / 1024)
+    finally:
+        tracemalloc.stop()
+    return {kind: {"peak_kib_p50": float(np.median(v["peak"])), "peak_kib_max": float(max(v["peak"])),
+                   "retained_kib_p50": float(np.median(v["retained"]))}
+            for kind, v in by_kind.items()}
+
+
+def compare(results, baseline, tolerance):
+    """Lines describing every regression against the baseline"""
+    regressions = []
+    for stage, old in baseline.get("stages", {}).items():
+        new = results["stages"].get(stage)
+        if new is None:
+            continue
+        keys = ("p50", "p95") if min(new["count"], old["count"]) >= MIN_SPANS_FOR_P95 else ("p50",)
+        for key in keys:
+            slack = P95_SLACK if key == "p95" else 1.0
+            if new[key] > old[key] * (1 + tolerance * slack) and new[key] - old[key] > MIN_REGRESSION_MS * slack:
+                regressions.append(f"{stage} {key} {old[key]:.1f} -> {new[key]:.1f} ms")
+    if results["throughput"] < baseline.get("throughput", 0) / (1 + tolerance):
+        regressions.append(f"throughput {baseline['throughput']:.2f} -> {results['throughput']:.2f} turns/s")
+    for kind, old in baseline.get("allocations", {}).items():
+        new = results["allocations"].get(kind)
+        if new is None:
+            continue
+        grew = new["peak_kib_p50"] - old["peak_kib_p50"]
+        if new["peak_kib_p50"] > old["peak_kib_p50"] * (1 + tolerance) and grew > MIN_REGRESSION_KIB:
+            regressions.append(f"{kind} turn peak allocation {old['peak_kib_p50']:.0f} -> {new['peak_kib_p50']:.0f} KiB")
+    return regressions
+
+
+def print_report(results, baseline=None):
+    print(f"\n=== Pipeline replay: {results['turns']} turns in {results['seconds']:.2f}s "
+          f"({results['throughput']:.2f} turns/s) ===")
+    print(f"{'stage':28s} {'count':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'base p50':>9s}")
+    base_stages = (baseline or {}).get("stages", {})
+    for stage in sorted(results["stages"]):
+        s = results["stages"][stage]
+        base = base_stages.get(stage)
+        base_text = f"{base['p50']:9.1f}" if base else f"{'-':>9s}"
+        print(f"{stage:28s} {s['count']:6d} {s['p50']:9.1f} {s['p95']:9.1f} {s['p99']:9.1f} {base_text}")
+    print("\nAllocations per turn (tracemalloc):")
+    for kind, a in sorted(results["allocations"].items()):
+        print(f"  {kind:6s} peak p50 {a['peak_kib_p50']:8.1f} KiB   max {a['peak_kib_max']:8.1f} KiB"
+              f"   retained p50 {a['retained_kib_p50']:7.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless replay benchmark for the JARVIS command pipeline")
+    parser.add_argument("--corpus", help="directory of WAV commands with transcripts.csv")
+    parser.add_argument("--queries", help="text file of queries (follow-up answers after ' | ')")
+    parser.add_argument("--text-only", action="store_true", help="skip the synthetic voice turns")
+    parser.add_argument("--repeat", type=int, default=5, help="measured passes over the corpus")
+    parser.add_argument("--stt-latency", type=float, default=0.05, help="fake recogniser latency, seconds")
+    parser.add_argument("--tts-latency", type=float, default=0.01, help="fake synthesizer time to first audio")
+    parser.add_argument("--tts-cps", type=float, default=2000, help="fake speaking rate in chars/s (0 = instant)")
+    parser.add_argument("--http-latency", type=float, default=0.02, help="weather/news stub latency, seconds")
+    parser.add_argument("--sleep-scale", type=float, default=0.0,
+                        help="scale for the UI settle sleeps in engine.features (1 = real waits)")
+    parser.add_argument("--realtime", action="store_true", help="replay audio at real speed instead of flat out")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", help="write this run's results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (0.25 = 25%%)")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    args = parser.parse_args()
+
+    for option in ("corpus", "queries", "baseline", "save_baseline"):
+        if getattr(args, option):
+            setattr(args, option, os.path.abspath(getattr(args, option)))
+    sys.path.insert(0, REPO_DIR)
+
+    server, api_url = start_api_stub(args.http_latency)
+    workdir = tempfile.mkdtemp(prefix="jarvis-bench-")
+    prepare_workdir(workdir, api_url)
+    log = ActionLog()
+    eel, tts_engine = install_fakes(args, log)
+
+    real_stdout = None if args.verbose else silence_output()
+    try:
+        imported = seed_database()
+        pipeline = Pipeline(args, log)
+        turns = build_turns(args)
+        # first pass warms imports, indexes and connections; not measured
+        for turn in turns:
+            run_turn(pipeline, turn)
+        results = timing_pass(pipeline, turns, args.repeat, os.path.join(workdir, 'traces'))
+        results["allocations"] = allocation_pass(pipeline, turns)
+    finally:
+        if real_stdout is not None:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        server.shutdown()
+
+    results["config"] = {key: getattr(args, key) for key in
+                         ("repeat", "stt_latency", "tts_latency", "tts_cps", "http_latency", "sleep_scale", "realtime")}
+    results["config"]["corpus"] = "wav" if args.corpus else "synthetic"
+    print(f"Contacts imported: {imported.get('rows', 0)}, API requests served: {StubAPIHandler.requests}, "
+          f"utterances spoken: {tts_engine.spoken}, browser opens: {log.count('browser')}, "
+          f"key presses: {log.count('press')}, UI messages: {sum(eel.calls.values())}")
+
+    baseline = None
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("config") != results["config"]:
+            print("Warning: baseline was recorded with different settings, comparison may be meaningless")
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nREGRESSIONS (over {args.tolerance:.0%} and {MIN_REGRESSION_MS} ms):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
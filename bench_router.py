@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the intent router in engine/router.py
+Times dispatch over a few thousand queries against the old if/elif chain
+from processCommand, then shows how dispatch cost scales with handler count
+
+Usage: python bench_router.py [queries.txt]
+(queries.txt holds one recorded query per line; without it a synthetic
+ corpus is generated)
+"""
+
+import random
+import sys
+import time
+
+from engine.router import IntentRouter
+
+TEMPLATES = [
+    "open {app}",
+    "play {song} on youtube",
+    "send message to {name}",
+    "phone call {name}",
+    "video call {name}",
+    "weather {city}",
+    "what is the weather in {city}",
+    "news",
+    "tell me the latest headlines",
+    "api status",
+    "check apis",
+    "what time is it",
+    "tell me a joke",
+    "renewsable energy facts",
+]
+APPS = ["chrome", "notepad", "youtube", "google", "spotify", "vs code", "calculator"]
+SONGS = ["believer", "shape of you", "kesariya", "lofi beats", "tum hi ho"]
+NAMES = ["mitali", "aahan", "rahul", "priya", "dad", "mom"]
+CITIES = ["delhi", "mumbai", "london", "bangalore", "pune"]
+
+
+def legacy_chain(query):
+    """The hand-ordered dispatch chain processCommand used before the router"""
+    if query.startswith("open "):
+        return "open"
+    elif query.startswith("play ") and "on youtube" in query:
+        return "youtube"
+    elif "send message" in query or "phone call" in query or "video call" in query:
+        return "contact"
+    elif "weather" in query:
+        return "weather"
+    elif "news" in query or "headlines" in query:
+        return "news"
+    elif "api status" in query or "check apis" in query:
+        return "api_status"
+    return None
+
+
+def load_queries(path=None, count=3000):
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip().lower() for line in f if line.strip()]
+
+    rng = random.Random(42)
+    queries = []
+    for _ in range(count):
+        template = rng.choice(TEMPLATES)
+        queries.append(template.format(app=rng.choice(APPS), song=rng.choice(SONGS),
+                                       name=rng.choice(NAMES), city=rng.choice(CITIES)))
+    return queries
+
+
+def command_router():
+    """Copy of the router engine.command registers, with no-op handlers"""
+    from engine.command import router
+    bench = IntentRouter()
+    for intent in router.intents:
+        bench.register(intent.name, lambda query: None,
+                       phrases=[" ".join(p) for p in intent.phrases],
+                       prefixes=[" ".join(p) for p in intent.prefixes],
+                       requires=[" ".join(p) for p in intent.requires],
+                       priority=intent.priority)
+    return bench
+
+
+def time_per_query(fn, queries, repeats=5):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for query in queries:
+            fn(query)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(queries) * 1e6
+
+
+def add_synthetic_intents(router, count, rng):
+    words = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+             "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa"]
+    for i in range(count):
+        phrase = f"{rng.choice(words)} {rng.choice(words)} {i}"
+        router.register(f"synthetic_{i}", lambda query: None, phrases=[phrase], priority=10)
+
+
+def main():
+    queries = load_queries(sys.argv[1] if len(sys.argv) > 1 else None)
+    router = command_router()
+    router.compile()
+
+    print(f"=== Intent dispatch benchmark ({len(queries)} queries) ===")
+    legacy_us = time_per_query(legacy_chain, queries)
+    router_us = time_per_query(router.match, queries)
+    print(f"Legacy if/elif chain: {legacy_us:.2f} us/query")
+    print(f"Compiled router:      {router_us:.2f} us/query")
+
+    differences = {}
+    for query in queries:
+        old = legacy_chain(query)
+        intent = router.match(query)
+        new = intent.name if intent else None
+        if old != new:
+            differences.setdefault((old, new), query)
+    print(f"\nQueries routed differently: {len(differences)} kinds")
+    for (old, new), example in sorted(differences.items(), key=str):
+        print(f"  {old} -> {new}: '{example}'")
+
+    print("\n=== Scaling with handler count ===")
+    rng = random.Random(7)
+    total = 0
+    for extra in (0, 10, 100, 1000):
+        add_synthetic_intents(router, extra - total, rng)
+        total = extra
+        router.compile()
+        us = time_per_query(router.match, queries)
+        print(f"{len(router.intents):5d} intents: {us:.2f} us/query")
+
+
+if __name__ == "__main__":
+    main()
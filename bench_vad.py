@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Measure end-of-speech latency of the VAD against Recognizer.listen's endpointing
+Replays a corpus of spoken commands in 32 ms frames and reports how long after
+the last word each endpointer hands the phrase to recognition.
+
+Usage: python bench_vad.py [corpus_dir]
+(corpus_dir holds 16-bit mono WAVs and an optional labels.csv with
+"file,speech_end_seconds" rows; without it a synthetic corpus of commands in
+fan/street-like noise is generated)
+"""
+
+import csv
+import math
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+from engine.vad import AGGRESSIVENESS, SPEECH_END, VoiceActivityDetector, frame_features, split_frames
+
+FRAME_LENGTH = 512
+PAUSE_THRESHOLD = 1.0
+PHRASE_TIME_LIMIT = 6.0
+CALIBRATION_SECONDS = 0.5
+# ends detected this long before the true end cut the command off
+CLIP_TOLERANCE = 0.1
+
+
+def synthetic_command(rng, rate, noise_rms):
+    """Syllable-like voiced bursts and fricatives between noise; returns (samples, speech_end)"""
+    lead, tail = 0.6, 2.5
+    pieces = [np.zeros(int(lead * rate))]
+    for word in range(rng.integers(2, 6)):
+        for syllable in range(rng.integers(1, 4)):
+            duration = rng.uniform(0.12, 0.3)
+            t = np.arange(int(duration * rate)) / rate
+            if rng.random() < 0.2:
+                # "s"/"sh": loud-ish, high zero-crossing rate
+                burst = rng.normal(0, 1, len(t)) * np.hanning(len(t)) * 1500
+            else:
+                f0 = rng.uniform(100, 230)
+                voiced = sum(np.sin(2 * math.pi * f0 * k * t) / k for k in range(1, 6))
+                burst = voiced * np.hanning(len(t)) * rng.uniform(2500, 7000)
+            pieces.append(burst)
+            pieces.append(np.zeros(int(rng.uniform(0.03, 0.08) * rate)))
+        pieces.append(np.zeros(int(rng.uniform(0.05, 0.25) * rate)))
+    speech = np.concatenate(pieces[:-1])
+    speech_end = len(speech) / rate
+    signal = np.concatenate([speech, np.zeros(int(tail * rate))])
+
+    noise = rng.normal(0, noise_rms, len(signal))
+    # slow level changes, like a fan or passing traffic
+    noise *= 1 + 0.5 * np.sin(2 * math.pi * rng.uniform(0.2, 1.0) * np.arange(len(signal)) / rate)
+    samples = np.clip(signal + noise, -32768, 32767).astype(np.int16)
+    return samples, speech_end
+
+
+def synthetic_corpus(count=60, rate=16000):
+    rng = np.random.default_rng(11)
+    corpus = []
+    for i in range(count):
+        samples, speech_end = synthetic_command(rng, rate, noise_rms=rng.choice([60, 150, 400]))
+        corpus.append((f"synthetic-{i:02d}", samples, rate, speech_end))
+    return corpus
+
+
+def load_corpus(path):
+    labels = {}
+    label_file = os.path.join(path, "labels.csv")
+    if os.path.exists(label_file):
+        with open(label_file, newline='') as f:
+            labels = {row[0]: float(row[1]) for row in csv.reader(f) if row and not row[0].startswith('#')}
+
+    corpus = []
+    for name in sorted(os.listdir(path)):
+        if not name.lower().endswith('.wav'):
+            continue
+        with wave.open(os.path.join(path, name), 'rb') as wav:
+            if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+                print(f"skipping {name}: expected mono 16-bit")
+                continue
+            rate = wav.getframerate()
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        speech_end = labels.get(name)
+        if speech_end is None:
+            speech_end = oracle_speech_end(samples, rate)
+        corpus.append((name, samples, rate, speech_end))
+    return corpus
+
+
+def oracle_speech_end(samples, rate):
+    """Offline estimate: last frame well above the quietest decile"""
+    rms, _ = frame_features(split_frames(samples, FRAME_LENGTH))
+    floor = np.percentile(rms, 10)
+    loud = np.nonzero(rms > floor * 4)[0]
+    return (loud[-1] + 1) * FRAME_LENGTH / rate if len(loud) else 0.0
+
+
+def ambient_rms(rms, rate):
+    frames = max(1, int(CALIBRATION_SECONDS * rate / FRAME_LENGTH))
+    return float(np.mean(rms[:frames]))
+
+
+def listen_endpoint(rms, rate):
+    """Recognizer.listen's rule: phrase ends after pause_threshold below energy_threshold"""
+    frame_seconds = FRAME_LENGTH / rate
+    threshold = ambient_rms(rms, rate) * 1.5
+    pause_frames = math.ceil(PAUSE_THRESHOLD / frame_seconds)
+    started = None
+    quiet = 0
+    for i, energy in enumerate(rms):
+        if started is None:
+            if energy > threshold:
+                started = i
+            continue
+        quiet = quiet + 1 if energy <= threshold else 0
+        if quiet > pause_frames or (i - started) * frame_seconds > PHRASE_TIME_LIMIT:
+            return (i + 1) * frame_seconds
+    return None
+
+
+def vad_endpoint(samples, rms, rate, aggressiveness):
+    detector = VoiceActivityDetector(FRAME_LENGTH / rate, aggressiveness, noise_floor=ambient_rms(rms, rate))
+    for event, index in detector.run(samples, FRAME_LENGTH):
+        if event == SPEECH_END:
+            return (index + 1) * FRAME_LENGTH / rate
+    return None
+
+
+def summarise(name, latencies, missed, clipped, count):
+    if latencies:
+        latencies = np.array(latencies) * 1000
+        print(f"  {name:18s} p50 {np.percentile(latencies, 50):6.0f} ms   p90 {np.percentile(latencies, 90):6.0f} ms"
+              f"   max {latencies.max():6.0f} ms   missed {missed}/{count}   clipped {clipped}/{count}")
+    else:
+        print(f"  {name:18s} no phrases ended   missed {missed}/{count}")
+
+
+def main():
+    corpus = load_corpus(sys.argv[1]) if len(sys.argv) > 1 else synthetic_corpus()
+    print(f"=== End-of-speech latency ({len(corpus)} commands, {FRAME_LENGTH}-sample frames) ===")
+
+    endpointers = [("listen (pause 1s)", lambda samples, rms, rate: listen_endpoint(rms, rate))]
+    for level in sorted(AGGRESSIVENESS):
+        endpointers.append((f"vad level {level}",
+                            lambda samples, rms, rate, level=level: vad_endpoint(samples, rms, rate, level)))
+
+    for name, endpoint in endpointers:
+        latencies, missed, clipped = [], 0, 0
+        for _, samples, rate, speech_end in corpus:
+            rms, _ = frame_features(split_frames(samples, FRAME_LENGTH))
+            ended = endpoint(samples, rms, rate)
+            if ended is None:
+                missed += 1
+            elif ended < speech_end - CLIP_TOLERANCE:
+                clipped += 1
+            else:
+                latencies.append(ended - speech_end)
+        summarise(name, latencies, missed, clipped, len(corpus))
+
+    samples = corpus[0][1]
+    frames = split_frames(samples, FRAME_LENGTH)
+    detector = VoiceActivityDetector(FRAME_LENGTH / corpus[0][2])
+    start = time.process_time()
+    for frame in frames:
+        detector.process(frame)
+    per_frame = (time.process_time() - start) / len(frames)
+    print(f"\nStreaming VAD cost: {per_frame * 1e6:.1f} us CPU per {FRAME_LENGTH}-sample frame")
+
+
+if __name__ == "__main__":
+    main()
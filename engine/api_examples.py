@@ -3,9 +3,10 @@ Simple API integration examples for JARVIS
 This shows how to add different API services to your assistant
 """
 
-import requests
 import os
 from engine.command import speak
+from engine.http_client import base_url
+from engine.response_cache import response_cache
 
 class APIManager:
     """Simple API manager for JARVIS"""
@@ -40,14 +41,14 @@ class APIManager:
             return None
         
         try:
-            url = f"http://api.openweathermap.org/data/2.5/weather"
+            url = f"{base_url('openweathermap')}/data/2.5/weather"
             params = {
                 "q": city,
                 "appid": self.weather_api_key,
                 "units": "metric"
             }
             
-            response = requests.get(url, params=params)
+            response = response_cache.get(url, params=params, provider='openweathermap')
             
             if response.status_code == 200:
                 data = response.json()
@@ -74,14 +75,14 @@ class APIManager:
             return None
         
         try:
-            url = "https://newsapi.org/v2/top-headlines"
+            url = f"{base_url('newsapi')}/v2/top-headlines"
             params = {
                 "apiKey": self.news_api_key,
                 "country": "in",
                 "pageSize": count
             }
             
-            response = requests.get(url, params=params)
+            response = response_cache.get(url, params=params, provider='newsapi')
             
             if response.status_code == 200:
                 data = response.json()
@@ -0,0 +1,106 @@
+"""
+In-memory lookup table for "open X" targets
+sys_command and web_command are loaded into one dict keyed by normalised
+name and aliases. The dict is reloaded only when SQLite's data_version says
+another connection changed the database, so resolving a target is a hash
+lookup instead of two unindexed LOWER(name) queries. Queries go through the
+calling thread's database.reader() connection.
+"""
+
+import re
+import sqlite3
+import threading
+
+from engine.database import database
+
+_PUNCT_RE = re.compile(r"[^a-z0-9+#. ]+")
+
+
+def normalise_app_name(name):
+    """Lower-case, drop stray punctuation and collapse whitespace"""
+    return " ".join(_PUNCT_RE.sub(" ", str(name or "").lower()).split())
+
+
+def app_aliases(name):
+    """Every key an app can be asked for by: "VS Code" -> "vs code", "vscode" """
+    norm = normalise_app_name(name)
+    if not norm:
+        return []
+    aliases = [norm, norm.replace(" ", "").replace(".", "")]
+    if norm.startswith("the "):
+        aliases.append(norm[4:])
+    for suffix in (".com", " app", " website"):
+        if norm.endswith(suffix):
+            aliases.append(norm[:-len(suffix)].strip())
+    return list(dict.fromkeys(a for a in aliases if a))
+
+
+class AppResolver:
+    """Resolves an app/website name to ('sys', path) or ('web', url)"""
+
+    def __init__(self, db=None):
+        self.db = db or database
+        self._lock = threading.Lock()
+        # data_version is per connection, so each thread remembers what its reader last saw
+        self._local = threading.local()
+        self._generation = 0
+        self._targets = {}
+        self._names = []
+        self.loads = 0
+
+    def resolve(self, name):
+        """Target for a spoken name, or None when it isn't in the database"""
+        self._check()
+        norm = normalise_app_name(name)
+        return self._targets.get(norm) or self._targets.get(norm.replace(" ", "").replace(".", ""))
+
+    def names(self):
+        """Display names of every known target"""
+        self._check()
+        return list(self._names)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+
+    def _check(self):
+        try:
+            conn = self.db.reader()
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"App index error: {e}")
+            return
+        # a thread's first look can't tell what changed before its reader opened, so it reloads once
+        seen = (conn, version, self._generation)
+        if getattr(self._local, 'seen', None) != seen:
+            with self._lock:
+                self._load(conn)
+            self._local.seen = seen
+
+    def _load(self, conn):
+        targets = {}
+        names = []
+        # web_command first so sys_command wins on a shared name, as openCommand always did
+        for table, column, kind in (('web_command', 'url', 'web'), ('sys_command', 'path', 'sys')):
+            try:
+                rows = conn.execute(f'SELECT name, {column} FROM {table}').fetchall()
+            except sqlite3.Error:
+                continue
+            for name, target in rows:
+                if not name or not target:
+                    continue
+                names.append(name.strip().lower())
+                for alias in app_aliases(name):
+                    targets[alias] = (kind, target)
+        self._targets = targets
+        self._names = list(dict.fromkeys(names))
+        self.loads += 1
+
+
+# Global resolver shared by openCommand and anything else that opens apps
+app_resolver = AppResolver()
+
+
+def resolve_app(name):
+    """('sys', path), ('web', url) or None for an app/website name"""
+    return app_resolver.resolve(name)
@@ -0,0 +1,158 @@
+"""
+Shared-memory audio bus between the JARVIS processes
+A single capture process owns the microphone and writes 16 kHz int16 frames
+into a multiprocessing.shared_memory ring with a sequence counter. The
+hotword detector, speech recognition and future stages each read it with
+their own cursor, so no process has to open the device itself and the
+command process can start from audio captured before it was asked to listen.
+"""
+
+import struct
+import time
+from multiprocessing import shared_memory
+
+from engine.audio_frames import is_overflow
+
+# Porcupine's fixed input format
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 512
+RING_SECONDS = 8
+PREROLL_SECONDS = 1.0
+# readers stay this many frames behind the writer so a view is not overwritten mid-use
+SAFETY_FRAMES = 16
+POLL_SECONDS = 0.005
+
+# sequence (frames written), sample rate, frame length, slots, overflows
+HEADER = struct.Struct('<QIIIQ')
+HEADER_BYTES = 64
+
+
+class AudioBus:
+    """Single-writer, multi-reader ring of int16 frames in shared memory"""
+
+    def __init__(self, shm, owner=False):
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+        _, self.sample_rate, self.frame_length, self.slots, _ = HEADER.unpack_from(shm.buf, 0)
+        self.frame_bytes = self.frame_length * 2
+        self._data = shm.buf[HEADER_BYTES:HEADER_BYTES + self.slots * self.frame_bytes]
+        self._frames = [self._data[i * self.frame_bytes:(i + 1) * self.frame_bytes] for i in range(self.slots)]
+
+    @classmethod
+    def create(cls, sample_rate=SAMPLE_RATE, frame_length=FRAME_LENGTH, seconds=RING_SECONDS):
+        slots = int(seconds * sample_rate / frame_length)
+        shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + slots * frame_length * 2)
+        HEADER.pack_into(shm.buf, 0, 0, sample_rate, frame_length, slots, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        try:
+            # Python 3.13+: don't let this process's resource tracker unlink the owner's block
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm)
+
+    @property
+    def sequence(self):
+        """Number of frames written so far; frame n lives in slot n % slots"""
+        return struct.unpack_from('<Q', self.shm.buf, 0)[0]
+
+    @property
+    def overflows(self):
+        return HEADER.unpack_from(self.shm.buf, 0)[4]
+
+    def write(self, data):
+        """Publish one frame (writer process only)"""
+        sequence = self.sequence
+        self._frames[sequence % self.slots][:] = data
+        # the counter moves only after the frame is complete
+        struct.pack_into('<Q', self.shm.buf, 0, sequence + 1)
+
+    def count_overflow(self):
+        struct.pack_into('<Q', self.shm.buf, 20, self.overflows + 1)
+
+    def frame(self, sequence):
+        """Raw bytes view of a frame, valid until the writer laps it"""
+        return self._frames[sequence % self.slots]
+
+    def reader(self, preroll_seconds=0.0):
+        return BusReader(self, preroll_seconds)
+
+    def oldest_safe(self):
+        return max(0, self.sequence - self.slots + SAFETY_FRAMES)
+
+    def close(self):
+        self._frames = []
+        self._data.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class BusReader:
+    """One consumer's cursor into the bus"""
+
+    def __init__(self, bus, preroll_seconds=0.0):
+        self.bus = bus
+        self.cursor = bus.sequence
+        self.dropped = 0
+        if preroll_seconds:
+            self.rewind(preroll_seconds)
+
+    def read(self, timeout=None):
+        """Next frame as a zero-copy int16 view, or None after timeout seconds without audio"""
+        raw = self.read_raw(timeout)
+        return None if raw is None else raw.cast('h')
+
+    def read_raw(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.cursor >= self.bus.sequence:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(POLL_SECONDS)
+
+        oldest = self.bus.oldest_safe()
+        if self.cursor < oldest:
+            # fell a whole ring behind, skip to the oldest frame that is still intact
+            self.dropped += oldest - self.cursor
+            self.cursor = oldest
+        raw = self.bus.frame(self.cursor)
+        self.cursor += 1
+        return raw
+
+    def rewind(self, seconds, not_before=None):
+        """Move the cursor back up to seconds of already captured audio, or forward to not_before"""
+        frames = int(seconds * self.bus.sample_rate / self.bus.frame_length)
+        self.cursor = max(self.cursor - frames, self.bus.oldest_safe(), not_before or 0)
+
+    def skip_to_live(self):
+        self.cursor = self.bus.sequence
+
+
+def capture(bus_name, device_index=None):
+    """Capture process: own the microphone and feed the bus forever"""
+    import pyaudio
+    from engine.supervisor import worker
+
+    bus = AudioBus.attach(bus_name)
+    paud = pyaudio.PyAudio()
+    stream = paud.open(rate=bus.sample_rate, channels=1, format=pyaudio.paInt16, input=True,
+                       frames_per_buffer=bus.frame_length, input_device_index=device_index)
+    try:
+        while True:
+            worker.beat()
+            try:
+                data = stream.read(bus.frame_length, exception_on_overflow=True)
+            except IOError as e:
+                if not is_overflow(e):
+                    raise
+                bus.count_overflow()
+                continue
+            bus.write(data)
+    finally:
+        stream.close()
+        paud.terminate()
+        bus.close()
@@ -0,0 +1,96 @@
+"""
+Allocation-free audio frame handling for the hotword loop
+Captured frames are copied into a preallocated ring buffer and handed to the
+detector as zero-copy int16 views (memoryview or NumPy), instead of building a
+new format string and a tuple of Python ints every ~32 ms.
+"""
+
+import struct
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RING_SLOTS = 64
+
+# PortAudio's paInputOverflowed, raised by PyAudio when the input buffer overflowed
+PA_INPUT_OVERFLOWED = -9981
+
+VIEW_MEMORYVIEW = 'memoryview'
+VIEW_NUMPY = 'numpy'
+VIEW_STRUCT = 'struct'
+
+
+def is_overflow(error):
+    """True for PyAudio's input-overflowed IOError"""
+    return error.errno == PA_INPUT_OVERFLOWED or (bool(error.args) and error.args[0] == PA_INPUT_OVERFLOWED)
+
+
+class FrameRing:
+    """Ring of fixed-size int16 frames backed by one preallocated bytearray
+
+    view selects what read_frame()/push() return:
+      'memoryview' - memoryview cast to 'h', a zero-copy sequence of ints
+      'numpy'      - an np.int16 row sharing the same memory
+      'struct'     - a tuple from a precompiled struct.Struct (fallback for
+                     detectors that insist on a real tuple)
+    """
+
+    def __init__(self, frame_length, slots=RING_SLOTS, view=VIEW_MEMORYVIEW):
+        if view == VIEW_NUMPY and np is None:
+            view = VIEW_MEMORYVIEW
+        self.frame_length = frame_length
+        self.frame_bytes = frame_length * 2
+        self.slots = slots
+        self.view = view
+
+        self._buffer = bytearray(self.frame_bytes * slots)
+        raw = memoryview(self._buffer)
+        self._raw = [raw[i * self.frame_bytes:(i + 1) * self.frame_bytes] for i in range(slots)]
+        self._shorts = [slot.cast('h') for slot in self._raw]
+        self._array = np.frombuffer(self._buffer, dtype=np.int16).reshape(slots, frame_length) if np is not None else None
+        self._struct = struct.Struct(f"<{frame_length}h")
+
+        # total frames written; slot of frame n is n % slots
+        self.written = 0
+        self.overflows = 0
+        self.dropped = 0
+
+    def push(self, data):
+        """Copy one frame of raw bytes into the next slot and return its view"""
+        if len(data) != self.frame_bytes:
+            self.dropped += 1
+            return None
+        index = self.written % self.slots
+        self._raw[index][:] = data
+        self.written += 1
+        return self.frame(index)
+
+    def frame(self, index):
+        if self.view == VIEW_NUMPY:
+            return self._array[index]
+        if self.view == VIEW_STRUCT:
+            return self._struct.unpack_from(self._raw[index])
+        return self._shorts[index]
+
+    def read_frame(self, stream):
+        """Read one frame from a PyAudio stream; None when it was lost to an overflow"""
+        try:
+            data = stream.read(self.frame_length, exception_on_overflow=True)
+        except IOError as e:
+            if not is_overflow(e):
+                raise
+            self.overflows += 1
+            self.dropped += 1
+            return None
+        return self.push(data)
+
+    def recent(self, count):
+        """Views of up to the last count frames, oldest first"""
+        count = min(count, self.written, self.slots)
+        start = self.written - count
+        return [self.frame(n % self.slots) for n in range(start, self.written)]
+
+    def stats(self):
+        return {"frames": self.written, "overflows": self.overflows, "dropped": self.dropped}
@@ -0,0 +1,200 @@
+"""
+Boot stage graph for the UI process
+Startup work is declared as named stages with dependencies. Each stage runs
+on its own thread as soon as everything it depends on has finished, so
+opening the database, building the contact and app indexes, starting TTS
+and calibrating the microphone overlap instead of waiting for the first
+command. Stages that only need to happen eventually (pre-rendering speech,
+loading the offline STT model) can wait for the UI so they don't slow its
+first paint. When every ready-critical stage has finished JARVIS is "ready
+to accept a command": that moment is logged, traced as boot.ready and
+printed with a per-stage timeline.
+"""
+
+import threading
+import time
+
+from engine import tracing
+
+OK = "ok"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class Stage:
+    """One named step; fn=None means it is completed from outside (see BootGraph.complete)"""
+
+    def __init__(self, name, fn, after=(), ready=True):
+        self.name = name
+        self.fn = fn
+        self.after = tuple(after)
+        # part of "ready to accept a command"
+        self.ready = ready
+        self.status = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def done(self):
+        return self.status is not None
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, status={self.status})"
+
+
+class BootGraph:
+    """Runs stages concurrently in dependency order and records when each ran"""
+
+    def __init__(self, started_at=None):
+        # perf_counter() of process start if the caller took it earlier, else now
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.ready_at = None
+        self.ready_wall = None
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._launched = set()
+        self._ready = threading.Event()
+        self._finished = threading.Event()
+
+    def add(self, name, fn=None, after=(), ready=True):
+        if name in self._stages:
+            raise ValueError(f"boot stage {name!r} declared twice")
+        self._stages[name] = Stage(name, fn, after, ready)
+        return self._stages[name]
+
+    def stage(self, name, after=(), ready=True):
+        """Decorator form of add()"""
+        def decorator(fn):
+            self.add(name, fn, after, ready)
+            return fn
+        return decorator
+
+    def start(self):
+        """Launch every stage whose dependencies are met; returns immediately"""
+        for stage in self._stages.values():
+            missing = [dep for dep in stage.after if dep not in self._stages]
+            if missing:
+                raise ValueError(f"boot stage {stage.name!r} depends on unknown {missing}")
+            if stage.fn is None and stage.started_at is None:
+                # external stages are "running" from the start until complete() is called
+                stage.started_at = time.perf_counter()
+        self._launch_ready_stages()
+        return self
+
+    def complete(self, name, error=None):
+        """Finish an external stage (e.g. the UI, once eel is serving)"""
+        self._finish(self._stages[name], FAILED if error else OK, error)
+
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def wait(self, timeout=None):
+        """Block until every stage has finished"""
+        return self._finished.wait(timeout)
+
+    @property
+    def ready_ms(self):
+        return None if self.ready_at is None else (self.ready_at - self.started_at) * 1000
+
+    def timeline(self):
+        """Stages in start order with ms offsets from boot start"""
+        rows = []
+        for stage in sorted(self._stages.values(), key=lambda s: (s.started_at is None, s.started_at or 0)):
+            start = None if stage.started_at is None else (stage.started_at - self.started_at) * 1000
+            end = None if stage.finished_at is None else (stage.finished_at - self.started_at) * 1000
+            rows.append({
+                "stage": stage.name,
+                "start_ms": start,
+                "end_ms": end,
+                "ms": None if start is None or end is None else end - start,
+                "status": stage.status,
+                "after": list(stage.after),
+                "ready": stage.ready,
+                "error": None if stage.error is None else str(stage.error),
+            })
+        return rows
+
+    def print_timeline(self, title="Boot timeline"):
+        print(f"{title} (ms from start):")
+        print(f"  {'stage':14s} {'start':>8s} {'end':>8s} {'took':>8s}  status")
+        for row in self.timeline():
+            def fmt(value):
+                return f"{value:8.0f}" if value is not None else f"{'-':>8s}"
+            marker = "" if row["ready"] else "  (background)"
+            error = f": {row['error']}" if row["error"] else ""
+            status = row["status"] or ("running" if row["start_ms"] is not None else "waiting")
+            print(f"  {row['stage']:14s} {fmt(row['start_ms'])} {fmt(row['end_ms'])} {fmt(row['ms'])}  "
+                  f"{status}{error}{marker}")
+
+    def _launch_ready_stages(self):
+        runnable = []
+        with self._lock:
+            for stage in self._stages.values():
+                if stage.name in self._launched or stage.done:
+                    continue
+                deps = [self._stages[dep] for dep in stage.after]
+                if not all(dep.done for dep in deps):
+                    continue
+                if stage.fn is None:
+                    # external: only complete() finishes it, but a failed dependency still skips it
+                    if any(dep.status != OK for dep in deps):
+                        self._launched.add(stage.name)
+                        runnable.append((stage, SKIPPED))
+                    continue
+                self._launched.add(stage.name)
+                runnable.append((stage, SKIPPED if any(dep.status != OK for dep in deps) else None))
+
+        for stage, status in runnable:
+            if status == SKIPPED:
+                self._finish(stage, SKIPPED)
+            else:
+                threading.Thread(target=self._run, args=(stage,), name=f"jarvis-boot-{stage.name}",
+                                 daemon=True).start()
+
+    def _run(self, stage):
+        stage.started_at = time.perf_counter()
+        try:
+            stage.fn()
+        except Exception as e:
+            print(f"Boot stage {stage.name} failed: {e}")
+            self._finish(stage, FAILED, e)
+        else:
+            self._finish(stage, OK)
+
+    def _finish(self, stage, status, error=None):
+        with self._lock:
+            if stage.done:
+                return
+            stage.finished_at = time.perf_counter()
+            if stage.started_at is None:
+                stage.started_at = stage.finished_at
+            stage.status = status
+            stage.error = error
+        tracing.record(f"boot.{stage.name}", (stage.finished_at - stage.started_at) * 1000, status=status,
+                       start_ms=round((stage.started_at - self.started_at) * 1000, 1))
+
+        if not self._ready.is_set() and all(s.done for s in self._stages.values() if s.ready):
+            self._mark_ready()
+        self._launch_ready_stages()
+        with self._lock:
+            finished = not self._finished.is_set() and all(s.done for s in self._stages.values())
+            if finished:
+                self._finished.set()
+        if finished:
+            self.print_timeline("Boot finished")
+
+    def _mark_ready(self):
+        with self._lock:
+            if self._ready.is_set():
+                return
+            self.ready_at = time.perf_counter()
+            self.ready_wall = time.time()
+            self._ready.set()
+        failed = [s.name for s in self._stages.values() if s.ready and s.status != OK]
+        tracing.record("boot.ready", self.ready_ms, failed=failed or None)
+        note = f" (not ok: {', '.join(failed)})" if failed else ""
+        print(f"JARVIS ready to accept a command {self.ready_ms:.0f} ms after start{note}")
+        if not all(s.done for s in self._stages.values()):
+            # otherwise the "Boot finished" timeline right after says the same
+            self.print_timeline()
@@ -0,0 +1,156 @@
+"""
+Concurrent "briefing" command for JARVIS
+Weather for the configured cities, headlines per category and optional
+YouTube/AI sections are fetched at the same time with asyncio. Each section
+is spoken as soon as it is ready, and anything still missing at the global
+deadline is dropped, so the briefing takes about as long as the slowest
+provider that made it, not the sum of all of them.
+"""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from engine.config import (APIKeys, BRIEFING_AI_PROMPT, BRIEFING_CITIES, BRIEFING_DEADLINE_SECONDS,
+                           BRIEFING_NEWS_CATEGORIES, BRIEFING_YOUTUBE_QUERY)
+from engine.http_client import base_url, http_client
+from engine.response_cache import response_cache
+
+HEADLINES_PER_CATEGORY = 3
+
+# Blocking HTTP calls run here; the shared session keeps their connections warm
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="jarvis-briefing")
+
+
+async def fetch_json(url, params=None, provider='default'):
+    """Cached GET on the briefing thread pool, returns (status_code, data)"""
+    loop = asyncio.get_running_loop()
+    # copy the context so HTTP spans keep the current turn ID on the pool thread
+    context = contextvars.copy_context()
+    response = await loop.run_in_executor(
+        _executor, context.run, lambda: response_cache.get(url, params=params, provider=provider))
+    return response.status_code, response.json()
+
+
+async def post_json(url, payload, headers, provider='default'):
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    response = await loop.run_in_executor(
+        _executor, context.run, lambda: http_client.post(url, json=payload, headers=headers, provider=provider))
+    return response.status_code, response.json()
+
+
+async def weather_section(city):
+    status, data = await fetch_json(
+        f"{base_url('openweathermap')}/data/2.5/weather",
+        {"q": city, "appid": APIKeys.OPENWEATHER_API_KEY, "units": "metric"}, 'openweathermap')
+    if status != 200:
+        return None
+    return f"Weather in {city}: {data['weather'][0]['description']}, {data['main']['temp']} degrees Celsius"
+
+
+async def news_section(category):
+    status, data = await fetch_json(
+        f"{base_url('newsapi')}/v2/top-headlines",
+        {"apiKey": APIKeys.NEWS_API_KEY, "country": "in", "category": category,
+         "pageSize": HEADLINES_PER_CATEGORY}, 'newsapi')
+    articles = data.get("articles", []) if status == 200 else []
+    if not articles:
+        return None
+    headlines = ". ".join(article["title"] for article in articles)
+    return f"Top {category} headlines: {headlines}"
+
+
+async def youtube_section(query):
+    status, data = await fetch_json(
+        f"{base_url('youtube')}/youtube/v3/search",
+        {"key": APIKeys.YOUTUBE_API_KEY, "q": query, "part": "snippet", "type": "video", "maxResults": 1},
+        'youtube')
+    videos = data.get("items", []) if status == 200 else []
+    if not videos:
+        return None
+    return f"On YouTube for {query}: {videos[0]['snippet']['title']}"
+
+
+async def ai_section(prompt):
+    status, data = await post_json(
+        f"{base_url('openai')}/v1/chat/completions",
+        {"model": "gpt-3.5-turbo", "max_tokens": 80,
+         "messages": [{"role": "system", "content": "You are JARVIS, a helpful AI assistant."},
+                      {"role": "user", "content": prompt}]},
+        {"Authorization": f"Bearer {APIKeys.OPENAI_API_KEY}"}, 'openai')
+    if status != 200:
+        return None
+    return data["choices"][0]["message"]["content"].strip()
+
+
+def briefing_sections():
+    """(label, coroutine factory) for every section that has an API key configured"""
+    sections = []
+    if APIKeys.OPENWEATHER_API_KEY:
+        sections += [(f"weather {city}", lambda city=city: weather_section(city)) for city in BRIEFING_CITIES]
+    if APIKeys.NEWS_API_KEY:
+        sections += [(f"{category} news", lambda category=category: news_section(category))
+                     for category in BRIEFING_NEWS_CATEGORIES]
+    if APIKeys.YOUTUBE_API_KEY and BRIEFING_YOUTUBE_QUERY:
+        sections.append(("youtube", lambda: youtube_section(BRIEFING_YOUTUBE_QUERY)))
+    if APIKeys.OPENAI_API_KEY and BRIEFING_AI_PROMPT:
+        sections.append(("ai", lambda: ai_section(BRIEFING_AI_PROMPT)))
+    return sections
+
+
+async def gather_briefing(sections, on_ready, deadline=BRIEFING_DEADLINE_SECONDS):
+    """Run every section concurrently, calling on_ready(label, text) in completion order
+
+    Returns a report with per-section latency; sections that miss the
+    deadline or fail are listed but never block the others.
+    """
+    start = time.perf_counter()
+    report = {"sections": {}, "late": [], "failed": []}
+
+    async def timed(label, factory):
+        began = time.perf_counter()
+        try:
+            return label, await factory(), time.perf_counter() - began, None
+        except Exception as e:
+            return label, None, time.perf_counter() - began, e
+
+    tasks = [asyncio.ensure_future(timed(label, factory)) for label, factory in sections]
+    pending = set(tasks)
+    try:
+        for next_done in asyncio.as_completed(tasks, timeout=deadline):
+            label, text, seconds, error = await next_done
+            pending = {t for t in pending if not t.done()}
+            report["sections"][label] = seconds
+            if error is not None:
+                print(f"Briefing section '{label}' failed: {error}")
+                report["failed"].append(label)
+            elif text:
+                on_ready(label, text)
+    except asyncio.TimeoutError:
+        for task in pending:
+            task.cancel()
+        done_labels = set(report["sections"])
+        report["late"] = [label for label, _ in sections if label not in done_labels]
+
+    report["wall_seconds"] = time.perf_counter() - start
+    return report
+
+
+def run_briefing(speak, deadline=BRIEFING_DEADLINE_SECONDS):
+    """Fetch and speak the briefing; returns the timing report"""
+    sections = briefing_sections()
+    if not sections:
+        speak("No briefing sources are configured. Please add weather or news API keys.")
+        return None
+
+    speak("Here is your briefing.")
+    report = asyncio.run(gather_briefing(sections, lambda label, text: speak(text), deadline))
+
+    if report["late"]:
+        speak(f"{', '.join(report['late'])} did not answer in time.")
+    slowest = max(report["sections"].values(), default=0.0)
+    print(f"Briefing: {len(report['sections'])}/{len(sections)} sections in {report['wall_seconds']:.2f}s "
+          f"(slowest {slowest:.2f}s, sum {sum(report['sections'].values()):.2f}s)")
+    return report
@@ -1,39 +1,50 @@
-import pyttsx3
-import speech_recognition as sr
 import eel
-import time
-
-
-def speak(text):    
-    engine = pyttsx3.init('sapi5')
-    voices = engine.getProperty('voices')
-    engine.setProperty('voice', voices[0].id)
-    engine.setProperty('rate', 180)
-    eel.DisplayMessage(text)  # type: ignore
-    engine.say(text)
-    eel.receiverText(text)  # type: ignore
-    engine.runAndWait()
+from engine import tracing
+from engine.gevent_bridge import bridge
+from engine.jobs import CANCELLED, FAILED, INTERACTIVE, TIMED_OUT, Job, jobs
+from engine.listener import listener
+from engine.router import router
+from engine.stt import stt_router
+from engine.tts import speech_service
+from engine.wake_channel import wake_latency
+
+
+def speak(text, wait=False):
+    """Show text in the UI and queue it on the background speech worker"""
+    # handlers and jobs speak from worker threads; eel's websocket belongs to the hub
+    bridge.to_hub(eel.DisplayMessage, text)  # type: ignore
+    bridge.to_hub(eel.receiverText, text)  # type: ignore
+    if wait:
+        return bridge.run(speech_service.speak, text, wait=True)
+    return speech_service.speak(text)
 
 @eel.expose
 
 def takeCommand():
 
-    r= sr.Recognizer()
+    # don't let the microphone pick up JARVIS's own pending speech
+    # (blocking waits go through the bridge so the UI keeps updating meanwhile)
+    bridge.run(speech_service.wait_idle)
 
-    with sr.Microphone() as source:
+    def onListening():
+        wake_latency.mark_listening()
         print("Listening...")
-        eel.DisplayMessage("Listening...")  # type: ignore
-        r.pause_threshold = 1
-        r.adjust_for_ambient_noise(source)
-        audio = r.listen(source,10,6)
+        bridge.to_hub(eel.DisplayMessage, "Listening...")  # type: ignore
+
+    # the microphone stays open and calibrated between turns; after a wake
+    # word the turn starts right where the wake word ended
+    wake = wake_latency.pending()
+    audio, timings = bridge.run(listener.listen, 10, 6, on_listening=onListening,
+                                since=wake and wake.get("sequence"))
     
     try:
         print("Recognizing...")
-        eel.DisplayMessage("Recognizing...")  # type: ignore
-        query = r.recognize_google(audio, language='en-in')
+        bridge.to_hub(eel.DisplayMessage, "Recognizing...")  # type: ignore
+        result = bridge.run(listener.recognize, audio, timings, lambda r, a: stt_router.transcribe(a, r))
+        query = result.text
+        print(f"Recognized by {result.backend} in {result.seconds:.2f}s")
         print(f"User said: {query}\n")
-        eel.DisplayMessage(query)  # type: ignore
-        time.sleep(2)
+        bridge.to_hub(eel.DisplayMessage, query)  # type: ignore
         
 
     except Exception as e:
@@ -49,22 +60,27 @@ def allCommand(message=1):
         # Voice mode - continuous listening
         while True:
             try:
-                query = takeCommand().strip()
-                print(query)    
-                eel.senderText(query)
-                if query == "":   # silence
-                    eel.ShowHood()  # type: ignore
-                    break
-                    
-
-                elif "stop listening" in query:
-                    speak("Okay, I will stop listening.")
-                    eel.ShowHood()  # type: ignore
-                    break
-                    
-                else:
-                    # Process the command
-                    processCommand(query)
+                # one trace ID per turn; a wake word already started one in the hotword process
+                wake = wake_latency.pending()
+                tracing.new_turn(wake and wake.get("turn"))
+                with tracing.span("turn", mode="voice"):
+                    query = takeCommand().strip()
+                    print(query)    
+                    eel.senderText(query)
+                    if query == "":   # silence
+                        eel.ShowHood()  # type: ignore
+                        break
+                        
+
+                    elif "stop listening" in query:
+                        speak("Okay, I will stop listening.")
+                        eel.ShowHood()  # type: ignore
+                        break
+                        
+                    else:
+                        # Process the command; handlers hit sqlite, the network and the
+                        # microphone, so they run off the hub
+                        bridge.run(processCommand, query)
                     
                     
             except Exception as e:
@@ -79,82 +95,157 @@ def allCommand(message=1):
         
         if query:
             # Process the command and return to main screen
-            processCommand(query)
+            tracing.new_turn()
+            with tracing.span("turn", mode="text"):
+                bridge.run(processCommand, query)
             eel.ShowHood()  # type: ignore
         else:
             print("Empty message received")
             eel.ShowHood()  # type: ignore
 
-def processCommand(query):
-    """Process a single command from either voice or text input"""
+# handlers that only forward to engine.features are registered by path and
+# imported on the first query that needs them (see engine.lazy)
+router.register("open", "engine.features:openCommand", prefixes=["open"], priority=100)
+router.register("youtube", "engine.features:PlayYoutube", prefixes=["play"], requires=["on youtube"], priority=90,
+                job=True, timeout=30)
+
+
+@router.intent("cancel", phrases=["cancel that", "cancel it", "never mind"], priority=95)
+def handleCancel(query):
+    # the most recent command still queued or running in the background
+    pending = [job for job in jobs.active() if job.priority == INTERACTIVE]
+    if not pending:
+        speak("There's nothing to cancel.")
+        return
+    job = pending[-1]
+    jobs.cancel(job.id)
+    speak(f"Okay, cancelled {job.name}.")
+
+
+@router.intent("briefing", phrases=["briefing", "brief me", "daily brief"], priority=85, job=True, timeout=30)
+def handleBriefing(query):
+    # Weather, news and other sections fetched concurrently, spoken as they arrive
     try:
-        if query.startswith("open "):
-            from engine.features import openCommand
-            openCommand(query)
-
-        elif query.startswith("play ") and "on youtube" in query:
-            from engine.features import PlayYoutube
-            PlayYoutube(query)
-
-        elif "send message" in query or "phone call" in query or "video call" in query:
-            from engine.features import findContact, whatsApp, makeCall, sendMessage
-            contact_no, name = findContact(query)
-            if(contact_no != 0):
-                speak("Which mode you want to use whatsapp or mobile")
-                preferance = takeCommand()
-                print(preferance)
-
-                if "mobile" in preferance:
-                    if "send message" in query or "send sms" in query: 
-                        speak("what message to send")
-                        message = takeCommand()
-                        sendMessage(message, contact_no, name)
-                    elif "phone call" in query:
-                        makeCall(name, contact_no)
-                    else:
-                        speak("please try again")
-                elif "whatsapp" in preferance:
-                    message = ""
-                    if "send message" in query:
-                        message = 'message'
-                        speak("what message to send")
-                        query = takeCommand()
-                                        
-                    elif "phone call" in query:
-                        message = 'call'
-                    else:
-                        message = 'video call'
-                                        
-                    whatsApp(contact_no, query, message, name)
+        from engine.briefing import run_briefing
+        run_briefing(speak)
+    except ImportError:
+        speak("Briefing feature not available. Please check your configuration.")
 
-        elif "weather" in query:
-            # Handle weather commands with API
-            try:
-                from engine.api_examples import handle_weather_command
-                handle_weather_command(query)
-            except ImportError:
-                speak("Weather API feature not available. Please check your configuration.")
 
-        elif "news" in query or "headlines" in query:
-            # Handle news commands with API
-            try:
-                from engine.api_examples import handle_news_command
-                handle_news_command(query)
-            except ImportError:
-                speak("News API feature not available. Please check your configuration.")
+@router.intent("api_status", phrases=["api status", "check apis"], priority=80, job=True, timeout=30)
+def handleApiStatus(query):
+    # Check API configuration status
+    try:
+        from engine.api_examples import handle_api_status_command
+        handle_api_status_command()
+    except ImportError:
+        speak("API management feature not available.")
+
+
+@router.intent("contact", phrases=["send message", "phone call", "video call"], priority=70)
+def handleContact(query):
+    from engine.features import findContact, whatsApp
+    contact_no, name = findContact(query)
+    if(contact_no != 0):
+        speak("Which mode you want to use whatsapp or mobile")
+        preferance = takeCommand()
+        print(preferance)
+
+        if "mobile" in preferance:
+            # only imported here: the mobile helpers aren't in every build of features.py,
+            # and a failed import used to break WhatsApp messages and calls as well
+            from engine.features import makeCall, sendMessage
+            if "send message" in query or "send sms" in query: 
+                speak("what message to send")
+                message = takeCommand()
+                sendMessage(message, contact_no, name)
+            elif "phone call" in query:
+                makeCall(name, contact_no)
+            else:
+                speak("please try again")
+        elif "whatsapp" in preferance:
+            message = ""
+            if "send message" in query:
+                message = 'message'
+                speak("what message to send")
+                query = takeCommand()
+                                
+            elif "phone call" in query:
+                message = 'call'
+            else:
+                message = 'video call'
+
+            # the browser/WhatsApp automation takes several seconds; keep listening meanwhile
+            if message == 'message':
+                speak(f"Sending it to {name}.")
+            jobs.submit(whatsApp, contact_no, query, message, name, name=f"whatsapp {message}",
+                        priority=INTERACTIVE, timeout=45, on_done=reportJob)
+
+
+@router.intent("weather", phrases=["weather"], priority=50, job=True, timeout=20)
+def handleWeather(query):
+    # Handle weather commands with API
+    try:
+        from engine.api_examples import handle_weather_command
+        handle_weather_command(query)
+    except ImportError:
+        speak("Weather API feature not available. Please check your configuration.")
 
-        elif "api status" in query or "check apis" in query:
-            # Check API configuration status
-            try:
-                from engine.api_examples import handle_api_status_command
-                handle_api_status_command()
-            except ImportError:
-                speak("API management feature not available.")
 
-        else:
+@router.intent("news", phrases=["news", "headlines"], priority=50, job=True, timeout=20)
+def handleNews(query):
+    # Handle news commands with API
+    try:
+        from engine.api_examples import handle_news_command
+        handle_news_command(query)
+    except ImportError:
+        speak("News API feature not available. Please check your configuration.")
+
+
+def reportJob(job):
+    """Tell the user when a background command didn't complete"""
+    if job.state == FAILED:
+        print(f"Error processing command '{job.name}': {job.error}")
+        speak("Sorry, I encountered an error processing that command.")
+    elif job.state == TIMED_OUT:
+        speak(f"Sorry, {job.name} is taking too long, I've stopped waiting for it.")
+    elif job.state == CANCELLED:
+        print(f"Job {job.id} ({job.name}) cancelled")
+
+
+def processCommand(query):
+    """Process a single command from either voice or text input
+
+    Network and automation handlers run as jobs: this returns as soon as they
+    are queued, so the caller can go back to listening.
+    """
+    try:
+        result = router.dispatch(query, on_done=reportJob)
+        if not result:
             speak(f"I'm not sure how to handle: {query}")
             print("Command not recognized")
+        elif isinstance(result, Job):
+            print(f"Started job {result.id}: {result.name}")
+            bridge.to_hub(eel.DisplayMessage, "Working on it...")  # type: ignore
             
     except Exception as e:
         print(f"Error processing command '{query}': {e}")
         speak("Sorry, I encountered an error processing that command.")
+
+
+@eel.expose
+def jobStatus():
+    """Queued, running and recently finished jobs, for the UI to poll"""
+    return jobs.status()
+
+
+@eel.expose
+def cancelJob(job_id):
+    return jobs.cancel(int(job_id))
+
+
+@eel.expose
+def workerStatus():
+    """CPU, memory, uptime and restarts of each run.py process, as last sent by the supervisor"""
+    from engine.supervisor import worker
+    return worker.workers
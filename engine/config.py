@@ -6,6 +6,46 @@ load_dotenv()
 
 ASSISTANT_NAME = "jarvis"
 
+# API response cache: seconds a response stays fresh, per provider
+API_CACHE_TTLS = {
+    'openweathermap': int(os.getenv('JARVIS_CACHE_TTL_OPENWEATHERMAP', 600)),
+    'newsapi': int(os.getenv('JARVIS_CACHE_TTL_NEWSAPI', 900)),
+    'youtube': int(os.getenv('JARVIS_CACHE_TTL_YOUTUBE', 3600)),
+}
+# How long past its TTL a response may still be served while it refreshes in the background;
+# minutes for weather, which is wrong when it's old, longer for headlines and search results
+API_CACHE_STALE = {
+    'openweathermap': int(os.getenv('JARVIS_CACHE_STALE_OPENWEATHERMAP', 1200)),
+    'newsapi': int(os.getenv('JARVIS_CACHE_STALE_NEWSAPI', 3 * 3600)),
+    'youtube': int(os.getenv('JARVIS_CACHE_STALE_YOUTUBE', 86400)),
+}
+
+# "briefing" command: what to fetch and how long to wait for it
+BRIEFING_CITIES = [c.strip() for c in os.getenv('JARVIS_BRIEFING_CITIES', 'Delhi').split(',') if c.strip()]
+BRIEFING_NEWS_CATEGORIES = [c.strip() for c in os.getenv('JARVIS_BRIEFING_NEWS', 'general,technology').split(',') if c.strip()]
+BRIEFING_YOUTUBE_QUERY = os.getenv('JARVIS_BRIEFING_YOUTUBE', '')
+BRIEFING_AI_PROMPT = os.getenv('JARVIS_BRIEFING_AI_PROMPT', '')
+BRIEFING_DEADLINE_SECONDS = float(os.getenv('JARVIS_BRIEFING_DEADLINE', 6))
+
+# Speech-to-text: backends in order of preference, and how long one may take before failing over
+STT_BACKENDS = [b.strip() for b in os.getenv('JARVIS_STT_BACKENDS', 'google,azure,vosk').split(',') if b.strip()]
+STT_LANGUAGE = os.getenv('JARVIS_STT_LANGUAGE', 'en-in')
+STT_TIMEOUT_SECONDS = float(os.getenv('JARVIS_STT_TIMEOUT', 4))
+# race a second backend when the first is slower than its usual p90
+STT_HEDGE = os.getenv('JARVIS_STT_HEDGE', '0').lower() in ('1', 'true', 'yes', 'on')
+# offline model for the "vosk" backend (https://alphacephei.com/vosk/models)
+VOSK_MODEL_PATH = os.getenv('JARVIS_VOSK_MODEL', 'models/vosk-model-small-en-in-0.4')
+
+# Per-turn latency traces (see `python -m engine.tracing`)
+TRACE_ENABLED = os.getenv('JARVIS_TRACE', '1').lower() in ('1', 'true', 'yes', 'on')
+TRACE_DIR = os.getenv('JARVIS_TRACE_DIR', os.path.join('logs', 'traces'))
+
+# Import deferred command dependencies in the background once the UI is up (see engine.lazy)
+PREWARM_ENABLED = os.getenv('JARVIS_PREWARM', '1').lower() in ('1', 'true', 'yes', 'on')
+
+# Worker threads for blocking command work and background refreshes (see engine.jobs)
+JOB_WORKERS = int(os.getenv('JARVIS_JOB_WORKERS', 4))
+
 # API Keys Configuration
 class APIKeys:
     # Speech Recognition
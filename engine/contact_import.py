@@ -0,0 +1,205 @@
+"""
+Bulk contact importer for JARVIS
+Streams a Google-contacts CSV, maps columns by header name and upserts every
+row on its normalised phone key and name inside a single transaction. The source file's
+size/mtime/hash are recorded so an unchanged file is skipped at startup.
+"""
+
+import csv
+import hashlib
+import os
+import re
+import time
+
+from engine.phonetic import ensure_phonetic_column, phonetic_key
+
+NAME_COLUMNS = ["First Name", "Middle Name", "Last Name"]
+FULL_NAME_COLUMNS = ["Name", "Display Name", "File As", "Nickname"]
+PHONE_COLUMNS = ["Phone 1 - Value", "Phone 2 - Value", "Phone 3 - Value", "Mobile Phone", "Phone"]
+EMAIL_COLUMNS = ["E-mail 1 - Value", "Email 1 - Value", "E-mail Address", "Email"]
+
+_DIGITS_RE = re.compile(r"\D+")
+
+CONTACT_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS contacts(
+        id integer primary key,
+        name VARCHAR(200),
+        mobile_no VARCHAR(255),
+        email VARCHAR(255) NULL,
+        phonetic_key VARCHAR(200),
+        phone_key VARCHAR(20)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS contact_imports(
+        source VARCHAR(500) PRIMARY KEY,
+        sha256 VARCHAR(64),
+        mtime REAL,
+        size INTEGER,
+        rows INTEGER,
+        imported_at REAL
+    )''',
+]
+
+# Contacts are unique per (phone_key, name): a shared landline or office
+# number can belong to several people, a re-import of the same person can't
+STAGE_SCHEMA = '''CREATE TEMP TABLE IF NOT EXISTS contacts_incoming(
+    name VARCHAR(200),
+    mobile_no VARCHAR(255),
+    email VARCHAR(255) NULL,
+    phonetic_key VARCHAR(200),
+    phone_key VARCHAR(20)
+)'''
+
+STAGE_INDEX = "CREATE INDEX IF NOT EXISTS temp.idx_incoming_phone_key ON contacts_incoming(phone_key)"
+
+STAGE_CONTACT = '''INSERT INTO contacts_incoming (name, mobile_no, email, phonetic_key, phone_key)
+    VALUES (?, ?, ?, ?, ?)'''
+
+# a number listed under one name in the file and one other name in the table was renamed
+RENAME_CONTACTS = '''UPDATE contacts SET
+        name = (SELECT i.name FROM contacts_incoming i WHERE i.phone_key = contacts.phone_key),
+        phonetic_key = (SELECT i.phonetic_key FROM contacts_incoming i WHERE i.phone_key = contacts.phone_key)
+    WHERE phone_key IN (SELECT phone_key FROM contacts_incoming GROUP BY phone_key HAVING COUNT(DISTINCT name) = 1)
+        AND phone_key IN (SELECT phone_key FROM contacts WHERE phone_key IS NOT NULL
+                          GROUP BY phone_key HAVING COUNT(*) = 1)
+        AND name IS NOT (SELECT i.name FROM contacts_incoming i WHERE i.phone_key = contacts.phone_key)'''
+
+UPSERT_CONTACTS = '''INSERT INTO contacts (name, mobile_no, email, phonetic_key, phone_key)
+    SELECT name, mobile_no, email, phonetic_key, phone_key FROM contacts_incoming WHERE true
+    ON CONFLICT(phone_key, name) DO UPDATE SET
+        mobile_no = excluded.mobile_no,
+        email = COALESCE(excluded.email, contacts.email),
+        phonetic_key = excluded.phonetic_key
+    WHERE contacts.mobile_no IS NOT excluded.mobile_no
+        OR contacts.phonetic_key IS NOT excluded.phonetic_key
+        OR (excluded.email IS NOT NULL AND contacts.email IS NOT excluded.email)'''
+
+
+def phone_key(number):
+    """Last ten digits of the first number in a field, so +91/0 prefixes collapse"""
+    first = str(number or "").split(":::")[0]
+    digits = _DIGITS_RE.sub("", first)
+    return digits[-10:] if len(digits) >= 6 else None
+
+
+def ensure_contact_schema(conn):
+    """Create/upgrade the contacts table with phonetic and phone keys"""
+    cursor = conn.cursor()
+    for statement in CONTACT_SCHEMA:
+        cursor.execute(statement)
+    ensure_phonetic_column(conn)
+
+    cursor.execute("PRAGMA table_info(contacts)")
+    if "phone_key" not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE contacts ADD COLUMN phone_key VARCHAR(20)")
+
+    cursor.execute("SELECT id, mobile_no FROM contacts WHERE phone_key IS NULL")
+    rows = [(phone_key(mobile_no), contact_id) for contact_id, mobile_no in cursor.fetchall()]
+    if rows:
+        cursor.executemany("UPDATE contacts SET phone_key = ? WHERE id = ?", rows)
+        # older imports re-inserted everything on each run, keep the first copy of each
+        # person; different names on one number are different people and all stay
+        cursor.execute('''DELETE FROM contacts WHERE phone_key IS NOT NULL AND id NOT IN (
+                          SELECT MIN(id) FROM contacts WHERE phone_key IS NOT NULL
+                          GROUP BY phone_key, name)''')
+    # replaced by the (phone_key, name) index, it only allowed one contact per number
+    cursor.execute("DROP INDEX IF EXISTS idx_contacts_phone_key")
+    cursor.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_contacts_phone_key_name
+                      ON contacts(phone_key, name)''')
+    conn.commit()
+
+
+def _first(row, columns):
+    for column in columns:
+        value = (row.get(column) or "").strip()
+        if value:
+            return value
+    return ""
+
+
+def _row_name(row):
+    name = " ".join(part for part in ((row.get(c) or "").strip() for c in NAME_COLUMNS) if part)
+    return name or _first(row, FULL_NAME_COLUMNS)
+
+
+def read_contacts(path):
+    """Stream (name, mobile_no, email, phonetic_key, phone_key) tuples from a CSV"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as csvfile:
+        for row in csv.DictReader(csvfile):
+            name = _row_name(row)
+            mobile = _first(row, PHONE_COLUMNS).split(":::")[0].strip()
+            key = phone_key(mobile)
+            if name and key:
+                yield (name, mobile, _first(row, EMAIL_COLUMNS) or None, phonetic_key(name), key)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def import_contacts(conn, path='contacts.csv', force=False):
+    """Import a contacts CSV, returns a dict of what happened
+
+    Unchanged files (same size and mtime, or same hash) are skipped.
+    """
+    started = time.perf_counter()
+    ensure_contact_schema(conn)
+    cursor = conn.cursor()
+
+    source = os.path.abspath(path)
+    stat = os.stat(path)
+    cursor.execute("SELECT sha256, mtime, size FROM contact_imports WHERE source = ?", (source,))
+    previous = cursor.fetchone()
+
+    if previous and not force and previous[1] == stat.st_mtime and previous[2] == stat.st_size:
+        return {"skipped": True, "rows": 0, "seconds": time.perf_counter() - started}
+
+    sha256 = file_sha256(path)
+    if previous and not force and previous[0] == sha256:
+        with conn:
+            conn.execute("UPDATE contact_imports SET mtime = ?, size = ? WHERE source = ?",
+                         (stat.st_mtime, stat.st_size, source))
+        return {"skipped": True, "rows": 0, "seconds": time.perf_counter() - started}
+
+    rows = 0
+
+    def counted(records):
+        nonlocal rows
+        for record in records:
+            rows += 1
+            yield record
+
+    cursor.execute("SELECT COUNT(*) FROM contacts")
+    before = cursor.fetchone()[0]
+    with conn:
+        conn.execute(STAGE_SCHEMA)
+        conn.execute(STAGE_INDEX)
+        conn.execute("DELETE FROM contacts_incoming")
+        conn.executemany(STAGE_CONTACT, counted(read_contacts(path)))
+        conn.execute(RENAME_CONTACTS)
+        conn.execute(UPSERT_CONTACTS)
+        conn.execute("DELETE FROM contacts_incoming")
+        conn.execute('''INSERT OR REPLACE INTO contact_imports (source, sha256, mtime, size, rows, imported_at)
+                        VALUES (?, ?, ?, ?, ?, ?)''',
+                     (source, sha256, stat.st_mtime, stat.st_size, rows, time.time()))
+
+    seconds = time.perf_counter() - started
+    cursor.execute("SELECT COUNT(*) FROM contacts")
+    return {
+        "skipped": False,
+        "rows": rows,
+        "added": cursor.fetchone()[0] - before,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds > 0 else 0.0,
+    }
+
+
+def sync_contacts(csv_path='contacts.csv'):
+    """Startup hook: import contacts.csv only if it changed since the last run"""
+    if not os.path.exists(csv_path):
+        return None
+    from engine.database import database
+    return import_contacts(database.connection(), csv_path)
@@ -0,0 +1,259 @@
+"""
+In-memory contact index for JARVIS
+Names from the contacts table are normalised and indexed by trigrams so
+findContact can rank fuzzy matches instead of scanning with LIKE
+"""
+
+import re
+import sqlite3
+import threading
+from collections import Counter
+
+_NAME_RE = re.compile(r"[^a-z0-9 ]+")
+
+# How many trigram candidates get the (slower) edit-distance scoring
+RESCORE_LIMIT = 64
+
+# Below this score a match is a guess and findContact tries the phonetic index first
+MIN_CONFIDENT_SCORE = 1.5
+
+# Below this even the best match is an unrelated name, and findContact reports no contact
+MIN_MATCH_SCORE = 1.0
+
+CHANGE_LOG_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS contacts_changes(
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        contact_id INTEGER,
+        op VARCHAR(10)
+    )''',
+    '''CREATE TRIGGER IF NOT EXISTS contacts_changes_insert AFTER INSERT ON contacts
+    BEGIN
+        INSERT INTO contacts_changes(contact_id, op) VALUES (NEW.id, 'upsert');
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS contacts_changes_update AFTER UPDATE ON contacts
+    BEGIN
+        INSERT INTO contacts_changes(contact_id, op) VALUES (OLD.id, 'delete');
+        INSERT INTO contacts_changes(contact_id, op) VALUES (NEW.id, 'upsert');
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS contacts_changes_delete AFTER DELETE ON contacts
+    BEGIN
+        INSERT INTO contacts_changes(contact_id, op) VALUES (OLD.id, 'delete');
+    END''',
+]
+
+
+def normalise_name(name):
+    """Lower-case, drop punctuation and collapse whitespace"""
+    return " ".join(_NAME_RE.sub(" ", str(name or "").lower()).split())
+
+
+def trigrams(text):
+    """Trigrams of every token, padded so short prefixes still produce grams"""
+    grams = set()
+    for token in text.split():
+        padded = f"  {token} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def edit_distance(a, b, limit=None):
+    """Levenshtein distance, gives up early once every path exceeds limit"""
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class ContactMatch:
+    """One ranked search result"""
+
+    def __init__(self, score, contact_id, name, mobile_no):
+        self.score = score
+        self.contact_id = contact_id
+        self.name = name
+        self.mobile_no = mobile_no
+
+    def __repr__(self):
+        return f"ContactMatch({self.name!r}, {self.mobile_no!r}, score={self.score:.2f})"
+
+
+class ContactIndex:
+    """Trigram index over contact names with prefix, token and edit-distance scoring"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._contacts = {}
+        self._grams = {}
+        self._last_seq = None
+
+    def __len__(self):
+        return len(self._contacts)
+
+    @property
+    def loaded(self):
+        return self._last_seq is not None
+
+    def add(self, contact_id, name, mobile_no):
+        norm = normalise_name(name)
+        with self._lock:
+            self.remove(contact_id)
+            if not norm or not mobile_no:
+                return
+            self._contacts[contact_id] = (name, norm, mobile_no)
+            for gram in trigrams(norm):
+                self._grams.setdefault(gram, set()).add(contact_id)
+
+    def remove(self, contact_id):
+        with self._lock:
+            entry = self._contacts.pop(contact_id, None)
+            if entry is None:
+                return
+            for gram in trigrams(entry[1]):
+                ids = self._grams.get(gram)
+                if ids is not None:
+                    ids.discard(contact_id)
+                    if not ids:
+                        del self._grams[gram]
+
+    def build(self, conn):
+        """Load every contact and install the change-log triggers"""
+        cursor = conn.cursor()
+        for statement in CHANGE_LOG_SCHEMA:
+            cursor.execute(statement)
+        conn.commit()
+
+        cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM contacts_changes")
+        last_seq = cursor.fetchone()[0]
+        cursor.execute("SELECT id, name, mobile_no FROM contacts")
+        rows = cursor.fetchall()
+
+        with self._lock:
+            self._contacts = {}
+            self._grams = {}
+            for contact_id, name, mobile_no in rows:
+                self.add(contact_id, name, mobile_no)
+            self._last_seq = last_seq
+
+        # everything up to last_seq is reflected in the fresh index
+        cursor.execute("DELETE FROM contacts_changes WHERE seq <= ?", (last_seq,))
+        conn.commit()
+        return len(self._contacts)
+
+    def refresh(self, conn):
+        """Apply rows changed since the last build/refresh, returns the number applied"""
+        if not self.loaded:
+            self.build(conn)
+            return len(self._contacts)
+
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT seq, contact_id, op FROM contacts_changes WHERE seq > ? ORDER BY seq", (self._last_seq,))
+        changes = cursor.fetchall()
+        if not changes:
+            return 0
+
+        with self._lock:
+            for seq, contact_id, op in changes:
+                if op == 'delete':
+                    self.remove(contact_id)
+                else:
+                    cursor.execute("SELECT name, mobile_no FROM contacts WHERE id = ?", (contact_id,))
+                    row = cursor.fetchone()
+                    if row is None:
+                        self.remove(contact_id)
+                    else:
+                        self.add(contact_id, row[0], row[1])
+                self._last_seq = seq
+        return len(changes)
+
+    def refresh_if_changed(self, db):
+        """refresh() only when the change log has moved past what the index applied
+
+        The check is one MAX(seq) on this thread's read-only connection, so a
+        lookup with nothing new never touches the write connection.
+        """
+        if self.loaded:
+            try:
+                latest = db.reader().execute("SELECT MAX(seq) FROM contacts_changes").fetchone()[0]
+            except sqlite3.Error:
+                # no change log yet: refresh() rebuilds and installs it
+                latest = self._last_seq + 1
+            if latest is None or latest <= self._last_seq:
+                return 0
+        return self.refresh(db.connection())
+
+    def search(self, query, k=5):
+        """Top-k contacts for a spoken name, best first"""
+        q = normalise_name(query)
+        if not q:
+            return []
+
+        q_grams = trigrams(q)
+        q_tokens = q.split()
+        with self._lock:
+            overlap = Counter()
+            for gram in q_grams:
+                ids = self._grams.get(gram)
+                if ids:
+                    overlap.update(ids)
+
+            matches = []
+            for contact_id, shared in overlap.most_common(RESCORE_LIMIT):
+                name, norm, mobile_no = self._contacts[contact_id]
+                score = self._score(q, q_tokens, len(q_grams), norm, shared)
+                matches.append(ContactMatch(score, contact_id, name, mobile_no))
+
+        matches.sort(key=lambda m: (-m.score, len(m.name), m.contact_id))
+        return matches[:k]
+
+    def _score(self, q, q_tokens, q_gram_count, norm, shared):
+        tokens = norm.split()
+        score = shared / q_gram_count
+
+        if norm == q:
+            score += 3.0
+        elif norm.startswith(q):
+            score += 1.5
+
+        for q_token in q_tokens:
+            best = 0.0
+            for token in tokens:
+                if token == q_token:
+                    best = 1.2
+                    break
+                if token.startswith(q_token):
+                    best = max(best, 1.0)
+                    continue
+                limit = max(1, len(q_token) // 3)
+                distance = edit_distance(q_token, token, limit)
+                if distance <= limit:
+                    best = max(best, 1.0 - distance / max(len(q_token), len(token)))
+            score += best / len(q_tokens)
+        return score
+
+
+# Global index used by engine.features.findContact
+contact_index = ContactIndex()
+
+
+def warm_up():
+    """Build the global index on this thread's connection, for use from a boot thread"""
+    from engine.database import database
+    try:
+        return contact_index.build(database.connection())
+    except sqlite3.Error as e:
+        print(f"Contact index error: {e}")
+        return 0
@@ -0,0 +1,137 @@
+"""
+Thread-safe SQLite access for JARVIS
+Every thread gets its own long-lived connection to JARVIS.db (plus a separate
+read-only one for lookups), all in WAL mode, so eel handlers, background
+importers and warm-up threads never share a cursor or block each other.
+Connections are kept open so sqlite3's per-connection statement cache turns
+repeated SQL strings into reused prepared statements.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = 'JARVIS.db'
+STATEMENT_CACHE_SIZE = 256
+BUSY_TIMEOUT_MS = 5000
+
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA mmap_size=67108864",
+]
+
+
+class Database:
+    """Per-thread connections to one SQLite file"""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # bumped by close_all(); a thread whose connections are older reopens them
+        self._generation = 0
+        self._changes = 0
+
+    @property
+    def changes(self):
+        """Counter bumped by every write made through this object"""
+        return self._changes
+
+    def connection(self):
+        """This thread's read-write connection"""
+        self._check_generation()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    def reader(self):
+        """This thread's read-only connection, falls back to read-write if the file is missing"""
+        self._check_generation()
+        conn = getattr(self._local, 'reader', None)
+        if conn is None:
+            if os.path.exists(self.path):
+                try:
+                    conn = self._open(read_only=True)
+                except sqlite3.Error:
+                    conn = self.connection()
+            else:
+                conn = self.connection()
+            self._local.reader = conn
+        return conn
+
+    def query(self, sql, params=()):
+        return self.reader().execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        return self.reader().execute(sql, params).fetchone()
+
+    def execute(self, sql, params=()):
+        """Run one write statement in its own transaction"""
+        with self.transaction() as conn:
+            return conn.execute(sql, params)
+
+    def executemany(self, sql, rows):
+        with self.transaction() as conn:
+            return conn.executemany(sql, rows)
+
+    @contextmanager
+    def transaction(self):
+        """Commit on success, roll back on error"""
+        conn = self.connection()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        with self._lock:
+            self._changes += 1
+
+    def close_all(self):
+        """Close this thread's connections and have every other thread reopen its own
+
+        sqlite3 connections may only be closed by the thread that opened
+        them, so other threads close theirs on their next connection()/reader().
+        """
+        with self._lock:
+            self._generation += 1
+        self._check_generation()
+
+    def _check_generation(self):
+        if getattr(self._local, 'generation', 0) == self._generation:
+            return
+        for name in ('reader', 'conn'):
+            conn = getattr(self._local, name, None)
+            if conn is not None:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+                setattr(self._local, name, None)
+        self._local.generation = self._generation
+
+    def _open(self, read_only=False):
+        if read_only:
+            uri = 'file:' + os.path.abspath(self.path).replace('\\', '/') + '?mode=ro'
+            conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT_MS / 1000,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+            conn.execute("PRAGMA query_only=1")
+            for pragma in PRAGMAS[2:]:
+                conn.execute(pragma)
+        else:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+        return conn
+
+
+# Global handle on JARVIS.db
+database = Database()
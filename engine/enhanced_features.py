@@ -3,13 +3,14 @@ Enhanced features for JARVIS with API key support
 This file demonstrates how to integrate various APIs
 """
 
-import requests
 import json
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from engine.config import APIKeys
 from engine.command import speak
+from engine.http_client import base_url
+from engine.response_cache import response_cache
 
 # Weather Feature using OpenWeatherMap API
 def get_weather(city):
@@ -19,14 +20,14 @@ def get_weather(city):
         return
     
     try:
-        base_url = "http://api.openweathermap.org/data/2.5/weather"
+        url = f"{base_url('openweathermap')}/data/2.5/weather"
         params = {
             "q": city,
             "appid": APIKeys.OPENWEATHER_API_KEY,
             "units": "metric"
         }
         
-        response = requests.get(base_url, params=params)
+        response = response_cache.get(url, params=params, provider='openweathermap')
         data = response.json()
         
         if response.status_code == 200:
@@ -54,7 +55,7 @@ def get_latest_news(category="general", count=5):
         return
     
     try:
-        base_url = "https://newsapi.org/v2/top-headlines"
+        url = f"{base_url('newsapi')}/v2/top-headlines"
         params = {
             "apiKey": APIKeys.NEWS_API_KEY,
             "country": "in",  # India
@@ -62,7 +63,7 @@ def get_latest_news(category="general", count=5):
             "pageSize": count
         }
         
-        response = requests.get(base_url, params=params)
+        response = response_cache.get(url, params=params, provider='newsapi')
         data = response.json()
         
         if response.status_code == 200 and data["status"] == "ok":
@@ -164,7 +165,7 @@ def search_youtube_videos(query, max_results=5):
         return
     
     try:
-        base_url = "https://www.googleapis.com/youtube/v3/search"
+        url = f"{base_url('youtube')}/youtube/v3/search"
         params = {
             "key": APIKeys.YOUTUBE_API_KEY,
             "q": query,
@@ -173,7 +174,7 @@ def search_youtube_videos(query, max_results=5):
             "maxResults": max_results
         }
         
-        response = requests.get(base_url, params=params)
+        response = response_cache.get(url, params=params, provider='youtube')
         data = response.json()
         
         if response.status_code == 200:
@@ -208,39 +209,21 @@ def search_youtube_videos(query, max_results=5):
 def enhanced_speech_recognition():
     """Use different speech recognition APIs based on availability"""
     import speech_recognition as sr
+    from engine.listener import listener
+    from engine.stt import stt_router
     
-    r = sr.Recognizer()
-    
-    with sr.Microphone() as source:
-        print("Enhanced listening...")
-        r.pause_threshold = 1
-        r.adjust_for_ambient_noise(source)
-        audio = r.listen(source, 10, 6)
+    audio, timings = listener.listen(10, 6, on_listening=lambda: print("Enhanced listening..."))
     
     try:
-        # Try Google Speech API with key if available
-        if APIKeys.GOOGLE_SPEECH_API_KEY:
-            query = r.recognize_google(audio, key=APIKeys.GOOGLE_SPEECH_API_KEY, language='en-in')
-            print("Used Google Speech API with key")
-        else:
-            # Fall back to free Google Speech Recognition
-            query = r.recognize_google(audio, language='en-in')
-            print("Used free Google Speech Recognition")
+        # Google / Azure / offline model, whichever is healthy and answers in time
+        result = listener.recognize(audio, timings, lambda r, a: stt_router.transcribe(a, r))
+        print(f"Used {result.backend} speech recognition")
         
-        print(f"Enhanced recognition result: {query}")
-        return query.lower()
+        print(f"Enhanced recognition result: {result.text}")
+        return result.text.lower()
         
     except sr.RequestError as e:
         print(f"Speech recognition request error: {e}")
-        # Try Azure Speech if available
-        if APIKeys.AZURE_SPEECH_KEY:
-            try:
-                query = r.recognize_azure(audio, key=APIKeys.AZURE_SPEECH_KEY, location=APIKeys.AZURE_SPEECH_REGION)
-                print("Used Azure Speech Recognition")
-                return query.lower()
-            except Exception as azure_error:
-                print(f"Azure Speech error: {azure_error}")
-        
         speak("Sorry, I couldn't understand that")
         return ""
     
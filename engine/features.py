@@ -1,28 +1,30 @@
 from urllib.parse import quote
-import struct
 import subprocess
-import time
-from playsound import playsound
-import eel
-import pvporcupine
-import pyaudio
-import pyautogui
 from engine.config import ASSISTANT_NAME
 import os
 from engine.command import speak
-import pywhatkit as kit
-import webbrowser
 import sqlite3
 import re
 
+from engine import tracing
+from engine.app_index import resolve_app
+from engine.contact_index import MIN_CONFIDENT_SCORE, MIN_MATCH_SCORE, contact_index
+from engine.database import database
 from engine.helper import extract_yt_term, remove_words
-#Playing Assitant Sound 
+from engine.jobs import jobs
+from engine.lazy import lazy
+from engine.phonetic import ensure_phonetic_column, phonetic_lookup
+
+# imported on first use, see engine.lazy
+playsound = lazy.function('playsound:playsound')
+pyautogui = lazy.module('pyautogui')
+kit = lazy.module('pywhatkit')
+webbrowser = lazy.module('webbrowser')
 
-conn= sqlite3.connect('JARVIS.db')
-cursor= conn.cursor()
+
+#Playing Assitant Sound 
 
 
-@eel.expose
 
 def playAssistantSound():
     music_dir= "www\\assets\\audio\\start_sound.mp3"
@@ -40,24 +42,17 @@ def openCommand(query):
 
     if app_name != "":
         try:
-            # First, check for a system command (local application)
-            cursor.execute(
-                'SELECT path FROM sys_command WHERE LOWER(name) = ?', (app_name.lower(),))
-            sys_results = cursor.fetchone() # Use fetchone() as name should be unique
+            # Resolve against the preloaded sys_command/web_command table
+            target = resolve_app(app_name)
 
-            if sys_results:
+            if target and target[0] == 'sys':
                 speak("Opening "+ app_name)
-                os.startfile(sys_results[0])
+                os.startfile(target[1])
                 return
 
-            # If not a system command, check for a web command
-            cursor.execute(
-                'SELECT url FROM web_command WHERE LOWER(name)  = ?', (app_name.lower(),))
-            web_results = cursor.fetchone()
-
-            if web_results:
+            if target and target[0] == 'web':
                 speak("Opening "+ app_name)
-                webbrowser.open(web_results[0])
+                webbrowser.open(target[1])
                 return
 
             # If not found in DB, try to open it directly as a fallback
@@ -82,45 +77,6 @@ def PlayYoutube(query):
         print(f"YouTube error: {e}")
         speak("Sorry, I couldn't play that on YouTube")
 
-def hotword():
-    porcupine=None
-    paud=None
-    audio_stream=None
-    try:
-       
-        # pre trained keywords    
-        porcupine=pvporcupine.create(keywords=[ASSISTANT_NAME]) 
-        paud=pyaudio.PyAudio()
-        audio_stream=paud.open(rate=porcupine.sample_rate,channels=1,format=pyaudio.paInt16,input=True,frames_per_buffer=porcupine.frame_length)
-        
-        # loop for streaming
-        while True:
-            keyword=audio_stream.read(porcupine.frame_length)
-            keyword=struct.unpack_from("h"*porcupine.frame_length,keyword)
-
-            # processing keyword comes from mic 
-            keyword_index=porcupine.process(keyword)
-
-            # checking first keyword detetcted for not
-            if keyword_index>=0:
-                print("hotword detected")
-
-                # pressing shorcut key win+j
-                import pyautogui as autogui
-                autogui.keyDown("win")
-                autogui.press("j")
-                time.sleep(2)
-                autogui.keyUp("win")
-                
-    except:
-        if porcupine is not None:
-            porcupine.delete()
-        if audio_stream is not None:
-            audio_stream.close()
-        if paud is not None:
-            paud.terminate()
-
-
 #find contacts
 def findContact(query):
     
@@ -129,22 +85,50 @@ def findContact(query):
 
     try:
         query = query.strip().lower()
-        cursor.execute("SELECT mobile_no FROM contacts WHERE LOWER(name) LIKE ? OR LOWER(name) LIKE ?", ('%' + query + '%', query + '%'))
-        results = cursor.fetchall()
-        print(results[0][0])
-        mobile_number_str = str(results[0][0])
+        with tracing.span("contact.lookup"):
+            contact_index.refresh_if_changed(database)
+            results = contact_index.search(query, k=5)
+
+            if results and results[0].score >= MIN_CONFIDENT_SCORE:
+                name, mobile_no = results[0].name, results[0].mobile_no
+            else:
+                # recognize_google often respells names, try the phonetic keys before giving up
+                phonetic_results = phoneticMatches(query)
+                if phonetic_results:
+                    name, mobile_no = phonetic_results[0]
+                elif results and results[0].score >= MIN_MATCH_SCORE:
+                    name, mobile_no = results[0].name, results[0].mobile_no
+                else:
+                    # nothing close enough: dialing the nearest trigram would call a stranger
+                    raise LookupError(query)
+
+        print(name, mobile_no)
+        mobile_number_str = str(mobile_no)
 
         if not mobile_number_str.startswith('+91'):
             mobile_number_str = '+91' + mobile_number_str
 
-        return mobile_number_str, query
+        return mobile_number_str, name
     except:
         speak('not exist in contacts')
         return 0, 0
 
 
+def phoneticMatches(query):
+    try:
+        return phonetic_lookup(database.reader().cursor(), query)
+    except sqlite3.OperationalError:
+        # database created before the phonetic_key column existed
+        ensure_phonetic_column(database.connection())
+        return phonetic_lookup(database.reader().cursor(), query)
+
+
 def whatsApp(mobile_no, message, flag, name):
-    """Send WhatsApp message, make call, or start video call"""
+    """Send WhatsApp message, make call, or start video call
+
+    Runs as a job (see handleContact); the waits are jobs.sleep() so a
+    cancelled or timed-out send stops before it presses any keys.
+    """
     
     try:
         if flag == 'call':
@@ -159,7 +143,7 @@ def whatsApp(mobile_no, message, flag, name):
             # Handle video call - try to open WhatsApp and initiate video call
             whatsapp_url = f"whatsapp://send?phone={mobile_no}"
             subprocess.run(f'start "" "{whatsapp_url}"', shell=True)
-            time.sleep(3)
+            jobs.sleep(3)
             # Video call option is usually accessible via Ctrl+Shift+V in WhatsApp Desktop
             # But we'll just open the chat and let user initiate manually
             jarvis_message = f"Opening chat with {name} for video call"
@@ -171,7 +155,6 @@ def whatsApp(mobile_no, message, flag, name):
             if message and message.strip():
                 try:
                     # Use web-based approach - more reliable
-                    import webbrowser
                     encoded_message = quote(message)
                     whatsapp_web_url = f"https://web.whatsapp.com/send?phone={mobile_no}&text={encoded_message}"
                     
@@ -179,13 +162,13 @@ def whatsApp(mobile_no, message, flag, name):
                     webbrowser.open(whatsapp_web_url)
                     
                     # Give time for page to load
-                    time.sleep(5)
+                    jobs.sleep(5)
                     
                     # Try to click and send (more reliable than complex tab navigation)
                     try:
                         # Click in the center of screen to focus, then send
                         pyautogui.click(pyautogui.size()[0] // 2, pyautogui.size()[1] // 2)
-                        time.sleep(2)
+                        jobs.sleep(2)
                         pyautogui.press('enter')
                         jarvis_message = f"Message sent successfully to {name}"
                     except Exception as gui_error:
@@ -202,7 +185,7 @@ def whatsApp(mobile_no, message, flag, name):
                     subprocess.run(f'start "" "{whatsapp_url}"', shell=True)
                     
                     # Simple automation - just press enter after a delay
-                    time.sleep(3)
+                    jobs.sleep(3)
                     try:
                         pyautogui.press('enter')
                         jarvis_message = f"Message sent to {name}"
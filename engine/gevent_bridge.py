@@ -0,0 +1,122 @@
+"""
+Bridge between eel's gevent hub and blocking code
+eel runs exposed functions (takeCommand, allCommand) as greenlets on one
+gevent hub, and the process isn't monkey-patched: a microphone read, HTTP
+request, sqlite query or time.sleep() inside them stops the hub, so
+DisplayMessage/senderText updates queue up until the call returns.
+run() moves a blocking call onto the hub's native threadpool and parks only
+the calling greenlet; to_hub() sends UI calls made from those threads (or
+any other thread) back to the hub, where eel's websocket lives. Until bind()
+is called from the UI process, or when gevent isn't installed, both just
+call straight through.
+"""
+
+import contextvars
+import threading
+import time
+
+from engine import tracing
+
+
+class GeventBridge:
+    """Offloads blocking calls from the bound hub and marshals UI calls back to it"""
+
+    def __init__(self):
+        self.hub = None
+        self.hub_thread = None
+        self.offloaded = 0
+
+    def bind(self, hub=None):
+        """Use this thread's gevent hub (the one eel.start() will run); False without gevent"""
+        try:
+            import gevent
+        except ImportError:
+            return False
+        self.hub = hub or gevent.get_hub()
+        self.hub_thread = threading.get_ident()
+        return True
+
+    def unbind(self):
+        self.hub = None
+        self.hub_thread = None
+
+    @property
+    def bound(self):
+        return self.hub is not None
+
+    def on_hub_thread(self):
+        return self.hub is not None and threading.get_ident() == self.hub_thread
+
+    def on_hub(self):
+        """True in a greenlet of the bound hub, where blocking calls stall the UI"""
+        if not self.on_hub_thread():
+            return False
+        import gevent
+        return gevent.getcurrent() is not self.hub
+
+    def run(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) on a native thread, yielding to the hub until it returns
+
+        Off the hub (job workers, the hotword process, tests) it is a plain
+        call. Exceptions are re-raised in the caller; context variables such
+        as the trace turn are carried over to the thread.
+        """
+        if not self.on_hub():
+            return fn(*args, **kwargs)
+        self.offloaded += 1
+        context = contextvars.copy_context()
+        started = time.perf_counter()
+        try:
+            ok, value = self.hub.threadpool.spawn(context.run, _outcome, fn, args, kwargs).get()
+        finally:
+            tracing.record("gevent.offload", (time.perf_counter() - started) * 1000,
+                           call=getattr(fn, '__name__', repr(fn)))
+        if not ok:
+            raise value
+        return value
+
+    def offload(self, fn):
+        """Decorator: always call fn through run()"""
+        def call(*args, **kwargs):
+            return self.run(fn, *args, **kwargs)
+        call.__name__ = fn.__name__
+        call.__doc__ = fn.__doc__
+        return call
+
+    def to_hub(self, fn, *args):
+        """Call fn(*args) on the hub: now if already there, else queued for its loop"""
+        if self.hub is None or self.on_hub_thread():
+            return fn(*args)
+        import gevent
+        # a loop callback runs in the hub itself, where a websocket send that has to wait
+        # can't switch away; a greenlet of its own can
+        self.hub.loop.run_callback_threadsafe(gevent.spawn, self._deliver, fn, args)
+
+    def sleep(self, seconds):
+        """Pause without stalling the hub"""
+        if self.on_hub():
+            import gevent
+            gevent.sleep(seconds)
+        else:
+            time.sleep(seconds)
+
+    @staticmethod
+    def _deliver(fn, args):
+        try:
+            fn(*args)
+        except Exception as e:
+            # nobody is waiting on a UI callback, so report it instead of killing the loop callback
+            print(f"UI call {getattr(fn, '__name__', fn)} failed: {e}")
+
+
+def _outcome(fn, args, kwargs):
+    # handed back instead of raised: the threadpool would print the traceback on the hub
+    # even though run() re-raises it in the caller
+    try:
+        return True, fn(*args, **kwargs)
+    except Exception as e:
+        return False, e
+
+
+# Shared bridge; main.start() binds it to eel's hub
+bridge = GeventBridge()
@@ -0,0 +1,103 @@
+"""
+Wake-word loop for the hotword process
+Kept apart from engine.features so the hotword process imports porcupine,
+the audio bus and the wake channel, not the UI, TTS and command stack.
+"""
+
+import time
+
+import pvporcupine
+import pyaudio
+
+from engine import tracing
+from engine.audio_bus import AudioBus
+from engine.audio_frames import FrameRing
+from engine.config import ASSISTANT_NAME
+from engine.supervisor import HEARTBEAT_INTERVAL, worker
+from engine.wake_channel import WAKE_COOLDOWN_SECONDS, send_wake
+
+
+def hotword(wake_channel=None, bus_name=None):
+    porcupine=None
+    paud=None
+    audio_stream=None
+    ring=None
+    bus=None
+    reader=None
+    # carried over from before a restart, so one utterance can't wake twice
+    last_wake=worker.warm_state.get("last_wake",0.0)
+    try:
+       
+        # pre trained keywords    
+        porcupine=pvporcupine.create(keywords=[ASSISTANT_NAME]) 
+
+        if bus_name is not None:
+            # frames come from the capture process over the shared audio bus, zero-copy
+            bus=AudioBus.attach(bus_name)
+            if bus.sample_rate!=porcupine.sample_rate or bus.frame_length!=porcupine.frame_length:
+                raise ValueError(f"audio bus is {bus.sample_rate} Hz/{bus.frame_length}, porcupine needs {porcupine.sample_rate} Hz/{porcupine.frame_length}")
+            reader=bus.reader()
+            # bounded, so the loop keeps beating while the capture process is down or restarting
+            nextFrame=lambda: reader.read(timeout=HEARTBEAT_INTERVAL)
+        else:
+            paud=pyaudio.PyAudio()
+            audio_stream=paud.open(rate=porcupine.sample_rate,channels=1,format=pyaudio.paInt16,input=True,frames_per_buffer=porcupine.frame_length)
+
+            # preallocated ring of frames, each handed over as a zero-copy int16 view
+            ring=FrameRing(porcupine.frame_length)
+            nextFrame=lambda: ring.read_frame(audio_stream)
+        
+        # loop for streaming
+        while True:
+            # heartbeat for run.py's supervisor (rate-limited, nearly free per frame)
+            worker.beat()
+            keyword=nextFrame()
+            if keyword is None:
+                # frame lost to an input overflow (counted in ring.stats()), or no audio on the bus yet
+                continue
+
+            # processing keyword comes from mic 
+            detect_start=time.perf_counter()
+            keyword_index=porcupine.process(keyword)
+
+            # checking first keyword detetcted for not
+            if keyword_index>=0:
+                now=time.time()
+                if now-last_wake<WAKE_COOLDOWN_SECONDS:
+                    continue
+                last_wake=now
+                worker.report(last_wake=now)
+                print("hotword detected")
+                # the turn starts here; the UI process adopts this ID from the wake event
+                turn=tracing.new_turn()
+                tracing.record("wake.detect",(time.perf_counter()-detect_start)*1000,turn,keyword=keyword_index)
+
+                if wake_channel is not None:
+                    # straight to the UI process, no keypress or focus needed;
+                    # the bus sequence tells it where the command starts
+                    send_wake(wake_channel,keyword_index,reader.cursor if reader is not None else None,turn)
+                else:
+                    # pressing shorcut key win+j
+                    import pyautogui as autogui
+                    autogui.keyDown("win")
+                    autogui.press("j")
+                    time.sleep(2)
+                    autogui.keyUp("win")
+                
+    except Exception as e:
+        # let the process fail so the supervisor restarts it, instead of silently ending wake detection
+        print(f"hotword error: {e!r}")
+        raise
+    finally:
+        if ring is not None:
+            print(f"hotword frames: {ring.stats()}")
+        if reader is not None:
+            print(f"hotword frames dropped from audio bus: {reader.dropped}")
+        if porcupine is not None:
+            porcupine.delete()
+        if audio_stream is not None:
+            audio_stream.close()
+        if paud is not None:
+            paud.terminate()
+        if bus is not None:
+            bus.close()
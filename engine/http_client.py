@@ -0,0 +1,195 @@
+"""
+Shared HTTP client for every outbound API call JARVIS makes
+One requests.Session keeps keep-alive connection pools per host, every call
+gets a per-provider timeout and bounded retries with jittered backoff, and
+per-endpoint latency histograms show which provider is slowing turns down.
+"""
+
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from engine import tracing
+
+# (connect, read) timeouts in seconds
+PROVIDER_TIMEOUTS = {
+    'openweathermap': (3.05, 5),
+    'newsapi': (3.05, 8),
+    'youtube': (3.05, 8),
+    'openai': (3.05, 30),
+    'default': (3.05, 10),
+}
+
+# Base URLs, overridable with JARVIS_<PROVIDER>_URL (e.g. to point at a stub server)
+PROVIDER_URLS = {
+    'openweathermap': 'http://api.openweathermap.org',
+    'newsapi': 'https://newsapi.org',
+    'youtube': 'https://www.googleapis.com',
+    'openai': 'https://api.openai.com',
+}
+
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 2.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# safe to send twice; anything else (POST) is only retried if it never left this machine
+IDEMPOTENT_METHODS = {'GET', 'HEAD'}
+POOL_HOSTS = 10
+POOL_SIZE = 10
+
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+
+
+def base_url(provider):
+    """Base URL for a provider, honouring JARVIS_<PROVIDER>_URL overrides"""
+    override = os.getenv(f"JARVIS_{provider.upper()}_URL")
+    return (override or PROVIDER_URLS[provider]).rstrip('/')
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+
+    def record(self, ms, error=False):
+        for i, bound in enumerate(self.buckets):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if error:
+            self.errors += 1
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile"""
+        if not self.count:
+            return None
+        target = self.count * p / 100
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": self.total_ms / self.count if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+            "buckets": {str(b): c for b, c in zip(self.buckets, self.counts) if c},
+        }
+
+
+class HTTPClient:
+    """Pooled, timed, retrying wrapper around requests.Session"""
+
+    def __init__(self, timeouts=None, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE,
+                 backoff_cap=BACKOFF_CAP):
+        self.timeouts = dict(PROVIDER_TIMEOUTS, **(timeouts or {}))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self.session = self._new_session()
+
+    def _new_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE, max_retries=0)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get(self, url, params=None, provider='default', **kwargs):
+        return self.request('GET', url, provider=provider, params=params, **kwargs)
+
+    def post(self, url, provider='default', **kwargs):
+        return self.request('POST', url, provider=provider, **kwargs)
+
+    def request(self, method, url, provider='default', **kwargs):
+        """Send a request, retrying connection errors, timeouts and 429/5xx responses
+
+        Only GET/HEAD are retried after the request may have reached the
+        server; a POST is retried only when connecting failed. Returns the
+        final response (which may still be an error status) or raises the
+        last requests exception once retries are exhausted.
+        """
+        kwargs.setdefault('timeout', self.timeouts.get(provider, self.timeouts['default']))
+        endpoint = self._endpoint(provider, url)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(endpoint, start, error=True)
+                if attempt >= self.max_retries or not (idempotent or _not_sent(e)):
+                    raise
+            else:
+                failed = response.status_code in RETRY_STATUSES
+                self._record(endpoint, start, error=failed)
+                if not failed or not idempotent or attempt >= self.max_retries:
+                    return response
+                response.close()
+
+            self._backoff(attempt)
+            attempt += 1
+
+    def latency_stats(self):
+        """Histogram snapshot per "provider host/path" endpoint"""
+        with self._lock:
+            return {endpoint: h.snapshot() for endpoint, h in self._histograms.items()}
+
+    def close(self):
+        self.session.close()
+        self.session = self._new_session()
+
+    def _backoff(self, attempt):
+        # "full jitter": spread retries from many callers across the window
+        time.sleep(random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt))))
+
+    def _endpoint(self, provider, url):
+        parts = urlsplit(url)
+        return f"{provider} {parts.netloc}{parts.path}"
+
+    def _record(self, endpoint, start, error=False):
+        ms = (time.perf_counter() - start) * 1000
+        tracing.record(f"http.{endpoint.split(' ', 1)[0]}", ms, endpoint=endpoint, error=error)
+        with self._lock:
+            histogram = self._histograms.get(endpoint)
+            if histogram is None:
+                histogram = self._histograms[endpoint] = LatencyHistogram()
+            histogram.record(ms, error)
+
+
+def _not_sent(error):
+    """True when the request failed while connecting, before any of it was sent"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+# Shared client used by engine/api_examples.py and engine/enhanced_features.py
+http_client = HTTPClient()
@@ -0,0 +1,315 @@
+"""
+Background job scheduler for JARVIS
+Blocking command work (WhatsApp automation, API calls, cache refreshes) runs
+on a bounded pool of worker threads instead of the eel call that received the
+command, so JARVIS can acknowledge a command and keep listening while it
+finishes. Jobs are taken highest priority first (interactive replies ahead of
+background refreshes), can be cancelled, may have a run-time limit, and
+status() describes them for the UI to poll.
+"""
+
+import collections
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+
+from engine import tracing
+from engine.config import JOB_WORKERS
+
+# lower runs first
+INTERACTIVE = 0
+BACKGROUND = 10
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed_out"
+
+FINISHED = (DONE, FAILED, CANCELLED, TIMED_OUT)
+
+# finished jobs kept for status()
+HISTORY_SIZE = 50
+# timed-out threads that may still be stuck in their call; past this many their slots aren't replaced
+MAX_STUCK_WORKERS = 4
+
+
+class JobCancelled(BaseException):
+    """Raised at a checkpoint (Job.sleep/check) once the job is cancelled or timed out
+
+    A BaseException, like asyncio.CancelledError, so the handlers' broad
+    `except Exception` fallbacks don't swallow it and carry on automating.
+    """
+
+
+class Job:
+    """One submitted call and its progress"""
+
+    def __init__(self, job_id, name, fn, args, kwargs, priority, timeout, on_done):
+        self.id = job_id
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.timeout = timeout
+        self.on_done = on_done
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        # the submitter's trace turn and other context variables carry over to the worker
+        self.turn = tracing.current_turn()
+        self.context = contextvars.copy_context()
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._timer = None
+        # set when _expire handed this job's worker slot to a fresh thread
+        self._replaced = False
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def finished(self):
+        return self.state in FINISHED
+
+    def check(self):
+        """Raise JobCancelled if the job should stop"""
+        if self._cancel.is_set():
+            raise JobCancelled(self.state)
+
+    def sleep(self, seconds):
+        """time.sleep() that wakes up and raises as soon as the job is cancelled"""
+        if self._cancel.wait(seconds):
+            raise JobCancelled(self.state)
+
+    def wait(self, timeout=None):
+        """Block until the job has finished and its on_done callback has run; returns False on timeout"""
+        return self._done.wait(timeout)
+
+    def status(self):
+        now = time.perf_counter()
+        started = self.started_at or (None if self.finished else now)
+        return {
+            "id": self.id,
+            "name": self.name,
+            "state": self.state,
+            "priority": self.priority,
+            "queued_ms": round(((started or self.finished_at) - self.submitted_at) * 1000, 1),
+            "run_ms": None if self.started_at is None else round(((self.finished_at or now) - self.started_at) * 1000, 1),
+            "timeout": self.timeout,
+            "error": None if self.error is None else str(self.error),
+        }
+
+    def __repr__(self):
+        return f"Job({self.id}, {self.name!r}, state={self.state})"
+
+
+class JobScheduler:
+    """Bounded pool of worker threads taking jobs from a priority queue"""
+
+    def __init__(self, workers=JOB_WORKERS, history=HISTORY_SIZE, max_stuck=MAX_STUCK_WORKERS):
+        self.workers = max(1, workers)
+        self.max_stuck = max_stuck
+        self._heap = []
+        self._cond = threading.Condition()
+        self._active = {}
+        self._recent = collections.deque(maxlen=history)
+        self._ids = itertools.count(1)
+        self._order = itertools.count()
+        self._live = 0
+        self._idle = 0
+        # timed-out threads whose slot went to a replacement and that haven't returned yet
+        self._stuck = 0
+        self._local = threading.local()
+
+    def submit(self, fn, *args, name=None, priority=INTERACTIVE, timeout=None, on_done=None, **kwargs):
+        """Queue fn(*args, **kwargs); on_done(job) is called once it has finished, however it ended"""
+        with self._cond:
+            job = Job(next(self._ids), name or getattr(fn, '__name__', 'job'), fn, args, kwargs,
+                      priority, timeout, on_done)
+            self._active[job.id] = job
+            heapq.heappush(self._heap, (priority, next(self._order), job))
+            self._spawn_workers()
+            # wait_idle() shares the condition, so wake everyone rather than possibly just it
+            self._cond.notify_all()
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns False if it isn't active
+
+        A queued job never starts. A running one stops at its next
+        checkpoint (Job.sleep/check, or jobs.sleep/checkpoint inside it).
+        """
+        with self._cond:
+            job = self._active.get(job_id)
+            if job is None or job.finished:
+                return False
+            job._cancel.set()
+            # decided under the lock, so a worker can't start the job in between;
+            # it's still in the heap and the worker that pops it skips it
+            queued = job.state == QUEUED and self._settle(job, CANCELLED)
+        if queued:
+            self._complete(job)
+        return True
+
+    def get(self, job_id):
+        job = self._active.get(job_id)
+        if job is None:
+            job = next((j for j in self._recent if j.id == job_id), None)
+        return job
+
+    def active(self):
+        """Queued and running jobs, oldest first"""
+        with self._cond:
+            return sorted(self._active.values(), key=lambda job: job.id)
+
+    def status(self):
+        """JSON-friendly snapshot for the UI"""
+        with self._cond:
+            active = sorted(self._active.values(), key=lambda job: job.id)
+            recent = list(self._recent)
+            workers = self._live
+        return {
+            "workers": workers,
+            "max_workers": self.workers,
+            "queued": sum(1 for job in active if job.state == QUEUED),
+            "running": sum(1 for job in active if job.state == RUNNING),
+            "active": [job.status() for job in active],
+            "recent": [job.status() for job in reversed(recent)],
+        }
+
+    def wait_idle(self, timeout=None):
+        """Block until no job is queued or running; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._active:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def current(self):
+        """The job running on this thread, or None outside the pool"""
+        return getattr(self._local, 'job', None)
+
+    def sleep(self, seconds):
+        """Cancellable sleep inside a job, plain time.sleep() anywhere else"""
+        job = self.current()
+        if job is None:
+            time.sleep(seconds)
+        else:
+            job.sleep(seconds)
+
+    def checkpoint(self):
+        job = self.current()
+        if job is not None:
+            job.check()
+
+    def _spawn_workers(self):
+        # called with the lock held: one more thread per job nobody is free to take, up to the limit
+        while self._live < self.workers and len(self._heap) > self._idle:
+            self._live += 1
+            self._idle += 1
+            threading.Thread(target=self._work, name=f"jarvis-job-{self._live}", daemon=True).start()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, job = heapq.heappop(self._heap)
+                if job.finished:
+                    # cancelled while it was queued
+                    continue
+                self._idle -= 1
+                job.state = RUNNING
+                job.started_at = time.perf_counter()
+                if job.timeout:
+                    job._timer = threading.Timer(job.timeout, self._expire, args=(job,))
+                    job._timer.daemon = True
+                    job._timer.start()
+
+            self._local.job = job
+            try:
+                result = job.context.run(job.fn, *job.args, **job.kwargs)
+            except JobCancelled:
+                self._finish(job, CANCELLED)
+            except Exception as e:
+                print(f"Job {job.name} failed: {e}")
+                self._finish(job, FAILED, error=e)
+            else:
+                self._finish(job, DONE, result=result)
+            finally:
+                self._local.job = None
+
+            with self._cond:
+                if job._replaced:
+                    # _expire already gave this slot to a replacement worker
+                    self._stuck -= 1
+                    return
+                self._idle += 1
+
+    def _expire(self, job):
+        with self._cond:
+            if not self._settle(job, TIMED_OUT, error=TimeoutError(f"ran longer than {job.timeout:g}s")):
+                return
+            job._cancel.set()
+            # the stuck thread may never reach a checkpoint; its slot goes to a fresh worker,
+            # but only up to max_stuck of them so hung calls can't pile up threads forever
+            if self._stuck < self.max_stuck:
+                self._stuck += 1
+                job._replaced = True
+                self._live -= 1
+                self._spawn_workers()
+        print(f"Job {job.name} timed out after {job.timeout:g}s"
+              + ("" if job._replaced else ", no replacement worker: too many are stuck"))
+        self._complete(job)
+
+    def _finish(self, job, state, result=None, error=None):
+        with self._cond:
+            if not self._settle(job, state, result, error):
+                return False
+        self._complete(job)
+        return True
+
+    def _settle(self, job, state, result=None, error=None):
+        # called with the lock held: the first outcome recorded wins
+        if job.finished:
+            return False
+        job.state = state
+        job.result = result
+        job.error = error
+        job.finished_at = time.perf_counter()
+        if job._timer is not None:
+            job._timer.cancel()
+        return True
+
+    def _complete(self, job):
+        status = job.status()
+        tracing.record("job", status["run_ms"] or 0, turn=job.turn, name=job.name, state=job.state,
+                       priority=job.priority, queued_ms=status["queued_ms"])
+        if job.on_done is not None:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                print(f"Job {job.name} completion callback failed: {e}")
+
+        # only now, so whoever waits on the job also waits for what on_done says about it
+        with self._cond:
+            self._active.pop(job.id, None)
+            self._recent.append(job)
+            job._done.set()
+            self._cond.notify_all()
+
+
+# Shared scheduler for command handlers and background refreshes
+jobs = JobScheduler()
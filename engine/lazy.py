@@ -0,0 +1,153 @@
+"""
+Load-on-first-use registry for heavy dependencies and command handlers
+Modules and functions are registered by dotted path and only imported the
+first time something touches them, so the UI comes up before pyautogui,
+pywhatkit (which probes the internet on import), playsound and the handler
+modules are loaded. prewarm() imports the registered targets on a background
+thread once the UI is showing.
+"""
+
+import importlib
+import threading
+import time
+
+from engine import tracing
+
+# prewarm starts this long after the UI so it doesn't compete with the first paint
+PREWARM_DELAY_SECONDS = 2.0
+
+
+class LazyRegistry:
+    """name -> "module" or "module:attribute", imported once on first get()"""
+
+    def __init__(self):
+        self._targets = {}
+        self._prewarm = []
+        self._loaded = {}
+        self._lock = threading.Lock()
+        # one lock per target, so a slow import (pywhatkit) doesn't hold up the others
+        self._target_locks = {}
+        self.load_ms = {}
+        self.errors = {}
+
+    def register(self, name, target=None, prewarm=True):
+        """Add a target; prewarm=False keeps it out of prewarm() (e.g. hotword-only modules)"""
+        self._targets[name] = target or name
+        if prewarm and name not in self._prewarm:
+            self._prewarm.append(name)
+
+    def get(self, name):
+        """The module or attribute, importing it now if this is the first use"""
+        try:
+            return self._loaded[name]
+        except KeyError:
+            pass
+        with self._lock:
+            target_lock = self._target_locks.setdefault(name, threading.Lock())
+        with target_lock:
+            if name not in self._loaded:
+                self._loaded[name] = self._load(name)
+            return self._loaded[name]
+
+    def loaded(self, name):
+        return name in self._loaded
+
+    def targets(self):
+        return dict(self._targets)
+
+    def module(self, name, target=None):
+        """Module stand-in whose first attribute access imports it"""
+        if name not in self._targets:
+            self.register(name, target)
+        return LazyModule(self, name)
+
+    def function(self, target, name=None):
+        """Function stand-in for "module:function", e.g. for eel.expose or router handlers"""
+        if name is None:
+            name = target.rsplit(':', 1)[-1]
+        if target not in self._targets:
+            self.register(target)
+
+        def call(*args, **kwargs):
+            return self.get(target)(*args, **kwargs)
+        call.__name__ = name
+        call.__qualname__ = name
+        call.lazy_target = target
+        return call
+
+    def prewarm(self, names=None, delay=PREWARM_DELAY_SECONDS):
+        """Import targets in the background, in registration order; returns the thread"""
+        names = list(self._prewarm if names is None else names)
+
+        def run():
+            if delay:
+                time.sleep(delay)
+            started = time.perf_counter()
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    # the handler that needs it reports the problem when it runs
+                    print(f"Prewarm of {name} failed: {e}")
+            print(f"Prewarmed {len(names)} modules in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        thread = threading.Thread(target=run, name="jarvis-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        """Load time per loaded target and the ones still pending"""
+        return {
+            "loaded": dict(self.load_ms),
+            "pending": [name for name in self._targets if name not in self._loaded],
+            "errors": dict(self.errors),
+        }
+
+    def _load(self, name):
+        target = self._targets.get(name, name)
+        module_name, _, attribute = target.partition(':')
+        started = time.perf_counter()
+        try:
+            value = importlib.import_module(module_name)
+            if attribute:
+                value = getattr(value, attribute)
+        except Exception as e:
+            self.errors[name] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            tracing.record("lazy.load", ms, target=target)
+        self.load_ms[name] = round(ms, 3)
+        return value
+
+
+class LazyModule:
+    """Forwards attribute access to the registry entry, loading it on first use"""
+
+    def __init__(self, registry, name):
+        object.__setattr__(self, '_registry', registry)
+        object.__setattr__(self, '_name', name)
+
+    def __getattr__(self, attribute):
+        return getattr(self._registry.get(self._name), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._registry.get(self._name), attribute, value)
+
+    def __repr__(self):
+        state = "loaded" if self._registry.loaded(self._name) else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+# Shared registry; engine.features and the router pull their dependencies through it
+lazy = LazyRegistry()
+
+# third-party modules that are slow to import, in the order prewarm loads them
+lazy.register('playsound:playsound')
+lazy.register('webbrowser')
+lazy.register('pywhatkit')
+lazy.register('pyautogui')
+# command handler modules
+lazy.register('engine.features')
+lazy.register('engine.api_examples')
+lazy.register('engine.briefing')
@@ -0,0 +1,338 @@
+"""
+Persistent microphone session for JARVIS
+The input device is opened once and kept open across turns. Between turns a
+background thread keeps reading it in short slices, adapting the recognizer's
+energy threshold to the room, so a turn starts capturing immediately instead
+of spending a second in adjust_for_ambient_noise on a freshly opened device.
+"""
+
+import atexit
+import collections
+import threading
+import time
+
+from engine import tracing
+from engine.audio_bus import PREROLL_SECONDS
+
+PAUSE_THRESHOLD = 1
+LISTEN_TIMEOUT = 10
+PHRASE_TIME_LIMIT = 6
+# initial calibration on a freshly opened device
+INITIAL_CALIBRATION_SECONDS = 0.5
+# background calibration runs in slices this long, so a turn waits at most one slice
+CALIBRATION_SLICE_SECONDS = 0.1
+TIMING_HISTORY = 50
+# audio kept from before the VAD onset so the first syllable isn't clipped
+VAD_PAD_SECONDS = 0.2
+# no audio bus frame for this long and the capture process is taken to be down
+STALL_SECONDS = 2.0
+
+
+class TurnTimings:
+    """Milliseconds spent in each phase of one listening turn"""
+
+    def __init__(self):
+        self.device_open_ms = 0.0
+        self.calibration_ms = 0.0
+        self.endpointing_ms = 0.0
+        self.recognition_ms = None
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+    def __repr__(self):
+        recognition = "-" if self.recognition_ms is None else f"{self.recognition_ms:.0f}"
+        return (f"open {self.device_open_ms:.0f} ms, calibration {self.calibration_ms:.0f} ms, "
+                f"endpointing {self.endpointing_ms:.0f} ms, recognition {recognition} ms")
+
+
+class BusStream:
+    """The read() interface speech_recognition expects from a microphone stream"""
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def read(self, size):
+        raw = self.reader.read_raw(STALL_SECONDS)
+        if raw is None:
+            raise OSError("audio bus stalled, is the capture process running?")
+        # Recognizer.listen keeps whole phrases, which can outlive the ring slot
+        return bytes(raw)
+
+    def close(self):
+        pass
+
+
+class BusSource:
+    """Audio source reading from the audio bus instead of opening the device
+
+    Recognizer only accepts sr.AudioSource instances; bus_source() adds that
+    base on first use, so neither this module nor engine.audio_bus (imported
+    by the hotword and capture processes) loads speech_recognition.
+    """
+
+    def __init__(self, bus):
+        self.bus = bus
+        self.SAMPLE_RATE = bus.sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = bus.frame_length
+        self.reader = bus.reader()
+        self.stream = BusStream(self.reader)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def rewind(self, seconds, not_before=None):
+        self.reader.rewind(seconds, not_before)
+
+
+_bus_source_class = None
+
+
+def bus_source(bus):
+    """A BusSource that is also an sr.AudioSource"""
+    global _bus_source_class
+    if _bus_source_class is None:
+        import speech_recognition as sr
+        _bus_source_class = type("BusSource", (BusSource, sr.AudioSource), {})
+    return _bus_source_class(bus)
+
+
+class ListenerSession:
+    """Keeps one microphone (or audio bus) source open and calibrated between turns"""
+
+    def __init__(self, device_index=None, pause_threshold=PAUSE_THRESHOLD, is_busy=None,
+                 vad_aggressiveness=None):
+        self.device_index = device_index
+        # None picks engine.vad's default; False uses Recognizer.listen's pause_threshold endpointing
+        self.vad_aggressiveness = vad_aggressiveness
+        # set by use_bus(); audio then comes from the capture process instead of a device
+        self.bus = None
+        self.pause_threshold = pause_threshold
+        # while this returns True (JARVIS is talking) audio is drained but not calibrated on
+        self.is_busy = is_busy or (lambda: False)
+        self.recognizer = None
+        self.source = None
+        # energy threshold learned before a restart; warm_up() starts from it
+        self.restored_threshold = None
+        # bus frame JARVIS was last heard speaking at; turns never start before it
+        self.speech_end = 0
+        self.turns = []
+        self._lock = threading.Lock()
+        self._turn_waiting = threading.Event()
+        self._stop = threading.Event()
+        self._calibrator = None
+
+    def use_bus(self, bus):
+        """Read from a shared AudioBus from the next turn on"""
+        with self._lock:
+            self._close()
+            self.bus = bus
+
+    def expect_turn(self):
+        """Stop background calibration now, a turn is about to start (e.g. on wake)"""
+        self._turn_waiting.set()
+
+    def warm_up(self):
+        """Open and calibrate the source now (at boot) so the first turn doesn't pay for it"""
+        with self._lock:
+            if self.source is None:
+                try:
+                    self._open()
+                    if self.restored_threshold:
+                        # the room hasn't changed much since the restart: one short slice will do
+                        self.recognizer.energy_threshold = self.restored_threshold
+                        self.recognizer.adjust_for_ambient_noise(self.source, CALIBRATION_SLICE_SECONDS)
+                    else:
+                        self.recognizer.adjust_for_ambient_noise(self.source, INITIAL_CALIBRATION_SECONDS)
+                except OSError:
+                    self._close()
+                    raise
+        self._start_calibrator()
+
+    def listen(self, timeout=LISTEN_TIMEOUT, phrase_time_limit=PHRASE_TIME_LIMIT, on_listening=None,
+               since=None):
+        """Capture one phrase; returns (audio, TurnTimings)
+
+        On the audio bus a turn started by a wake event (since is the bus
+        frame at the end of the wake word) begins with up to PREROLL_SECONDS
+        of audio captured before it. Other turns start live, and no turn
+        includes audio from before JARVIS last finished speaking. Raises
+        sr.WaitTimeoutError like Recognizer.listen when nobody speaks.
+        """
+        timings = TurnTimings()
+        self._turn_waiting.set()
+        start = time.perf_counter()
+        with self._lock:
+            self._turn_waiting.clear()
+            try:
+                if self.source is None:
+                    opened = time.perf_counter()
+                    self._open()
+                    timings.device_open_ms = (time.perf_counter() - opened) * 1000
+                    calibrated = time.perf_counter()
+                    self.recognizer.adjust_for_ambient_noise(self.source, INITIAL_CALIBRATION_SECONDS)
+                    timings.calibration_ms = (time.perf_counter() - calibrated) * 1000
+                else:
+                    # time spent waiting for the background slice to finish
+                    timings.calibration_ms = (time.perf_counter() - start) * 1000
+
+                if self.bus is not None:
+                    if self.is_busy():
+                        self.speech_end = self.bus.sequence
+                    # without a wake event there's no telling where the user started, so no preroll
+                    preroll = PREROLL_SECONDS if since is not None else 0
+                    self.source.rewind(preroll, max(since or 0, self.speech_end))
+
+                if on_listening is not None:
+                    on_listening()
+                endpointing = time.perf_counter()
+                try:
+                    audio = self._capture_phrase(timeout, phrase_time_limit)
+                finally:
+                    timings.endpointing_ms = (time.perf_counter() - endpointing) * 1000
+            except OSError as e:
+                # device unplugged or reset; reopen on the next turn
+                print(f"Microphone error: {e}")
+                self._close()
+                raise
+        self._start_calibrator()
+        self._record(timings)
+        return audio, timings
+
+    def recognize(self, audio, timings, recognize):
+        """Run recognize(recognizer, audio) and record its time on the turn"""
+        start = time.perf_counter()
+        try:
+            with tracing.span("stt") as attrs:
+                result = recognize(self.recognizer, audio)
+                attrs["backend"] = getattr(result, "backend", None)
+                return result
+        finally:
+            timings.recognition_ms = (time.perf_counter() - start) * 1000
+            print(f"Turn timings: {timings}")
+
+    def stats(self):
+        """Average milliseconds per phase over the recent turns"""
+        turns = list(self.turns)
+        if not turns:
+            return {"turns": 0}
+        stats = {"turns": len(turns)}
+        for phase in ("device_open_ms", "calibration_ms", "endpointing_ms", "recognition_ms"):
+            values = [getattr(t, phase) for t in turns if getattr(t, phase) is not None]
+            stats[f"avg_{phase}"] = sum(values) / len(values) if values else None
+        stats["energy_threshold"] = self.recognizer.energy_threshold if self.recognizer else None
+        return stats
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            self._close()
+
+    def _open(self):
+        import speech_recognition as sr
+        if self.recognizer is None:
+            self.recognizer = sr.Recognizer()
+            self.recognizer.pause_threshold = self.pause_threshold
+        if self.bus is not None:
+            self.source = bus_source(self.bus)
+            return
+        microphone = sr.Microphone(device_index=self.device_index)
+        self.source = microphone.__enter__()
+
+    def _close(self):
+        if self.source is not None:
+            try:
+                self.source.__exit__(None, None, None)
+            except Exception:
+                pass
+            self.source = None
+
+    def _capture_phrase(self, timeout, phrase_time_limit):
+        try:
+            import numpy as np
+            from engine.vad import DEFAULT_AGGRESSIVENESS, SPEECH_END, SPEECH_START, VoiceActivityDetector
+        except ImportError:
+            return self.recognizer.listen(self.source, timeout, phrase_time_limit)
+        if self.vad_aggressiveness is False:
+            return self.recognizer.listen(self.source, timeout, phrase_time_limit)
+
+        import speech_recognition as sr
+        source = self.source
+        chunk_seconds = source.CHUNK / source.SAMPLE_RATE
+        # the background calibration already knows the room's noise level
+        detector = VoiceActivityDetector(
+            chunk_seconds,
+            DEFAULT_AGGRESSIVENESS if self.vad_aggressiveness is None else self.vad_aggressiveness,
+            noise_floor=self.recognizer.energy_threshold / self.recognizer.dynamic_energy_ratio)
+        pending = collections.deque(maxlen=detector.onset_frames + round(VAD_PAD_SECONDS / chunk_seconds))
+        frames = None
+        waited = 0.0
+        while True:
+            chunk = source.stream.read(source.CHUNK)
+            event = detector.process(np.frombuffer(chunk, dtype=np.int16))
+            if frames is None:
+                pending.append(chunk)
+                if event == SPEECH_START:
+                    frames = list(pending)
+                    continue
+                waited += chunk_seconds
+                if timeout and waited > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                continue
+
+            frames.append(chunk)
+            # hand the phrase over the moment speech ends
+            if event == SPEECH_END or (phrase_time_limit and len(frames) * chunk_seconds > phrase_time_limit):
+                return sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+    def _start_calibrator(self):
+        if self._calibrator is None or not self._calibrator.is_alive():
+            self._stop.clear()
+            self._calibrator = threading.Thread(target=self._calibrate_loop, name="jarvis-mic-calibrator",
+                                                daemon=True)
+            self._calibrator.start()
+
+    def _calibrate_loop(self):
+        while not self._stop.is_set():
+            if self._turn_waiting.is_set():
+                # let the turn take the device first
+                time.sleep(0.005)
+                continue
+            with self._lock:
+                if self.source is None:
+                    return
+                try:
+                    if self.is_busy():
+                        # keep the device buffer fresh without learning JARVIS's voice as noise
+                        self.source.stream.read(self.source.CHUNK)
+                        if self.bus is not None:
+                            self.speech_end = self.bus.sequence
+                    else:
+                        self.recognizer.adjust_for_ambient_noise(self.source, CALIBRATION_SLICE_SECONDS)
+                except OSError as e:
+                    print(f"Microphone calibration error: {e}")
+                    self._close()
+                    return
+
+    def _record(self, timings):
+        if timings.device_open_ms:
+            tracing.record("listen.open", timings.device_open_ms)
+        tracing.record("listen.wait", timings.calibration_ms)
+        tracing.record("listen.capture", timings.endpointing_ms)
+        self.turns.append(timings)
+        if len(self.turns) > TIMING_HISTORY:
+            del self.turns[0]
+
+
+def _speech_busy():
+    from engine.tts import speech_service
+    return speech_service.busy()
+
+
+# Shared session used by takeCommand and enhanced_speech_recognition
+listener = ListenerSession(is_busy=_speech_busy)
+atexit.register(listener.close)
@@ -0,0 +1,88 @@
+"""
+Phonetic keys for contact names
+A Metaphone-style consonant skeleton tuned for how recognize_google (en-in)
+respells Indian names: "Meetali"/"Mitali" and "Aahan"/"Ahan" share a key
+"""
+
+import re
+
+_LETTERS_RE = re.compile(r"[^a-z ]+")
+
+# Applied in order; aspirated consonants collapse onto their plain forms
+_REPLACEMENTS = [
+    ("tch", "c"), ("sch", "s"),
+    ("bh", "b"), ("dh", "d"), ("gh", "g"), ("jh", "j"), ("kh", "k"),
+    ("th", "t"), ("ph", "f"), ("sh", "s"), ("ch", "c"), ("ck", "k"),
+    ("q", "k"), ("x", "ks"), ("z", "j"), ("w", "v"),
+]
+_VOWELS = set("aeiouy")
+
+PHONETIC_SCHEMA = [
+    "ALTER TABLE contacts ADD COLUMN phonetic_key VARCHAR(200)",
+    "CREATE INDEX IF NOT EXISTS idx_contacts_phonetic ON contacts(phonetic_key)",
+]
+
+
+def word_key(word):
+    """Phonetic key of a single word"""
+    for old, new in _REPLACEMENTS:
+        word = word.replace(old, new)
+    if not word:
+        return ""
+
+    key = ["A"] if word[0] in _VOWELS else []
+    for i, ch in enumerate(word):
+        # a leading "h" is spoken, elsewhere it only marks aspiration
+        if ch in _VOWELS or (ch == "h" and i > 0):
+            continue
+        ch = ch.upper()
+        if not key or key[-1] != ch:
+            key.append(ch)
+    return "".join(key)
+
+
+def phonetic_key(name):
+    """Space-separated phonetic keys for every word of a name"""
+    words = _LETTERS_RE.sub(" ", str(name or "").lower()).split()
+    return " ".join(k for k in (word_key(w) for w in words) if k)
+
+
+def key_range(key):
+    """Bounds for an index range scan over keys starting with a whole-word prefix"""
+    return key + " ", key + "!"
+
+
+def ensure_phonetic_column(conn):
+    """Add and backfill contacts.phonetic_key on databases created before it existed"""
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA table_info(contacts)")
+    columns = [row[1] for row in cursor.fetchall()]
+    if not columns:
+        return 0
+    if "phonetic_key" not in columns:
+        cursor.execute(PHONETIC_SCHEMA[0])
+    cursor.execute(PHONETIC_SCHEMA[1])
+
+    cursor.execute("SELECT id, name FROM contacts WHERE phonetic_key IS NULL")
+    rows = [(phonetic_key(name), contact_id) for contact_id, name in cursor.fetchall()]
+    cursor.executemany("UPDATE contacts SET phonetic_key = ? WHERE id = ?", rows)
+    conn.commit()
+    return len(rows)
+
+
+def phonetic_lookup(cursor, query, limit=5):
+    """Contacts whose phonetic key equals, or starts with, the query's key, best first
+
+    An exact key beats a longer name that only starts with it ("Mitali"
+    before "Mitali Sharma"), then shorter keys and names win.
+    """
+    key = phonetic_key(query)
+    if not key:
+        return []
+    low, high = key_range(key)
+    cursor.execute(
+        "SELECT name, mobile_no FROM contacts WHERE phonetic_key = ? "
+        "OR (phonetic_key >= ? AND phonetic_key < ?) "
+        "ORDER BY phonetic_key != ?, length(phonetic_key), length(name), name LIMIT ?",
+        (key, low, high, key, limit))
+    return cursor.fetchall()
@@ -0,0 +1,161 @@
+"""
+Persistent API response cache with stale-while-revalidate
+Successful JSON responses are stored in JARVIS.db keyed on the provider,
+endpoint URL (scheme and host included, so a stub never answers for the real
+API) and normalised parameters (API keys excluded), so repeat weather
+and news queries survive restarts. A fresh entry is returned as-is; a stale
+one is returned immediately while a background job refreshes it.
+"""
+
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+from engine.config import API_CACHE_STALE, API_CACHE_TTLS
+from engine.database import database
+from engine.http_client import http_client
+from engine.jobs import BACKGROUND, jobs
+
+SECRET_PARAMS = {'appid', 'apikey', 'api_key', 'key', 'token'}
+
+CACHE_SCHEMA = '''CREATE TABLE IF NOT EXISTS api_cache(
+    key VARCHAR(500) PRIMARY KEY,
+    provider VARCHAR(50),
+    status INTEGER,
+    payload TEXT,
+    fetched_at REAL
+)'''
+
+
+class CachedResponse:
+    """The parts of requests.Response the API handlers use"""
+
+    def __init__(self, status_code, data, fetched_at, source):
+        self.status_code = status_code
+        self._data = data
+        self.fetched_at = fetched_at
+        # "fresh", "stale" or "network"
+        self.source = source
+
+    def json(self):
+        return self._data
+
+
+def _normalise(value):
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    return value
+
+
+def cache_key(provider, url, params=None):
+    parts = urlsplit(url)
+    public = sorted((k, _normalise(v)) for k, v in (params or {}).items() if k.lower() not in SECRET_PARAMS)
+    return f"{provider}:{parts.scheme}://{parts.netloc.lower()}{parts.path}?{json.dumps(public, separators=(',', ':'))}"
+
+
+class ResponseCache:
+    """TTL cache in front of http_client.get for JSON APIs"""
+
+    def __init__(self, db=database, client=http_client, ttls=None, stale=None):
+        self.db = db
+        self.client = client
+        self.ttls = dict(API_CACHE_TTLS, **(ttls or {}))
+        # per provider; a provider without an entry is never served stale
+        self.stale = dict(API_CACHE_STALE, **(stale or {}))
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._schema_ready = False
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, url, params=None, provider='default'):
+        """Cached GET: fresh hit, stale hit with background refresh, or network fetch"""
+        ttl = self.ttls.get(provider)
+        if not ttl:
+            return self._fetch(None, url, params, provider)
+
+        key = cache_key(provider, url, params)
+        entry = self._load(key)
+        if entry is not None:
+            status, data, fetched_at = entry
+            age = time.time() - fetched_at
+            if age <= ttl:
+                with self._lock:
+                    self.hits += 1
+                return CachedResponse(status, data, fetched_at, "fresh")
+            if age <= ttl + self.stale.get(provider, 0):
+                with self._lock:
+                    self.stale_hits += 1
+                self._refresh_in_background(key, url, params, provider)
+                return CachedResponse(status, data, fetched_at, "stale")
+
+        with self._lock:
+            self.misses += 1
+        return self._fetch(key, url, params, provider)
+
+    def invalidate(self, provider=None):
+        self._ensure_schema()
+        if provider is None:
+            self.db.execute("DELETE FROM api_cache")
+        else:
+            self.db.execute("DELETE FROM api_cache WHERE provider = ?", (provider,))
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses}
+
+    def _fetch(self, key, url, params, provider):
+        response = self.client.get(url, params=params, provider=provider)
+        try:
+            data = response.json()
+        except ValueError:
+            if response.status_code == 200:
+                raise
+            # HTML error page or empty 204/502 body: the handler reports the status
+            data = None
+        fetched_at = time.time()
+        if key is not None and response.status_code == 200:
+            self._store(key, provider, response.status_code, data, fetched_at)
+        return CachedResponse(response.status_code, data, fetched_at, "network")
+
+    def _refresh_in_background(self, key, url, params, provider):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._fetch(key, url, params, provider)
+            except Exception as e:
+                print(f"Background refresh error for {provider}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        # queued behind interactive commands so a refresh never delays an answer
+        jobs.submit(refresh, name=f"refresh {provider}", priority=BACKGROUND, timeout=30)
+
+    def _ensure_schema(self):
+        if not self._schema_ready:
+            self.db.execute(CACHE_SCHEMA)
+            self._schema_ready = True
+
+    def _load(self, key):
+        self._ensure_schema()
+        row = self.db.query_one("SELECT status, payload, fetched_at FROM api_cache WHERE key = ?", (key,))
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), row[2]
+
+    def _store(self, key, provider, status, data, fetched_at):
+        self._ensure_schema()
+        self.db.execute(
+            "INSERT OR REPLACE INTO api_cache (key, provider, status, payload, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (key, provider, status, json.dumps(data), fetched_at))
+
+
+# Shared cache used by the weather/news/YouTube handlers
+response_cache = ResponseCache()
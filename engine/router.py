@@ -0,0 +1,196 @@
+"""
+Declarative intent router for JARVIS
+Handlers register trigger phrases with explicit priorities; every phrase is
+compiled into one Aho-Corasick automaton over normalised tokens, so a query
+is scanned once no matter how many handlers exist
+"""
+
+import re
+
+from engine import tracing
+from engine.jobs import INTERACTIVE, jobs
+from engine.lazy import lazy
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def normalise(text):
+    """Lower-case a query and split it into word tokens"""
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+class Intent:
+    """A registered handler and the phrases that trigger it"""
+
+    def __init__(self, name, handler, phrases=(), prefixes=(), requires=(), priority=0, order=0,
+                 job=False, timeout=None):
+        self.name = name
+        self.handler = handler
+        self.phrases = [tuple(normalise(p)) for p in phrases]
+        self.prefixes = [tuple(normalise(p)) for p in prefixes]
+        self.requires = [tuple(normalise(p)) for p in requires]
+        self.priority = priority
+        self.order = order
+        # run on the job scheduler instead of the caller's thread, with an optional time limit
+        self.job = job
+        self.timeout = timeout
+        self.require_ids = []
+
+    def __repr__(self):
+        return f"Intent({self.name!r}, priority={self.priority})"
+
+
+class IntentRouter:
+    """Registry of intents compiled into a single multi-pattern matcher
+
+    phrases  - trigger anywhere in the query, on whole-token boundaries
+    prefixes - trigger only when the query starts with them
+    requires - extra phrases that must all appear for the intent to match
+
+    The highest priority wins; ties go to the trigger that appears first in
+    the query, then to the intent registered first. Intents registered with
+    job=True run on engine.jobs and dispatch() returns without waiting.
+    """
+
+    def __init__(self):
+        self._intents = []
+        self._dirty = True
+        self._goto = []
+        self._fail = []
+        self._output = []
+        self._patterns = []
+        self._triggers = []
+
+    def register(self, name, handler, phrases=(), prefixes=(), requires=(), priority=0, job=False, timeout=None):
+        """handler is a callable or a "module:function" path imported on its first query"""
+        if isinstance(handler, str):
+            handler = lazy.function(handler)
+        intent = Intent(name, handler, phrases, prefixes, requires, priority, len(self._intents), job, timeout)
+        self._intents.append(intent)
+        self._dirty = True
+        return intent
+
+    def intent(self, name, phrases=(), prefixes=(), requires=(), priority=0, job=False, timeout=None):
+        """Decorator form of register()"""
+        def decorator(handler):
+            self.register(name, handler, phrases, prefixes, requires, priority, job, timeout)
+            return handler
+        return decorator
+
+    @property
+    def intents(self):
+        return list(self._intents)
+
+    def compile(self):
+        """Build the token-level Aho-Corasick automaton for every phrase"""
+        pattern_ids = {}
+        self._patterns = []
+        # per pattern: list of (intent, anchored) it triggers
+        self._triggers = []
+
+        def add_pattern(tokens):
+            if tokens not in pattern_ids:
+                pattern_ids[tokens] = len(self._patterns)
+                self._patterns.append(tokens)
+                self._triggers.append([])
+            return pattern_ids[tokens]
+
+        for intent in self._intents:
+            for tokens in intent.phrases:
+                if tokens:
+                    self._triggers[add_pattern(tokens)].append((intent, False))
+            for tokens in intent.prefixes:
+                if tokens:
+                    self._triggers[add_pattern(tokens)].append((intent, True))
+            intent.require_ids = [add_pattern(tokens) for tokens in intent.requires if tokens]
+
+        self._goto = [{}]
+        self._output = [[]]
+        for pid, tokens in enumerate(self._patterns):
+            node = 0
+            for token in tokens:
+                nxt = self._goto[node].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][token] = nxt
+                    self._goto.append({})
+                    self._output.append([])
+                node = nxt
+            self._output[node].append(pid)
+
+        # breadth-first failure links
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                state = self._fail[node]
+                while state and token not in self._goto[state]:
+                    state = self._fail[state]
+                target = self._goto[state].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+        self._dirty = False
+
+    def scan(self, tokens):
+        """Map pattern id -> earliest start position for every phrase in tokens"""
+        if self._dirty:
+            self.compile()
+
+        found = {}
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self._patterns
+        node = 0
+        for i, token in enumerate(tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for pid in output[node]:
+                if pid not in found:
+                    found[pid] = i - len(patterns[pid]) + 1
+        return found
+
+    def match(self, query):
+        """Return the Intent that should handle query, or None"""
+        tokens = normalise(query)
+        found = self.scan(tokens)
+        if not found:
+            return None
+
+        best = None
+        best_key = None
+        for pid, start in found.items():
+            for intent, anchored in self._triggers[pid]:
+                if anchored and start != 0:
+                    continue
+                if intent.require_ids and not all(r in found for r in intent.require_ids):
+                    continue
+                key = (-intent.priority, start, intent.order)
+                if best_key is None or key < best_key:
+                    best, best_key = intent, key
+        return best
+
+    def dispatch(self, query, on_done=None):
+        """Run the matching handler, returns False when nothing matched
+
+        For a job intent the handler is only queued: the Job is returned and
+        on_done(job) is called when it finishes.
+        """
+        with tracing.span("dispatch.match") as attrs:
+            intent = self.match(query)
+            attrs["intent"] = intent.name if intent else None
+        if intent is None:
+            return False
+        if intent.job:
+            return jobs.submit(self._run, intent, query, name=intent.name, priority=INTERACTIVE,
+                               timeout=intent.timeout, on_done=on_done)
+        self._run(intent, query)
+        return True
+
+    def _run(self, intent, query):
+        with tracing.span(f"handler.{intent.name}"):
+            intent.handler(query)
+
+
+# Global router that engine.command registers its handlers on
+router = IntentRouter()
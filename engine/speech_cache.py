@@ -0,0 +1,181 @@
+"""
+Disk-backed cache of synthesized speech for JARVIS
+Recurring phrases are rendered to WAV once, keyed by a hash of
+text + voice + rate, and played back from a memory-mapped file
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+
+CACHE_DIR = os.path.join('cache', 'speech')
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+MAX_CACHED_CHARS = 80
+
+# Fixed prompts spoken by engine/command.py and engine/features.py
+WARMUP_PHRASES = [
+    "Okay, I will stop listening.",
+    "Which mode you want to use whatsapp or mobile",
+    "what message to send",
+    "please try again",
+    "Sorry, I encountered an error processing that command.",
+    "Weather API feature not available. Please check your configuration.",
+    "News API feature not available. Please check your configuration.",
+    "API management feature not available.",
+    "I'm not sure what you want me to open.",
+    "Sorry, something went wrong while trying to open that.",
+    "Sorry, I couldn't play that on YouTube",
+    "not exist in contacts",
+    "No message to send",
+    "Invalid WhatsApp operation",
+]
+
+
+def cache_key(text, voice, rate):
+    """Content address for a rendered phrase"""
+    return hashlib.sha256(f"{voice}\x00{rate}\x00{text}".encode('utf-8')).hexdigest()
+
+
+class SpeechCache:
+    """LRU-capped directory of rendered phrases, recency tracked by file mtime"""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, max_chars=MAX_CACHED_CHARS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._total_bytes = None
+
+    def playback_available(self):
+        """Cached WAVs are played with winsound, which only exists on Windows"""
+        try:
+            import winsound  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def cacheable(self, text):
+        """Only short, recurring-style prompts are worth a file on disk"""
+        return bool(text) and len(text) <= self.max_chars
+
+    def path_for(self, text, voice, rate):
+        return os.path.join(self.cache_dir, cache_key(text, voice, rate) + '.wav')
+
+    def contains(self, text, voice, rate):
+        return os.path.exists(self.path_for(text, voice, rate))
+
+    def play(self, text, voice, rate, on_start=None):
+        """Play a cached phrase, returns False on a miss or when no player exists"""
+        try:
+            import winsound
+        except ImportError:
+            return False
+
+        path = self.path_for(text, voice, rate)
+        try:
+            with open(path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as audio:
+                    with self._lock:
+                        self.hits += 1
+                    if on_start is not None:
+                        on_start()
+                    winsound.PlaySound(audio, winsound.SND_MEMORY)
+        except (FileNotFoundError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return False
+
+        # refresh recency for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True
+
+    def render(self, engine, text, voice, rate):
+        """Render text to the cache with an already configured pyttsx3 engine"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(text, voice, rate)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+
+        engine.save_to_file(text, tmp_path)
+        engine.runAndWait()
+        if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) == 0:
+            return False
+
+        with self._lock:
+            size = os.path.getsize(tmp_path)
+            total = self._current_size()
+            if os.path.exists(path):
+                # re-rendered in place: the old file's bytes go away with the replace
+                total -= os.path.getsize(path)
+            os.replace(tmp_path, path)
+            self._total_bytes = total + size
+            self.renders += 1
+        self.evict()
+        return True
+
+    def evict(self):
+        """Drop least recently played files until the cache fits its cap"""
+        with self._lock:
+            if self._current_size() <= self.max_bytes:
+                return
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.wav'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            entries.sort()
+
+            for _, size, path in entries:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._total_bytes -= size
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "renders": self.renders,
+                "evictions": self.evictions,
+                "bytes": self._current_size(),
+            }
+
+    def _current_size(self):
+        if self._total_bytes is None:
+            total = 0
+            if os.path.isdir(self.cache_dir):
+                for entry in os.scandir(self.cache_dir):
+                    if entry.name.endswith('.wav'):
+                        total += entry.stat().st_size
+            self._total_bytes = total
+        return self._total_bytes
+
+
+def warmup_phrases():
+    """Fixed prompts plus one "Opening X" line per known app and website"""
+    phrases = list(WARMUP_PHRASES)
+    try:
+        from engine.app_index import app_resolver
+        phrases.extend("Opening " + name for name in app_resolver.names())
+    except Exception as e:
+        print(f"Speech cache warm-up error: {e}")
+    return phrases
+
+
+def warm_up(service=None):
+    """Pre-render every fixed prompt that isn't cached yet"""
+    if service is None:
+        from engine.tts import speech_service as service
+    return service.prerender(warmup_phrases())
@@ -0,0 +1,164 @@
+"""
+Cold-start import profiler for JARVIS
+Imports each process's entry module in a fresh interpreter under
+`python -X importtime`, reports the slowest modules, flags deferred modules
+(engine.lazy) that were imported eagerly, and appends the totals to
+logs/startup/imports.jsonl so cold start can be tracked over time.
+Run with `python run.py --profile-startup` or `python -m engine.startup_profile`.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+HISTORY_PATH = os.path.join('logs', 'startup', 'imports.jsonl')
+# what each process imports before it does anything useful
+TARGETS = {
+    'ui': 'main',
+    'hotword': 'engine.hotword',
+}
+TOP_MODULES = 15
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(text):
+    """-X importtime stderr -> [{module, self_ms, cumulative_ms, depth}] in import order"""
+    entries = []
+    for line in text.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append({
+                "module": module,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                # -X importtime indents nested imports by two spaces per level
+                "depth": (len(indent) - 1) // 2,
+            })
+    return entries
+
+
+def profile_import(module, python=sys.executable, cwd=None):
+    """Import module in a fresh interpreter; returns (entries, wall_ms, error or None)"""
+    started = time.perf_counter()
+    result = subprocess.run([python, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=cwd, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    error = None
+    if result.returncode != 0:
+        traceback = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        error = traceback[-1] if traceback else f"exit status {result.returncode}"
+    return parse_importtime(result.stderr), wall_ms, error
+
+
+def direct_imports(entries, module):
+    """Entries imported directly by module (importtime lists children before their parent)"""
+    for i, entry in enumerate(entries):
+        if entry["module"] == module and entry["depth"] == 0:
+            children = []
+            for child in reversed(entries[:i]):
+                if child["depth"] == 0:
+                    break
+                if child["depth"] == 1:
+                    children.append(child)
+            return children
+    return []
+
+
+def deferred_modules():
+    """Top-level module names engine.lazy is supposed to load on first use"""
+    from engine.lazy import lazy
+    return {target.partition(':')[0] for target in lazy.targets().values()}
+
+
+def summarise(name, module, entries, wall_ms, error, deferred):
+    imported = {entry["module"] for entry in entries}
+    return {
+        "ts": time.time(),
+        "target": name,
+        "module": module,
+        "import_ms": round(sum(entry["self_ms"] for entry in entries), 1),
+        "wall_ms": round(wall_ms, 1),
+        "modules": len(entries),
+        "eager_deferred": sorted(imported & deferred),
+        "error": error,
+    }
+
+
+def load_history(path=HISTORY_PATH):
+    history = []
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    history.append(json.loads(line))
+                except ValueError:
+                    continue
+    return history
+
+
+def append_history(records, path=HISTORY_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')) + "\n")
+
+
+def print_report(summary, entries, previous=None, top=TOP_MODULES):
+    change = ""
+    if previous is not None and previous.get("import_ms"):
+        delta = summary["import_ms"] - previous["import_ms"]
+        change = f" ({delta:+.1f} ms vs last run)"
+    print(f"=== {summary['target']}: import {summary['module']} ===")
+    print(f"{summary['modules']} modules, {summary['import_ms']:.1f} ms importing{change}, "
+          f"{summary['wall_ms']:.0f} ms interpreter wall time")
+    if summary["error"]:
+        print(f"import failed: {summary['error']}")
+
+    print(f"\n{'slowest modules (self)':44s} {'self ms':>9s} {'cumul ms':>9s}")
+    for entry in sorted(entries, key=lambda e: -e["self_ms"])[:top]:
+        print(f"  {entry['module']:42s} {entry['self_ms']:9.1f} {entry['cumulative_ms']:9.1f}")
+
+    print(f"\n{'heaviest imports of ' + summary['module']:44s} {'cumul ms':>9s}")
+    for entry in sorted(direct_imports(entries, summary["module"]), key=lambda e: -e["cumulative_ms"])[:top]:
+        print(f"  {entry['module']:42s} {entry['cumulative_ms']:9.1f}")
+
+    if summary["eager_deferred"]:
+        print(f"\nWARNING: imported at startup although deferred: {', '.join(summary['eager_deferred'])}")
+    print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine.startup_profile",
+                                     description="Per-module import time of JARVIS's cold start")
+    parser.add_argument("--target", choices=sorted(TARGETS), action="append",
+                        help="process to profile (default: all)")
+    parser.add_argument("--top", type=int, default=TOP_MODULES, help="modules to list per table")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSONL file the totals are appended to")
+    parser.add_argument("--no-save", action="store_true", help="don't append this run to the history")
+    args = parser.parse_args(argv)
+
+    deferred = deferred_modules()
+    history = load_history(args.history)
+    records = []
+    for name in args.target or list(TARGETS):
+        module = TARGETS[name]
+        entries, wall_ms, error = profile_import(module)
+        summary = summarise(name, module, entries, wall_ms, error, deferred)
+        previous = next((r for r in reversed(history) if r.get("target") == name and not r.get("error")), None)
+        print_report(summary, entries, previous, args.top)
+        records.append(summary)
+
+    if not args.no_save:
+        append_history(records, args.history)
+        print(f"Saved to {args.history}")
+    return records
+
+
+if __name__ == "__main__":
+    main()
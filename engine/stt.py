@@ -0,0 +1,489 @@
+"""
+Speech-to-text backends behind one interface, with latency-aware failover
+Google, Azure and an offline Vosk model implement the same transcribe()
+call. The router keeps a rolling latency/error window per backend, tries the
+preferred healthy one first and moves on when an attempt errors *or* runs
+past its timeout, so a slow network falls through to the local model
+instead of stalling the turn. Each attempt gets its own recognizer copy with
+operation_timeout set to its deadline, which the cloud backends pass on to
+their HTTP requests, and its own thread, so an abandoned call ends by itself
+and never holds up a later one.
+"""
+
+import collections
+import copy
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, TimeoutError as FutureTimeout, wait
+
+import speech_recognition as sr
+
+from engine import tracing
+from engine.config import APIKeys, STT_BACKENDS, STT_HEDGE, STT_LANGUAGE, STT_TIMEOUT_SECONDS, VOSK_MODEL_PATH
+
+WINDOW_SIZE = 20
+# older samples are forgotten, so a backend that was down gets retried once it has recovered
+WINDOW_SECONDS = 120
+# a backend above either limit is tried only after the healthy ones
+MAX_ERROR_RATE = 0.5
+MAX_P90_SECONDS = 3.0
+# consecutive failures that put a backend on the bench, and for how long
+COOLDOWN_FAILURES = 3
+COOLDOWN_SECONDS = 60
+# the offline model is the last resort, give it longer than the cloud budget
+OFFLINE_TIMEOUT_SECONDS = 10
+# hedging: start the second backend after the primary's p90, within these bounds
+HEDGE_DEFAULT_DELAY = 1.5
+HEDGE_MIN_DELAY = 0.3
+# results below this confidence wait for the other racer (None means "not reported")
+MIN_CONFIDENCE = 0.5
+
+
+class Recognition:
+    """A transcript and where it came from"""
+
+    def __init__(self, text, backend, confidence=None, seconds=0.0, attempts=None):
+        self.text = text
+        self.backend = backend
+        self.confidence = confidence
+        self.seconds = seconds
+        # [(backend, outcome, seconds)] for every backend tried this turn
+        self.attempts = attempts or []
+
+    def __repr__(self):
+        return f"Recognition({self.text!r}, backend={self.backend}, confidence={self.confidence}, {self.seconds:.2f}s)"
+
+
+class STTBackend:
+    """Interface: transcribe() returns (text, confidence) or raises sr.UnknownValueError
+
+    Network backends must give up after recognizer.operation_timeout seconds.
+    """
+
+    name = None
+    offline = False
+
+    def available(self):
+        return True
+
+    def transcribe(self, recognizer, audio):
+        raise NotImplementedError
+
+
+class GoogleBackend(STTBackend):
+    name = 'google'
+
+    def __init__(self, key=None, language=STT_LANGUAGE):
+        # without a key the free web API is used
+        self.key = key
+        self.language = language
+
+    def transcribe(self, recognizer, audio):
+        result = recognizer.recognize_google(audio, key=self.key, language=self.language, show_all=True)
+        alternatives = result.get('alternative', []) if isinstance(result, dict) else []
+        if not alternatives:
+            raise sr.UnknownValueError()
+        best = alternatives[0]
+        return best['transcript'], best.get('confidence')
+
+
+class AzureBackend(STTBackend):
+    name = 'azure'
+    sample_rate = 16000
+
+    def __init__(self, key, region, language=STT_LANGUAGE):
+        self.key = key
+        self.region = region
+        self.language = language
+
+    def available(self):
+        return bool(self.key and self.region)
+
+    def transcribe(self, recognizer, audio):
+        # the short-audio REST endpoint, called directly so the request gets the attempt's timeout
+        from engine.http_client import http_client
+        response = http_client.post(
+            f"https://{self.region}.stt.speech.microsoft.com/speech/recognition/conversation/cognitiveservices/v1",
+            provider='azure', timeout=recognizer.operation_timeout,
+            params={"language": self.language_tag(), "format": "detailed"},
+            headers={"Ocp-Apim-Subscription-Key": self.key,
+                     "Content-Type": f"audio/wav; codecs=audio/pcm; samplerate={self.sample_rate}"},
+            data=audio.get_wav_data(convert_rate=self.sample_rate, convert_width=2))
+        if response.status_code != 200:
+            raise sr.RequestError(f"azure returned {response.status_code}")
+        result = response.json()
+        if result.get('RecognitionStatus') != 'Success' or not result.get('NBest'):
+            raise sr.UnknownValueError()
+        best = result['NBest'][0]
+        return best['Display'], best.get('Confidence')
+
+    def language_tag(self):
+        lang, _, region = self.language.partition('-')
+        return f"{lang}-{region.upper()}" if region else lang
+
+
+class VoskBackend(STTBackend):
+    """Offline recognition on the CPU with a Vosk/Kaldi model"""
+
+    name = 'vosk'
+    offline = True
+    sample_rate = 16000
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        self.model_path = model_path
+        self._model = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        if not os.path.isdir(self.model_path):
+            return False
+        try:
+            import vosk  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def load(self):
+        """Load the model once; takes a second or two, so do it before the first turn"""
+        with self._lock:
+            if self._model is None:
+                import vosk
+                vosk.SetLogLevel(-1)
+                self._model = vosk.Model(self.model_path)
+        return self._model
+
+    def transcribe(self, recognizer, audio):
+        import vosk
+        kaldi = vosk.KaldiRecognizer(self.load(), self.sample_rate)
+        kaldi.SetWords(True)
+        kaldi.AcceptWaveform(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        result = json.loads(kaldi.FinalResult())
+        if not result.get('text'):
+            raise sr.UnknownValueError()
+        words = result.get('result', [])
+        confidence = sum(w['conf'] for w in words) / len(words) if words else None
+        return result['text'], confidence
+
+
+class BackendWindow:
+    """Rolling latency/outcome window for one backend"""
+
+    def __init__(self, size=WINDOW_SIZE):
+        self.samples = collections.deque(maxlen=size)
+        self.consecutive_failures = 0
+        self.benched_until = 0.0
+        self.timeouts = 0
+
+    def record(self, seconds, ok, timed_out=False):
+        self.samples.append((time.monotonic(), seconds, ok))
+        if timed_out:
+            self.timeouts += 1
+        if ok:
+            self.consecutive_failures = 0
+        else:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= COOLDOWN_FAILURES:
+                self.benched_until = time.monotonic() + COOLDOWN_SECONDS
+
+    def recent(self):
+        cutoff = time.monotonic() - WINDOW_SECONDS
+        return [(seconds, ok) for at, seconds, ok in self.samples if at >= cutoff]
+
+    def error_rate(self):
+        samples = self.recent()
+        if not samples:
+            return 0.0
+        return sum(1 for _, ok in samples if not ok) / len(samples)
+
+    def percentile(self, p):
+        latencies = sorted(seconds for seconds, ok in self.recent() if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))]
+
+    def benched(self):
+        return time.monotonic() < self.benched_until
+
+    def healthy(self):
+        p90 = self.percentile(90)
+        return (not self.benched() and self.error_rate() <= MAX_ERROR_RATE
+                and (p90 is None or p90 <= MAX_P90_SECONDS))
+
+    def snapshot(self):
+        return {
+            "count": len(self.recent()),
+            "error_rate": self.error_rate(),
+            "timeouts": self.timeouts,
+            "p50_s": self.percentile(50),
+            "p90_s": self.percentile(90),
+            "benched": self.benched(),
+        }
+
+
+class STTRouter:
+    """Tries backends in order of health and preference until one answers in time"""
+
+    def __init__(self, backends, timeout=STT_TIMEOUT_SECONDS, hedge=STT_HEDGE):
+        self.backends = list(backends)
+        self.timeout = timeout
+        self.hedge = hedge
+        self.windows = {b.name: BackendWindow() for b in self.backends}
+        self._hedge_lock = threading.Lock()
+        self._hedge_stats = {"turns": 0, "hedged": 0, "hedge_wins": 0, "saved_seconds": 0.0, "saved_samples": 0}
+        self._running_lock = threading.Lock()
+        # attempts still running, including ones the router stopped waiting for
+        self.running = 0
+
+    def order(self):
+        """Available backends: healthy ones in preference order, then the rest by error rate"""
+        available = [b for b in self.backends if b.available()]
+        healthy = [b for b in available if self.windows[b.name].healthy()]
+        rest = [b for b in available if b not in healthy]
+        rest.sort(key=lambda b: (self.windows[b.name].benched(), self.windows[b.name].error_rate()))
+        return healthy + rest
+
+    def timeout_for(self, backend, is_last):
+        if is_last:
+            return max(self.timeout, OFFLINE_TIMEOUT_SECONDS) if backend.offline else self.timeout * 2
+        return self.timeout
+
+    def transcribe(self, audio, recognizer=None, hedge=None):
+        """Recognition from the first backend that answers; raises sr.UnknownValueError
+        when speech was heard but not understood and sr.RequestError when every backend failed
+
+        With hedging on, the two best backends race (see _hedged) before the
+        remaining ones are tried in turn.
+        """
+        recognizer = recognizer or sr.Recognizer()
+        order = self.order()
+        if not order:
+            raise sr.RequestError("no speech recognition backend is available")
+
+        start = time.perf_counter()
+        attempts = []
+        last_error = None
+        if (self.hedge if hedge is None else hedge) and len(order) >= 2:
+            result, last_error = self._hedged(order[0], order[1], recognizer, audio, start, attempts)
+            if result is not None:
+                return result
+            order = order[2:]
+
+        for i, backend in enumerate(order):
+            timeout = self.timeout_for(backend, i == len(order) - 1)
+            future = self.submit(backend, recognizer, audio, timeout)
+            try:
+                text, confidence = future.result(timeout)
+            except FutureTimeout:
+                attempts.append((backend.name, "timeout", time.perf_counter() - start))
+                print(f"STT {backend.name} timed out, failing over")
+                last_error = sr.RequestError(f"{backend.name} timed out")
+                continue
+            except sr.UnknownValueError:
+                # the backend worked, the audio just had no words in it
+                attempts.append((backend.name, "no speech", time.perf_counter() - start))
+                raise
+            except Exception as e:
+                attempts.append((backend.name, "error", time.perf_counter() - start))
+                print(f"STT {backend.name} error: {e}")
+                last_error = e
+                continue
+            attempts.append((backend.name, "ok", time.perf_counter() - start))
+            return Recognition(text, backend.name, confidence, time.perf_counter() - start, attempts)
+
+        raise sr.RequestError(f"all speech recognition backends failed: {last_error}")
+
+    def hedge_delay(self, backend):
+        """How long the primary gets alone: its recent p90, clamped to sane bounds"""
+        p90 = self.windows[backend.name].percentile(90)
+        return min(max(p90 if p90 is not None else HEDGE_DEFAULT_DELAY, HEDGE_MIN_DELAY), self.timeout)
+
+    def _hedged(self, primary, secondary, recognizer, audio, start, attempts):
+        """Race primary against secondary, the latter only once the primary is late or unsure
+
+        Returns (Recognition or None, last error). A confident transcript wins
+        at once; a low-confidence one starts the secondary if it isn't racing
+        yet and waits for it until the deadline, then the more confident of
+        the two is used. The loser is cancelled if it hasn't started,
+        otherwise its result is just dropped (it still updates its backend's
+        window).
+        """
+        with self._hedge_lock:
+            self._hedge_stats["turns"] += 1
+        hedge_at = start + self.hedge_delay(primary)
+        deadline = hedge_at + self.timeout
+        first = self.submit(primary, recognizer, audio, deadline - time.perf_counter())
+        racers = {first: primary}
+        hedged = False
+        fallback = None
+        last_error = None
+
+        def hedge():
+            racers[self.submit(secondary, recognizer, audio, max(deadline - time.perf_counter(), HEDGE_MIN_DELAY))] = secondary
+            with self._hedge_lock:
+                self._hedge_stats["hedged"] += 1
+            return True
+
+        while racers:
+            wait_until = deadline if hedged else hedge_at
+            done, _ = wait(racers, timeout=max(0.0, wait_until - time.perf_counter()), return_when=FIRST_COMPLETED)
+            if not done:
+                if hedged:
+                    break
+                hedged = hedge()
+                continue
+
+            for future in done:
+                backend = racers.pop(future)
+                elapsed = time.perf_counter() - start
+                try:
+                    text, confidence = future.result()
+                except sr.UnknownValueError:
+                    attempts.append((backend.name, "no speech", elapsed))
+                    if fallback is not None:
+                        # the other racer did hear words, however unsure
+                        continue
+                    self._cancel(racers)
+                    raise
+                except Exception as e:
+                    attempts.append((backend.name, "error", elapsed))
+                    print(f"STT {backend.name} error: {e}")
+                    last_error = e
+                    if not hedged:
+                        # primary failed fast: start the secondary right away
+                        hedged = hedge()
+                    continue
+
+                attempts.append((backend.name, "ok", elapsed))
+                result = Recognition(text, backend.name, confidence, elapsed, attempts)
+                if confidence is None or confidence >= MIN_CONFIDENCE:
+                    self._finish_race(result, backend is secondary, first, elapsed)
+                    self._cancel(racers)
+                    return result, last_error
+                if not hedged:
+                    # quick but unsure is the misrecognition the hedge is for: ask the secondary now
+                    hedged = hedge()
+                if fallback is None or fallback.confidence < confidence:
+                    fallback = result
+                if not racers:
+                    self._finish_race(fallback, fallback.backend == secondary.name, first, fallback.seconds)
+                    return fallback, last_error
+
+        for future, backend in racers.items():
+            attempts.append((backend.name, "timeout", time.perf_counter() - start))
+            print(f"STT {backend.name} timed out, failing over")
+        self._cancel(racers)
+        if fallback is not None:
+            self._finish_race(fallback, fallback.backend == secondary.name, first, fallback.seconds)
+            return fallback, last_error
+        return None, last_error or sr.RequestError("hedged recognisers timed out")
+
+    def _finish_race(self, result, secondary_won, primary_future, won_at):
+        if not secondary_won:
+            return
+        with self._hedge_lock:
+            self._hedge_stats["hedge_wins"] += 1
+        started = time.perf_counter() - won_at
+
+        def primary_done(future):
+            # latency saved = when the primary would have answered - when the hedge did
+            if future.cancelled() or future.exception() is not None:
+                return
+            with self._hedge_lock:
+                self._hedge_stats["saved_seconds"] += (time.perf_counter() - started) - won_at
+                self._hedge_stats["saved_samples"] += 1
+
+        primary_future.add_done_callback(primary_done)
+
+    def _cancel(self, racers):
+        for future in racers:
+            future.cancel()
+
+    def hedge_stats(self):
+        with self._hedge_lock:
+            stats = dict(self._hedge_stats)
+        stats["win_rate"] = stats["hedge_wins"] / stats["hedged"] if stats["hedged"] else None
+        stats["avg_saved_seconds"] = stats["saved_seconds"] / stats["saved_samples"] if stats["saved_samples"] else None
+        return stats
+
+    def submit(self, backend, recognizer, audio, timeout=None):
+        """Start one attempt with a deadline on its own thread; returns a Future
+
+        The outcome lands in the backend's window even if nobody waits.
+        """
+        window = self.windows[backend.name]
+        timeout = timeout or self.timeout_for(backend, False)
+        # a copy per attempt: racers share the caller's recognizer
+        recognizer = copy.copy(recognizer)
+        recognizer.operation_timeout = timeout
+        # worker threads don't inherit the caller's turn
+        turn = tracing.current_turn()
+        future = Future()
+
+        def attempt():
+            began = time.perf_counter()
+            outcome = "ok"
+            try:
+                result = backend.transcribe(recognizer, audio)
+            except sr.UnknownValueError:
+                outcome = "no speech"
+                window.record(time.perf_counter() - began, True)
+                raise
+            except Exception as e:
+                outcome = type(e).__name__
+                window.record(time.perf_counter() - began, False)
+                raise
+            else:
+                seconds = time.perf_counter() - began
+                window.record(seconds, seconds <= timeout, timed_out=seconds > timeout)
+                return result
+            finally:
+                tracing.record(f"stt.{backend.name}", (time.perf_counter() - began) * 1000, turn, outcome=outcome)
+
+        def run():
+            try:
+                if not future.set_running_or_notify_cancel():
+                    return
+                try:
+                    future.set_result(attempt())
+                except BaseException as e:
+                    future.set_exception(e)
+            finally:
+                with self._running_lock:
+                    self.running -= 1
+
+        with self._running_lock:
+            self.running += 1
+        threading.Thread(target=run, name=f"jarvis-stt-{backend.name}", daemon=True).start()
+        return future
+
+    def stats(self):
+        stats = {name: window.snapshot() for name, window in self.windows.items()}
+        stats["hedging"] = self.hedge_stats()
+        stats["running"] = self.running
+        return stats
+
+
+def default_backends(names=STT_BACKENDS):
+    factories = {
+        'google': lambda: GoogleBackend(APIKeys.GOOGLE_SPEECH_API_KEY),
+        'azure': lambda: AzureBackend(APIKeys.AZURE_SPEECH_KEY, APIKeys.AZURE_SPEECH_REGION),
+        'vosk': lambda: VoskBackend(),
+    }
+    return [factories[name]() for name in names if name in factories]
+
+
+def warm_up():
+    """Load the offline model in the background so the first fallback isn't slow"""
+    for backend in stt_router.backends:
+        if backend.offline and backend.available():
+            try:
+                backend.load()
+                print(f"STT {backend.name} model loaded")
+            except Exception as e:
+                print(f"STT {backend.name} load error: {e}")
+
+
+# Shared router used by takeCommand and enhanced_speech_recognition
+stt_router = STTRouter(default_backends())
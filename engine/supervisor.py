@@ -0,0 +1,470 @@
+"""
+Process supervisor for run.py
+run.py's worker processes (UI, hotword, audio capture) are owned by a
+Supervisor in the parent. Each worker gets a pipe: it sends heartbeats from
+its main loop with its CPU time, memory and any warm state it wants to keep,
+and receives everyone's status back. A worker that exits unexpectedly or
+stops beating is restarted with exponential backoff and gets its last warm
+state (wake cooldown, microphone calibration) handed back; the wake channel
+and audio bus belong to the parent, so they survive restarts untouched.
+Per-worker CPU, RSS, uptime and restarts go to logs/supervisor/status.json
+(`python -m engine.supervisor` prints them) and to the UI process. psutil is
+used for CPU/RSS when installed, otherwise the workers' own reports.
+"""
+
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from multiprocessing.connection import wait
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+STATUS_PATH = os.path.join('logs', 'supervisor', 'status.json')
+# workers beat at most this often; beat() in a tight loop is just a clock check
+HEARTBEAT_INTERVAL = 1.0
+# no beat for this long and the worker is considered hung
+HEARTBEAT_TIMEOUT = 10.0
+# time allowed for imports and model loading before the first beat
+STARTUP_GRACE = 30.0
+BACKOFF_INITIAL = 0.5
+BACKOFF_MAX = 30.0
+# a worker that ran this long before failing restarts with the initial backoff again
+STABLE_SECONDS = 60.0
+STATUS_INTERVAL = 5.0
+STOP_TIMEOUT = 5.0
+
+STARTING = "starting"
+RUNNING = "running"
+BACKOFF = "backoff"
+STOPPED = "stopped"
+
+
+def _rss_bytes():
+    """This process's resident memory, or None where it can't be read cheaply"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class WorkerLink:
+    """The worker's end of its supervisor pipe; a no-op when run without run.py's supervisor"""
+
+    def __init__(self):
+        self.conn = None
+        self.name = None
+        # state from the previous run of this worker, empty on the first start
+        self.warm_state = {}
+        # the latest status of every worker, pushed by the supervisor
+        self.workers = []
+        self._state = {}
+        self._state_sources = []
+        self._sent_state = None
+        self._last_beat = 0.0
+        self._parent_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def attached(self):
+        return self.conn is not None
+
+    def attach(self, conn, name, warm_state=None):
+        self.conn = conn
+        self.name = name
+        self.warm_state = dict(warm_state or {})
+        self._parent_pid = os.getppid()
+
+    def report(self, **state):
+        """Remember state for the next run of this worker; sent with the next beat"""
+        with self._lock:
+            self._state.update(state)
+
+    def keep_warm(self, source):
+        """source() -> dict, read on every beat and kept like report()"""
+        self._state_sources.append(source)
+
+    def beat(self, force=False):
+        """Tell the supervisor this worker's loop is alive; call it from the loop itself
+
+        Raises SystemExit once the supervisor is gone, so a worker doesn't
+        outlive run.py holding the microphone.
+        """
+        if self.conn is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_beat < HEARTBEAT_INTERVAL:
+            return
+        self._last_beat = now
+        for source in self._state_sources:
+            try:
+                self.report(**(source() or {}))
+            except Exception as e:
+                print(f"Warm state of {self.name} unavailable: {e}")
+        with self._lock:
+            state = dict(self._state)
+        message = {"type": "beat", "cpu": time.process_time(), "rss": _rss_bytes()}
+        if state != self._sent_state:
+            message["state"] = state
+            self._sent_state = state
+        self._send(message)
+        self._receive()
+        # a forked sibling may still hold the supervisor's end of our pipe, but we get reparented
+        if self.conn is None or os.getppid() != self._parent_pid:
+            self.conn = None
+            raise SystemExit(f"{self.name}: supervisor gone")
+
+    def run(self, sleep=time.sleep):
+        """Beat forever; for processes whose loop is an event loop (pass eel.sleep in the UI)"""
+        while True:
+            self.beat(force=True)
+            sleep(HEARTBEAT_INTERVAL)
+
+    def _send(self, message):
+        with self._lock:
+            if self.conn is None:
+                return
+            try:
+                self.conn.send(message)
+            except (OSError, EOFError):
+                # supervisor gone; beat() ends the process
+                self.conn = None
+
+    def _receive(self):
+        with self._lock:
+            try:
+                while self.conn is not None and self.conn.poll():
+                    message = self.conn.recv()
+                    if message.get("type") == "status":
+                        self.workers = message["workers"]
+            except (OSError, EOFError):
+                self.conn = None
+
+
+# This process's link to the supervisor; attached by _worker_main in supervised workers
+worker = WorkerLink()
+
+
+def _worker_main(conn, name, target, args, warm_state, supervisor_end=None):
+    # a forked worker inherits run()'s SIGTERM handler; Supervisor.stop() needs the default one
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if supervisor_end is not None:
+        # inherited by fork; closed so the pipe breaks when the supervisor goes away
+        supervisor_end.close()
+    worker.attach(conn, name, warm_state)
+    target(*args)
+
+
+class Worker:
+    """A supervised process: how to start it and how it has been doing"""
+
+    def __init__(self, name, target, args=(), critical=False, heartbeat_timeout=HEARTBEAT_TIMEOUT,
+                 startup_grace=STARTUP_GRACE):
+        self.name = name
+        self.target = target
+        self.args = tuple(args)
+        # a clean exit (status 0) of a critical worker stops everything, e.g. the UI window closing
+        self.critical = critical
+        self.heartbeat_timeout = heartbeat_timeout
+        self.startup_grace = startup_grace
+        self.process = None
+        self.conn = None
+        self.state = STOPPED
+        self.warm_state = {}
+        self.restarts = 0
+        self.backoff = None
+        self.next_start = None
+        self.started_at = None
+        self.started_wall = None
+        self.last_beat = None
+        self.last_exit = None
+        self.last_failure = None
+        self.cpu_percent = None
+        self.rss = None
+        self._cpu_sample = None
+        self._psutil_process = None
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process is not None else None
+
+    def status(self):
+        now = time.monotonic()
+        running = self.state in (STARTING, RUNNING)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "pid": self.pid if running else None,
+            "uptime_s": round(now - self.started_at, 1) if running and self.started_at else None,
+            "started_at": self.started_wall if running else None,
+            "restarts": self.restarts,
+            "last_beat_s": round(now - self.last_beat, 1) if running and self.last_beat else None,
+            "cpu_percent": self.cpu_percent if running else None,
+            "rss_mb": round(self.rss / (1024 * 1024), 1) if running and self.rss else None,
+            "last_exit": self.last_exit,
+            "last_failure": self.last_failure,
+            "restart_in_s": round(max(0.0, self.next_start - now), 1) if self.state == BACKOFF else None,
+        }
+
+
+class Supervisor:
+    """Starts the workers, watches their heartbeats and exits, restarts them with backoff"""
+
+    def __init__(self, status_path=STATUS_PATH, backoff_initial=BACKOFF_INITIAL, backoff_max=BACKOFF_MAX,
+                 stable_seconds=STABLE_SECONDS, status_interval=STATUS_INTERVAL, context=None):
+        self.status_path = status_path
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.stable_seconds = stable_seconds
+        self.status_interval = status_interval
+        self._context = context or multiprocessing.get_context()
+        self._workers = {}
+        self._stopping = False
+        self._last_status = 0.0
+
+    def add(self, name, target, args=(), critical=False, heartbeat_timeout=HEARTBEAT_TIMEOUT,
+            startup_grace=STARTUP_GRACE):
+        """Register a worker; target(*args) must be a picklable top-level function"""
+        if name in self._workers:
+            raise ValueError(f"worker {name!r} added twice")
+        self._workers[name] = Worker(name, target, args, critical, heartbeat_timeout, startup_grace)
+        return self._workers[name]
+
+    def worker(self, name):
+        return self._workers[name]
+
+    def start(self):
+        """Start every worker in the order they were added"""
+        for worker in self._workers.values():
+            self._spawn(worker)
+        return self
+
+    def run(self):
+        """Supervise until a critical worker exits cleanly or Ctrl+C, then stop the rest"""
+        if threading.current_thread() is threading.main_thread():
+            # `kill`/service stop: shut the workers down too instead of orphaning them
+            signal.signal(signal.SIGTERM, lambda signum, frame: self._request_stop())
+        if not any(worker.process is not None for worker in self._workers.values()):
+            self.start()
+        try:
+            while not self._stopping:
+                self.poll(HEARTBEAT_INTERVAL / 2)
+        except KeyboardInterrupt:
+            print("Supervisor interrupted")
+        finally:
+            self.stop()
+
+    def poll(self, timeout=0.0):
+        """One supervision step: read heartbeats, reap exits, restart what's due"""
+        live = [w for w in self._workers.values() if w.process is not None]
+        waitables = [w.conn for w in live] + [w.process.sentinel for w in live]
+        due = [w.next_start for w in self._workers.values() if w.state == BACKOFF]
+        if due:
+            timeout = max(0.0, min(timeout, min(due) - time.monotonic()))
+        if waitables:
+            ready = wait(waitables, timeout)
+        else:
+            time.sleep(timeout)
+            ready = []
+
+        for worker in live:
+            if worker.conn in ready:
+                self._read(worker)
+        for worker in live:
+            if worker.process.sentinel in ready or not worker.process.is_alive():
+                self._reap(worker)
+            elif self._hung(worker):
+                self._fail(worker, f"no heartbeat for {self._silence(worker):.1f}s")
+
+        now = time.monotonic()
+        for worker in self._workers.values():
+            if worker.state == BACKOFF and now >= worker.next_start and not self._stopping:
+                self._spawn(worker)
+        if now - self._last_status >= self.status_interval:
+            self._last_status = now
+            self._publish()
+
+    def _request_stop(self):
+        self._stopping = True
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """Terminate every worker (they get timeout seconds to exit) and write the final status"""
+        self._stopping = True
+        for worker in self._workers.values():
+            if worker.process is not None and worker.process.is_alive():
+                worker.process.terminate()
+        deadline = time.monotonic() + timeout
+        for worker in self._workers.values():
+            if worker.process is not None:
+                worker.process.join(max(0.0, deadline - time.monotonic()))
+                if worker.process.is_alive():
+                    worker.process.kill()
+                    worker.process.join()
+                self._release(worker)
+            worker.state = STOPPED
+        self._publish()
+
+    def status(self):
+        return [worker.status() for worker in self._workers.values()]
+
+    def _spawn(self, worker):
+        parent_conn, child_conn = self._context.Pipe()
+        worker.process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, worker.name, worker.target, worker.args, worker.warm_state, parent_conn),
+            name=f"jarvis-{worker.name}")
+        worker.process.start()
+        child_conn.close()
+        worker.conn = parent_conn
+        worker.state = STARTING
+        worker.started_at = time.monotonic()
+        worker.started_wall = time.time()
+        worker.last_beat = None
+        worker.cpu_percent = None
+        worker.rss = None
+        worker._cpu_sample = None
+        worker._psutil_process = None
+        worker.next_start = None
+
+    def _read(self, worker):
+        try:
+            while worker.conn.poll():
+                message = worker.conn.recv()
+                if message.get("type") == "beat":
+                    self._beat(worker, message)
+        except (OSError, EOFError):
+            # the worker end closed; its sentinel tells us how it exited
+            pass
+
+    def _beat(self, worker, message):
+        now = time.monotonic()
+        if worker.state == STARTING:
+            # beats come from the worker's own loop, so the first one means it is up and working
+            worker.state = RUNNING
+            if worker.restarts:
+                print(f"Worker {worker.name} back up {now - worker.started_at:.1f}s after restart")
+        worker.last_beat = now
+        if "state" in message:
+            worker.warm_state.update(message["state"])
+
+        if psutil is not None:
+            self._sample_psutil(worker)
+            return
+        cpu = message.get("cpu")
+        if cpu is not None:
+            if worker._cpu_sample is not None and now > worker._cpu_sample[1]:
+                worker.cpu_percent = round((cpu - worker._cpu_sample[0]) / (now - worker._cpu_sample[1]) * 100, 1)
+            worker._cpu_sample = (cpu, now)
+        worker.rss = message.get("rss")
+
+    def _sample_psutil(self, worker):
+        try:
+            if worker._psutil_process is None:
+                worker._psutil_process = psutil.Process(worker.pid)
+                # the first cpu_percent() call only sets the baseline
+                worker._psutil_process.cpu_percent(None)
+                return
+            worker.cpu_percent = worker._psutil_process.cpu_percent(None)
+            worker.rss = worker._psutil_process.memory_info().rss
+        except psutil.Error:
+            pass
+
+    def _silence(self, worker):
+        return time.monotonic() - (worker.last_beat or worker.started_at)
+
+    def _hung(self, worker):
+        if worker.state == RUNNING:
+            return self._silence(worker) > worker.heartbeat_timeout
+        # until the loop beats, only the startup grace applies
+        return worker.state == STARTING and time.monotonic() - worker.started_at > worker.startup_grace
+
+    def _reap(self, worker):
+        worker.process.join()
+        code = worker.process.exitcode
+        worker.last_exit = code
+        if self._stopping:
+            self._release(worker)
+            worker.state = STOPPED
+        elif code == 0 and worker.critical:
+            print(f"Worker {worker.name} finished; stopping")
+            self._release(worker)
+            worker.state = STOPPED
+            self._stopping = True
+        else:
+            self._fail(worker, f"exited with status {code}")
+
+    def _fail(self, worker, reason):
+        ran = time.monotonic() - worker.started_at
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
+            worker.last_exit = worker.process.exitcode
+        self._release(worker)
+        if worker.backoff is None or ran >= self.stable_seconds:
+            worker.backoff = self.backoff_initial
+        else:
+            worker.backoff = min(worker.backoff * 2, self.backoff_max)
+        worker.restarts += 1
+        worker.last_failure = f"{reason} after {ran:.1f}s"
+        worker.state = BACKOFF
+        worker.next_start = time.monotonic() + worker.backoff
+        print(f"Worker {worker.name} {reason} after {ran:.1f}s; restarting in {worker.backoff:g}s")
+        self._publish()
+
+    def _release(self, worker):
+        if worker.conn is not None:
+            worker.conn.close()
+            worker.conn = None
+        worker.process = None
+
+    def _publish(self):
+        status = self.status()
+        for worker in self._workers.values():
+            if worker.conn is not None:
+                try:
+                    worker.conn.send({"type": "status", "workers": status})
+                except (OSError, EOFError):
+                    pass
+        if self.status_path:
+            try:
+                os.makedirs(os.path.dirname(self.status_path) or '.', exist_ok=True)
+                tmp_path = self.status_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({"ts": time.time(), "pid": os.getpid(), "workers": status}, f, indent=1)
+                os.replace(tmp_path, self.status_path)
+            except OSError as e:
+                print(f"Could not write supervisor status: {e}")
+
+
+def print_status(path=STATUS_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        print(f"No supervisor status at {path}; is run.py running?")
+        return 1
+
+    def fmt(value, spec):
+        return "-" if value is None else format(value, spec)
+
+    age = time.time() - snapshot["ts"]
+    print(f"Supervisor pid {snapshot['pid']}, status from {age:.0f}s ago")
+    print(f"  {'worker':10s} {'state':9s} {'pid':>7s} {'uptime':>9s} {'cpu %':>6s} {'rss MB':>7s} {'restarts':>8s}  last failure")
+    for w in snapshot["workers"]:
+        print(f"  {w['name']:10s} {w['state']:9s} {fmt(w['pid'], 'd'):>7s} {fmt(w['uptime_s'], '.0f') + ('s' if w['uptime_s'] is not None else ''):>9s} "
+              f"{fmt(w['cpu_percent'], '.1f'):>6s} {fmt(w['rss_mb'], '.1f'):>7s} {w['restarts']:8d}  "
+              f"{w['last_failure'] or ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(print_status(sys.argv[1] if len(sys.argv) > 1 else STATUS_PATH))
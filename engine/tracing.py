@@ -0,0 +1,229 @@
+"""
+Per-turn latency tracing for JARVIS
+Spans (stage, duration, turn ID) are timed with perf_counter and appended by a
+background thread to rotating JSONL files under logs/traces, one file per
+process role. `python -m engine.tracing` prints p50/p95/p99 per stage.
+"""
+
+import argparse
+import contextlib
+import contextvars
+import glob
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+from engine.config import TRACE_DIR, TRACE_ENABLED
+
+MAX_FILE_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 3
+MAX_PENDING_SPANS = 10000
+
+_current_turn = contextvars.ContextVar('jarvis_turn', default=None)
+
+
+def new_turn(turn_id=None):
+    """Start a turn (or adopt one from another process) and make it current"""
+    turn_id = turn_id or uuid.uuid4().hex[:12]
+    _current_turn.set(turn_id)
+    return turn_id
+
+
+def current_turn():
+    return _current_turn.get()
+
+
+class TraceWriter:
+    """Appends span dicts as JSON lines, rotating at MAX_FILE_BYTES"""
+
+    def __init__(self, directory=TRACE_DIR, role='main', enabled=TRACE_ENABLED):
+        self.directory = directory
+        self.role = role
+        self.enabled = enabled
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=MAX_PENDING_SPANS)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"trace-{self.role}.jsonl")
+
+    def configure(self, role=None, directory=None, enabled=None):
+        """Set the process role (file name) before the first span, e.g. in a child process"""
+        if role is not None:
+            self.role = role
+        if directory is not None:
+            self.directory = directory
+        if enabled is not None:
+            self.enabled = enabled
+
+    def write(self, record):
+        if not self.enabled:
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout=2.0):
+        """Wait until queued spans are on disk"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="jarvis-trace", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                self._rotate_if_needed()
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, separators=(',', ':')) + "\n")
+                    # write whatever else is already waiting while the file is open
+                    while True:
+                        try:
+                            extra = self._queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        f.write(json.dumps(extra, separators=(',', ':')) + "\n")
+                        self._queue.task_done()
+            except Exception as e:
+                print(f"Trace write error: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _rotate_if_needed(self):
+        try:
+            if os.path.getsize(self.path) < MAX_FILE_BYTES:
+                return
+        except OSError:
+            return
+        for i in range(BACKUP_COUNT - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+writer = TraceWriter()
+
+
+def record(stage, duration_ms, turn=None, **attrs):
+    """Store an already measured span that ends now
+
+    ts is wall-clock (for --since windows and matching across processes),
+    mono is the perf_counter start for ordering spans within one process.
+    """
+    span = {"ts": time.time(), "mono": round(time.perf_counter() - duration_ms / 1000, 6),
+            "turn": turn or current_turn(), "stage": stage, "ms": round(duration_ms, 3), "pid": os.getpid()}
+    if attrs:
+        span["attrs"] = attrs
+    writer.write(span)
+    return span
+
+
+@contextlib.contextmanager
+def span(stage, turn=None, **attrs):
+    """Time the with-block as one span; exceptions are recorded and re-raised"""
+    start = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs["error"] = type(e).__name__
+        raise
+    finally:
+        record(stage, (time.perf_counter() - start) * 1000, turn, **attrs)
+
+
+def load_spans(directory=TRACE_DIR, since=None):
+    """Every span in the trace files, optionally only those newer than since (epoch seconds)"""
+    spans = []
+    for path in glob.glob(os.path.join(directory, "trace-*.jsonl*")):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue
+                if since is None or item.get("ts", 0) >= since:
+                    spans.append(item)
+    return spans
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def stage_summary(spans):
+    """{stage: {count, p50, p95, p99, max, errors}} in milliseconds"""
+    by_stage = {}
+    for item in spans:
+        by_stage.setdefault(item["stage"], []).append(item)
+    summary = {}
+    for stage, items in by_stage.items():
+        values = [item["ms"] for item in items]
+        summary[stage] = {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": max(values),
+            "errors": sum(1 for item in items if item.get("attrs", {}).get("error")),
+        }
+    return summary
+
+
+def parse_window(text):
+    """'90s', '15m', '2h', '7d' -> seconds"""
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    if text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine.tracing",
+                                     description="Latency percentiles per stage from JARVIS traces")
+    parser.add_argument("--since", default="24h", help="time window, e.g. 30m, 6h, 7d (default 24h)")
+    parser.add_argument("--dir", default=TRACE_DIR, help="trace directory")
+    parser.add_argument("--turns", type=int, default=0, help="also list the N slowest turns")
+    args = parser.parse_args(argv)
+
+    spans = load_spans(args.dir, time.time() - parse_window(args.since))
+    if not spans:
+        print(f"No spans in {args.dir} for the last {args.since}")
+        return
+
+    summary = stage_summary(spans)
+    print(f"{'stage':28s} {'count':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'max ms':>9s} {'err':>4s}")
+    for stage in sorted(summary):
+        s = summary[stage]
+        print(f"{stage:28s} {s['count']:6d} {s['p50']:9.1f} {s['p95']:9.1f} {s['p99']:9.1f} {s['max']:9.1f} {s['errors']:4d}")
+
+    if args.turns:
+        turns = {}
+        for item in spans:
+            if item.get("turn") and item["stage"] == "turn":
+                turns[item["turn"]] = item["ms"]
+        print(f"\nSlowest {args.turns} turns:")
+        for turn, ms in sorted(turns.items(), key=lambda kv: -kv[1])[:args.turns]:
+            stages = sorted((item for item in spans if item.get("turn") == turn), key=lambda item: item["ts"] - item["ms"] / 1000)
+            breakdown = ", ".join(f"{item['stage']} {item['ms']:.0f}" for item in stages if item["stage"] != "turn")
+            print(f"  {turn} {ms:8.0f} ms: {breakdown}")
+
+
+if __name__ == "__main__":
+    main()
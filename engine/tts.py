@@ -0,0 +1,271 @@
+"""
+Background text-to-speech service for JARVIS
+One warmed-up pyttsx3 engine is owned by a dedicated worker thread, so
+callers queue utterances instead of re-initialising the synthesizer each time
+"""
+
+import queue
+import threading
+import time
+
+from engine import tracing
+from engine.speech_cache import SpeechCache
+
+TTS_DRIVER = 'sapi5'
+VOICE_INDEX = 0
+SPEECH_RATE = 180
+MAX_QUEUED_UTTERANCES = 16
+# how long the idle worker waits on user speech before checking for pre-render work
+RENDER_POLL_SECONDS = 0.25
+
+
+class SpeechHandle:
+    """Handle for one queued utterance, returned by SpeechService.speak()"""
+
+    def __init__(self, text, render_only=False):
+        self.text = text
+        self.render_only = render_only
+        # the turn this utterance answers, for tracing
+        self.turn = tracing.current_turn()
+        self.queued_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self._done = threading.Event()
+
+    def done(self):
+        """True once the utterance has been spoken (or failed)"""
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the utterance has been spoken, returns False on timeout"""
+        return self._done.wait(timeout)
+
+    @property
+    def time_to_first_audio(self):
+        """Seconds between queueing and the synthesizer starting to speak"""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.queued_at
+
+    def _finish(self, error=None):
+        self.error = error
+        self.finished_at = time.perf_counter()
+        self._done.set()
+
+
+class SpeechService:
+    """Long-lived speech worker with a bounded utterance queue"""
+
+    def __init__(self, driver=TTS_DRIVER, voice_index=VOICE_INDEX, rate=SPEECH_RATE,
+                 max_queue=MAX_QUEUED_UTTERANCES, cache=None):
+        self.driver = driver
+        self.voice_index = voice_index
+        self.rate = rate
+        self.cache = cache
+        self.voice_id = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        # pre-render work, only picked up while no user speech is queued
+        self._renders = queue.Queue()
+        self._thread = None
+        self._ready = threading.Event()
+        self._start_lock = threading.Lock()
+        self._current = None
+        self._stats_lock = threading.Lock()
+        self._spoken = 0
+        self._failed = 0
+        self._max_depth = 0
+        self._last_ttfa = None
+        self._total_ttfa = 0.0
+        self._ttfa_samples = 0
+
+    def start(self):
+        """Start the worker thread and wait for the engine to warm up"""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._ready.clear()
+                self._thread = threading.Thread(target=self._run, name="jarvis-tts", daemon=True)
+                self._thread.start()
+        self._ready.wait(10)
+
+    def speak(self, text, wait=False):
+        """Queue text for speaking and return its SpeechHandle
+
+        The call returns immediately unless wait=True. When the queue is full
+        the caller blocks until the worker frees a slot.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+
+        handle = SpeechHandle(text)
+        self._queue.put(handle)
+        with self._stats_lock:
+            self._max_depth = max(self._max_depth, self._queue.qsize())
+
+        if wait:
+            handle.wait()
+        return handle
+
+    def prerender(self, texts):
+        """Queue uncached phrases to be rendered into the speech cache
+
+        Renders wait in their own queue and run only while no user speech is
+        pending, so speak() never queues behind them and wait_idle() doesn't
+        wait for them.
+        """
+        if self.cache is None:
+            return []
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+
+        if not self.cache.playback_available():
+            return []
+
+        handles = []
+        for text in dict.fromkeys(texts):
+            if self.cache.cacheable(text) and not self.cache.contains(text, self.voice_id, self.rate):
+                handle = SpeechHandle(text, render_only=True)
+                self._renders.put(handle)
+                handles.append(handle)
+        return handles
+
+    def wait_idle(self, timeout=None):
+        """Block until every queued utterance has been spoken (pre-renders excluded)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.02)
+        return True
+
+    def busy(self):
+        """True while anything is queued or being spoken"""
+        return self._queue.unfinished_tasks > 0
+
+    def stop(self):
+        """Ask the worker to exit after the queued utterances"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(5)
+
+    def stats(self):
+        """Counters for queue depth, time-to-first-audio and cache hits"""
+        with self._stats_lock:
+            average = self._total_ttfa / self._ttfa_samples if self._ttfa_samples else None
+            return {
+                "cache": self.cache.stats() if self.cache is not None else None,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_depth,
+                "spoken": self._spoken,
+                "failed": self._failed,
+                "last_time_to_first_audio": self._last_ttfa,
+                "avg_time_to_first_audio": average,
+            }
+
+    def _create_engine(self):
+        # SAPI5 is a COM object, every thread that touches it needs COM initialised
+        try:
+            import comtypes
+            comtypes.CoInitialize()
+        except Exception:
+            pass
+
+        import pyttsx3
+        engine = pyttsx3.init(self.driver)
+        voices = engine.getProperty('voices')
+        if voices:
+            self.voice_id = voices[min(self.voice_index, len(voices) - 1)].id
+            engine.setProperty('voice', self.voice_id)
+        engine.setProperty('rate', self.rate)
+        engine.connect('started-utterance', self._on_started)
+        return engine
+
+    def _on_started(self, name=None):
+        handle = self._current
+        if handle is not None and handle.started_at is None:
+            handle.started_at = time.perf_counter()
+            with self._stats_lock:
+                self._last_ttfa = handle.time_to_first_audio
+                self._total_ttfa += self._last_ttfa
+                self._ttfa_samples += 1
+
+    def _speak_now(self, engine, handle):
+        cache = self.cache
+        if cache is not None and cache.playback_available() and cache.cacheable(handle.text):
+            if handle.render_only:
+                cache.render(engine, handle.text, self.voice_id, self.rate)
+                return
+            if cache.play(handle.text, self.voice_id, self.rate, on_start=self._on_started):
+                return
+            # render once, every later request for this phrase is a cache hit
+            if cache.render(engine, handle.text, self.voice_id, self.rate):
+                if cache.play(handle.text, self.voice_id, self.rate, on_start=self._on_started):
+                    return
+
+        engine.say(handle.text)
+        engine.runAndWait()
+
+    def _trace(self, handle):
+        if handle.started_at is not None:
+            tracing.record("tts.first_audio", (handle.started_at - handle.queued_at) * 1000, handle.turn)
+            tracing.record("tts.playback", (handle.finished_at - handle.started_at) * 1000, handle.turn,
+                           chars=len(handle.text))
+        else:
+            tracing.record("tts.failed" if handle.error else "tts.total",
+                           (handle.finished_at - handle.queued_at) * 1000, handle.turn)
+
+    def _next(self):
+        # user speech first; a pre-render only when nothing is waiting to be spoken
+        try:
+            return self._queue.get_nowait(), self._queue
+        except queue.Empty:
+            pass
+        try:
+            return self._renders.get_nowait(), self._renders
+        except queue.Empty:
+            pass
+        while True:
+            try:
+                return self._queue.get(timeout=RENDER_POLL_SECONDS), self._queue
+            except queue.Empty:
+                if not self._renders.empty():
+                    return self._renders.get(), self._renders
+
+    def _run(self):
+        try:
+            engine = self._create_engine()
+        except Exception as e:
+            print(f"TTS engine error: {e}")
+            engine = None
+        self._ready.set()
+
+        while True:
+            handle, source = self._next()
+            if handle is None:
+                source.task_done()
+                break
+
+            self._current = handle
+            error = None
+            try:
+                if engine is None:
+                    raise RuntimeError("TTS engine not available")
+                self._speak_now(engine, handle)
+            except Exception as e:
+                print(f"TTS error: {e}")
+                error = e
+            finally:
+                self._current = None
+                with self._stats_lock:
+                    if error is None:
+                        self._spoken += 1
+                    else:
+                        self._failed += 1
+                handle._finish(error)
+                source.task_done()
+                if not handle.render_only:
+                    self._trace(handle)
+
+
+# Global speech service used by engine.command.speak()
+speech_service = SpeechService(cache=SpeechCache())
@@ -0,0 +1,117 @@
+"""
+Energy/zero-crossing voice activity detection for fast endpointing
+Frames are classified with vectorised NumPy RMS and zero-crossing rate
+against an adaptive noise floor, smoothed with onset and hangover counters.
+A phrase ends a few hundred milliseconds after the last speech frame instead
+of after Recognizer.listen's fixed one-second pause.
+"""
+
+import threading
+
+import numpy as np
+
+# aggressiveness -> (energy ratio over the noise floor, onset ms, hangover ms)
+# higher levels reject more noise and end phrases sooner
+AGGRESSIVENESS = {
+    0: (1.5, 60, 800),
+    1: (2.0, 90, 600),
+    2: (2.5, 90, 450),
+    3: (3.5, 120, 300),
+}
+# the most aggressive level that clips no command in bench_vad.py's corpus, like Recognizer.listen;
+# level 1 ends ~200 ms sooner but loses fricative-heavy endings in loud rooms (test_vad.py)
+DEFAULT_AGGRESSIVENESS = 0
+
+# voiced speech stays under this zero-crossing rate; hiss and clicks go above it
+MAX_VOICED_ZCR = 0.25
+# ...unless the frame is this many times louder than the threshold (fricatives)
+LOUD_UNVOICED_RATIO = 1.5
+# noise floor EMA weight per non-speech frame
+NOISE_ADAPT = 0.05
+MIN_NOISE_FLOOR = 50.0
+
+SPEECH_START = "speech_start"
+SPEECH_END = "speech_end"
+
+
+def frame_features(frames):
+    """RMS and zero-crossing rate for each row of an (n, frame_length) int16 array"""
+    frames = np.atleast_2d(frames)
+    samples = frames.astype(np.float32)
+    rms = np.sqrt(np.mean(samples * samples, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frames.shape[1] - 1)
+    return rms, zcr
+
+
+def split_frames(samples, frame_length):
+    """View a 1-D int16 signal as whole frames, dropping the ragged tail"""
+    count = len(samples) // frame_length
+    return samples[:count * frame_length].reshape(count, frame_length)
+
+
+class VoiceActivityDetector:
+    """Streaming speech/non-speech decisions with an end-of-speech event"""
+
+    def __init__(self, frame_seconds, aggressiveness=DEFAULT_AGGRESSIVENESS, noise_floor=None,
+                 on_end_of_speech=None):
+        ratio, onset_ms, hangover_ms = AGGRESSIVENESS[aggressiveness]
+        self.frame_seconds = frame_seconds
+        self.ratio = ratio
+        self.onset_frames = max(1, round(onset_ms / 1000 / frame_seconds))
+        self.hangover_frames = max(1, round(hangover_ms / 1000 / frame_seconds))
+        self.noise_floor = max(noise_floor or MIN_NOISE_FLOOR, MIN_NOISE_FLOOR)
+        self.on_end_of_speech = on_end_of_speech
+        self.end_of_speech = threading.Event()
+        self.in_speech = False
+        self.frames = 0
+        self.speech_started_at = None
+        self.speech_ended_at = None
+        self._voiced_run = 0
+        self._silent_run = 0
+
+    def is_speech(self, rms, zcr):
+        threshold = self.noise_floor * self.ratio
+        return rms > threshold and (zcr < MAX_VOICED_ZCR or rms > threshold * LOUD_UNVOICED_RATIO)
+
+    def process(self, frame):
+        """Feed one int16 frame; returns SPEECH_START, SPEECH_END or None"""
+        rms, zcr = frame_features(frame)
+        return self.update(float(rms[0]), float(zcr[0]))
+
+    def update(self, rms, zcr):
+        """Advance the state machine with precomputed features for one frame"""
+        self.frames += 1
+        speech = self.is_speech(rms, zcr)
+        if not speech:
+            self.noise_floor = max(MIN_NOISE_FLOOR, self.noise_floor + NOISE_ADAPT * (rms - self.noise_floor))
+
+        if not self.in_speech:
+            self._voiced_run = self._voiced_run + 1 if speech else 0
+            if self._voiced_run >= self.onset_frames:
+                self.in_speech = True
+                self._silent_run = 0
+                self.speech_started_at = (self.frames - self.onset_frames) * self.frame_seconds
+                return SPEECH_START
+            return None
+
+        self._silent_run = 0 if speech else self._silent_run + 1
+        if self._silent_run >= self.hangover_frames:
+            self.in_speech = False
+            self._voiced_run = 0
+            self.speech_ended_at = (self.frames - self.hangover_frames) * self.frame_seconds
+            self.end_of_speech.set()
+            if self.on_end_of_speech is not None:
+                self.on_end_of_speech(self)
+            return SPEECH_END
+        return None
+
+    def run(self, samples, frame_length):
+        """Offline pass over a whole signal; returns [(event, frame_index)]"""
+        rms, zcr = frame_features(split_frames(samples, frame_length))
+        events = []
+        for i, (r, z) in enumerate(zip(rms.tolist(), zcr.tolist())):
+            event = self.update(r, z)
+            if event is not None:
+                events.append((event, i))
+        return events
@@ -0,0 +1,121 @@
+"""
+Wake-word channel between the hotword process and the UI process
+run.py hands one multiprocessing.Queue to both processes: hotword() puts a
+timestamped wake event on it and the UI process starts listening straight
+away, instead of faking a Win+J keypress that only works while the window
+has focus. Wake-to-listening latency is measured on every wake.
+"""
+
+import queue
+import threading
+import time
+
+from engine import tracing
+
+# ignore repeat detections of the same utterance in adjacent frames
+WAKE_COOLDOWN_SECONDS = 1.0
+POLL_INTERVAL_SECONDS = 0.01
+LATENCY_HISTORY = 50
+
+
+def wake_event(keyword_index, sequence=None, turn=None):
+    """Event sent by the hotword process; time.time() is comparable across processes
+
+    sequence is the audio bus frame right after the wake word, when the bus is
+    used; turn is the trace ID the UI process continues.
+    """
+    return {"keyword": keyword_index, "detected_at": time.time(), "sequence": sequence, "turn": turn}
+
+
+def send_wake(channel, keyword_index, sequence=None, turn=None):
+    """Put a wake event on the channel without ever blocking the audio loop"""
+    try:
+        channel.put_nowait(wake_event(keyword_index, sequence, turn))
+        return True
+    except queue.Full:
+        return False
+
+
+class WakeLatency:
+    """Tracks the most recent wake and how long it took to reach the microphone"""
+
+    def __init__(self, history=LATENCY_HISTORY):
+        self._lock = threading.Lock()
+        self._pending = None
+        self.history = history
+        self.transport_ms = []
+        self.listening_ms = []
+        self.ignored = 0
+
+    def received(self, event):
+        received_at = time.time()
+        with self._lock:
+            self._pending = event
+            ms = (received_at - event["detected_at"]) * 1000
+            self._append(self.transport_ms, ms)
+        tracing.record("wake.transport", ms, event.get("turn"))
+
+    def pending(self):
+        """The wake event the next turn is answering, if any"""
+        with self._lock:
+            return self._pending
+
+    def mark_listening(self):
+        """Called once the microphone is open; logs the latency of a pending wake"""
+        with self._lock:
+            event, self._pending = self._pending, None
+            if event is None:
+                return None
+            ms = (time.time() - event["detected_at"]) * 1000
+            self._append(self.listening_ms, ms)
+        tracing.record("wake.to_listening", ms, event.get("turn"))
+        print(f"Wake to listening: {ms:.0f} ms")
+        return ms
+
+    def stats(self):
+        with self._lock:
+            listening = sorted(self.listening_ms)
+            return {
+                "wakes": len(self.listening_ms),
+                "ignored": self.ignored,
+                "transport_ms_avg": sum(self.transport_ms) / len(self.transport_ms) if self.transport_ms else None,
+                "listening_ms_p50": listening[len(listening) // 2] if listening else None,
+                "listening_ms_max": listening[-1] if listening else None,
+            }
+
+    def _append(self, values, ms):
+        values.append(ms)
+        if len(values) > self.history:
+            del values[0]
+
+
+wake_latency = WakeLatency()
+
+
+def drain(channel):
+    """Drop wake events that queued up while a voice session was already running"""
+    dropped = 0
+    while True:
+        try:
+            channel.get_nowait()
+        except queue.Empty:
+            return dropped
+        dropped += 1
+
+
+def listen_for_wake(channel, on_wake, sleep=time.sleep):
+    """Poll the channel forever, calling on_wake(event) for each wake
+
+    Runs inside the UI process; pass eel.sleep so polling yields to the
+    eel/gevent loop instead of blocking it.
+    """
+    while True:
+        try:
+            event = channel.get_nowait()
+        except queue.Empty:
+            sleep(POLL_INTERVAL_SECONDS)
+            continue
+        wake_latency.received(event)
+        on_wake(event)
+        # the session started by this wake is over; anything said meanwhile was for it
+        wake_latency.ignored += drain(channel)
@@ -1,14 +1,121 @@
+import time
+# taken before the imports below so the "ready" time includes them
+STARTED = time.perf_counter()
+
 import os
+import threading
 import eel
-from engine.features import *
-from engine.command import *
+from engine.boot import BootGraph
+from engine.command import allCommand
+from engine.config import PREWARM_ENABLED
+from engine.gevent_bridge import bridge
+from engine.lazy import lazy
+from engine.listener import listener
+from engine.supervisor import worker
+
+# exposed to the UI without importing engine.features (and everything it uses) at startup;
+# playsound blocks until the clip ends, so the UI's call runs off the hub
+playAssistantSound = eel.expose(bridge.offload(lazy.function('engine.features:playAssistantSound')))
+
+
+def openDatabase():
+    # per-thread connections are cheap once the file and WAL are open
+    from engine.database import database
+    database.connection()
+    database.reader()
+
+
+def loadContacts():
+    # import contacts.csv if it changed since the last run, then index it
+    from engine.contact_import import sync_contacts
+    from engine.contact_index import warm_up as build_contact_index
+    try:
+        sync_contacts()
+    except Exception as e:
+        print(f"Contact import error: {e}")
+    build_contact_index()
+
+
+def loadApps():
+    from engine.app_index import app_resolver
+    app_resolver.names()
+
+
+def startSpeech():
+    from engine.tts import speech_service
+    speech_service.start()
+
+
+def renderSpeechCache():
+    from engine.speech_cache import warm_up
+    warm_up()
+
+
+def loadSttModels():
+    from engine.stt import warm_up
+    warm_up()
+
+
+def prewarmHandlers():
+    lazy.prewarm(delay=0).join()
+
+
+def bootGraph():
+    """Startup stages; "ui" is finished by start() once eel is serving"""
+    boot = BootGraph(started_at=STARTED)
+    boot.add('ui')
+    boot.add('database', openDatabase)
+    boot.add('contacts', loadContacts, after=['database'])
+    boot.add('apps', loadApps, after=['database'])
+    boot.add('tts', startSpeech)
+    boot.add('microphone', listener.warm_up)
+    # nice to have; started after the UI so they don't compete with its first paint
+    boot.add('start_sound', playAssistantSound, after=['ui'], ready=False)
+    boot.add('speech_cache', renderSpeechCache, after=['ui', 'tts', 'apps'], ready=False)
+    boot.add('stt_models', loadSttModels, after=['ui'], ready=False)
+    if PREWARM_ENABLED:
+        boot.add('prewarm', prewarmHandlers, after=['ui'], ready=False)
+    return boot
+
+
+def calibrationState():
+    # kept by the supervisor so a restarted UI doesn't recalibrate from scratch
+    recognizer = listener.recognizer
+    return {"energy_threshold": recognizer.energy_threshold} if recognizer is not None else {}
+
+
+def onWake(event):
+    # same as the Win+J path in www/main.js, minus the keypress
+    listener.expect_turn()
+    eel.onWakeWord()  # type: ignore
+    threading.Thread(target=playAssistantSound, name="jarvis-wake-sound", daemon=True).start()
+    allCommand()
+
  
-def start():
+def start(wake_channel=None, bus_name=None):
     eel.init('www')
+    # eel.start() below runs this thread's hub; blocking calls in exposed functions move off it
+    bridge.bind()
+
+    if bus_name is not None:
+        # listen on the shared capture process instead of opening the microphone here
+        from engine.audio_bus import AudioBus
+        listener.use_bus(AudioBus.attach(bus_name))
 
-    playAssistantSound()
+    if worker.attached:
+        # heartbeats come from the hub, so a hub stalled for too long counts as a hung UI
+        eel.spawn(worker.run, eel.sleep)
+        listener.restored_threshold = worker.warm_state.get("energy_threshold")
+        worker.keep_warm(calibrationState)
 
+    if wake_channel is not None:
+        from engine.wake_channel import listen_for_wake
+        eel.spawn(listen_for_wake, wake_channel, onWake, eel.sleep)
 
+    # database, indexes, TTS and microphone warm up on their own threads meanwhile
+    boot = bootGraph().start()
 
     os.system('start chrome.exe --app="http://localhost:8000"')
-    eel.start('index.html', mode=None, port=8000)  # You can change 'chrome-app' to your preferred browser
\ No newline at end of file
+    # runs on the hub once eel.start below has the server listening
+    eel.spawn(boot.complete, 'ui')
+    eel.start('index.html', mode=None, port=8000)  # You can change 'chrome-app' to your preferred browser
@@ -1,31 +1,54 @@
 import multiprocessing
+import sys
 # import subprocess
 
 # To run Jarvis
-def startJarvis():
+def startJarvis(wake_channel, bus_name):
         # Code for process 1
         print("Process 1 is running.")
         from main import start
-        start()
+        start(wake_channel, bus_name)
 
 # To run hotword
-def listenHotword():
+def listenHotword(wake_channel, bus_name):
         # Code for process 2
         print("Process 2 is running.")
-        from engine.features import hotword
-        hotword()
+        from engine.tracing import writer
+        writer.configure(role='hotword')
+        from engine.hotword import hotword
+        hotword(wake_channel, bus_name)
 
+# To capture the microphone for both of them
+def captureAudio(bus_name):
+        # Code for process 3
+        print("Process 3 is running.")
+        from engine.audio_bus import capture
+        capture(bus_name)
 
-    # Start both processes
+
+    # Start all processes
 if __name__ == '__main__':
-        p1 = multiprocessing.Process(target=startJarvis)
-        p2 = multiprocessing.Process(target=listenHotword)
-        p1.start()
-        p2.start()
-        p1.join()
+        if '--profile-startup' in sys.argv:
+            # per-module import times of each process's cold start, then exit
+            from engine.startup_profile import main as profile_startup
+            profile_startup([arg for arg in sys.argv[1:] if arg != '--profile-startup'])
+            sys.exit(0)
 
-        if p2.is_alive():
-            p2.terminate()
-            p2.join()
+        from engine.audio_bus import AudioBus
+        from engine.supervisor import Supervisor
 
-        print("system stop")
\ No newline at end of file
+        # hotword process -> UI process wake events
+        wake_channel = multiprocessing.Queue(maxsize=8)
+        # one microphone reader, shared with the others through shared memory
+        bus = AudioBus.create()
+        # the queue and the bus live here, so a restarted worker picks them up where the last one left off
+        supervisor = Supervisor()
+        supervisor.add('capture', captureAudio, args=(bus.name,))
+        # closing the window ends the UI process normally, and with it everything else
+        supervisor.add('ui', startJarvis, args=(wake_channel, bus.name), critical=True, heartbeat_timeout=30)
+        supervisor.add('hotword', listenHotword, args=(wake_channel, bus.name))
+        try:
+            supervisor.run()
+        finally:
+            bus.close()
+        print("system stop")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for engine/boot.py's stage graph
+Run with: python test_boot.py   (or pytest test_boot.py)
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('JARVIS_TRACE', '0')
+
+from engine.boot import FAILED, OK, SKIPPED, BootGraph
+
+
+def sleeper(seconds, log=None, name=None):
+    def run():
+        time.sleep(seconds)
+        if log is not None:
+            log.append(name)
+    return run
+
+
+def test_independent_stages_overlap():
+    boot = BootGraph()
+    for name in ("a", "b", "c"):
+        boot.add(name, sleeper(0.2))
+    started = time.perf_counter()
+    boot.start()
+    assert boot.wait(2)
+    # three 200 ms stages side by side, not 600 ms in a row
+    assert time.perf_counter() - started < 0.45
+    assert all(row["status"] == OK for row in boot.timeline())
+
+
+def test_dependencies_run_in_order():
+    log = []
+    boot = BootGraph()
+    boot.add("database", sleeper(0.05, log, "database"))
+    boot.add("contacts", sleeper(0.01, log, "contacts"), after=["database"])
+    boot.add("apps", sleeper(0.01, log, "apps"), after=["database"])
+    boot.start()
+    assert boot.wait(2)
+    assert log[0] == "database" and set(log[1:]) == {"contacts", "apps"}
+    rows = {row["stage"]: row for row in boot.timeline()}
+    assert rows["contacts"]["start_ms"] >= rows["database"]["end_ms"]
+
+
+def test_failure_skips_dependents_but_boot_still_gets_ready():
+    def broken():
+        raise OSError("no microphone")
+
+    boot = BootGraph()
+    boot.add("microphone", broken)
+    boot.add("calibration", sleeper(0), after=["microphone"])
+    boot.add("tts", sleeper(0.01))
+    boot.start()
+    assert boot.wait_ready(2)
+    rows = {row["stage"]: row for row in boot.timeline()}
+    assert rows["microphone"]["status"] == FAILED and "no microphone" in rows["microphone"]["error"]
+    assert rows["calibration"]["status"] == SKIPPED
+    assert rows["tts"]["status"] == OK
+
+
+def test_ready_waits_for_external_ui_but_not_background_stages():
+    release = threading.Event()
+    boot = BootGraph()
+    boot.add("ui")
+    boot.add("tts", sleeper(0.01))
+    boot.add("speech_cache", release.wait, after=["ui"], ready=False)
+    boot.start()
+    assert not boot.wait_ready(0.1), "ready before the UI was up"
+    boot.complete("ui")
+    assert boot.wait_ready(1)
+    assert boot.ready_ms is not None and boot.ready_wall is not None
+    # the background stage starts after the UI and doesn't hold up "ready"
+    assert not boot.wait(0.05)
+    release.set()
+    assert boot.wait(1)
+
+
+def test_unknown_dependency_is_rejected():
+    boot = BootGraph()
+    boot.add("contacts", sleeper(0), after=["databse"])
+    try:
+        boot.start()
+    except ValueError as e:
+        assert "databse" in str(e)
+    else:
+        raise AssertionError("typo in a dependency went unnoticed")
+
+
+if __name__ == "__main__":
+    tests = [test_independent_stages_overlap, test_dependencies_run_in_order,
+             test_failure_skips_dependents_but_boot_still_gets_ready,
+             test_ready_waits_for_external_ui_but_not_background_stages, test_unknown_dependency_is_rejected]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
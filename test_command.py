@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for engine/command.py's voice loop, with bench_pipeline.py's fakes for eel and pyttsx3
+Run with: python test_command.py   (or pytest test_command.py)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('JARVIS_TRACE', '0')
+
+from bench_pipeline import ActionLog, install_fakes
+
+install_fakes(types.SimpleNamespace(tts_latency=0.0, tts_cps=0), ActionLog())
+os.chdir(tempfile.mkdtemp(prefix="jarvis-command-"))
+
+from engine import command
+from engine.jobs import CANCELLED, jobs
+from engine.router import router
+
+JOB_SECONDS = 3.0
+started = threading.Event()
+
+
+@router.intent("slow_test_job", phrases=["slow test job"], priority=99, job=True, timeout=10)
+def slowTestJob(query):
+    # like the WhatsApp automation: seconds of waiting at cancellable checkpoints
+    started.set()
+    jobs.sleep(JOB_SECONDS)
+
+
+class ScriptedListener:
+    """listener stand-in: each listen() 'hears' the next scripted query and records when it was asked"""
+
+    def __init__(self, queries):
+        self.queries = list(queries)
+        self.listened_at = []
+
+    def listen(self, timeout, phrase_time_limit, on_listening=None, since=None):
+        self.listened_at.append(time.monotonic())
+        if self.queries and self.queries[0] == "cancel that":
+            # only once the job is really running, like someone saying it a moment later
+            started.wait(2)
+        return (self.queries.pop(0) if self.queries else ""), None
+
+    def recognize(self, audio, timings, recognize):
+        return types.SimpleNamespace(text=audio, backend="scripted", seconds=0.0)
+
+
+def run_voice_session(queries):
+    scripted = ScriptedListener(queries)
+    command.listener = scripted
+    try:
+        started.clear()
+        submitted = time.monotonic()
+        command.allCommand()
+        return scripted, submitted
+    finally:
+        from engine.listener import listener
+        command.listener = listener
+
+
+def test_running_job_does_not_delay_the_next_listen():
+    scripted, _ = run_voice_session(["slow test job", "stop listening"])
+    first, second = scripted.listened_at[:2]
+    print(f"  next turn listened {(second - first) * 1000:.0f} ms after the job was queued")
+    assert second - first < JOB_SECONDS / 3, "voice loop waited for the job"
+    assert jobs.wait_idle(JOB_SECONDS + 2)
+
+
+def test_cancel_is_heard_while_the_job_runs():
+    scripted, submitted = run_voice_session(["slow test job", "cancel that", "stop listening"])
+    job = next(j for j in reversed(jobs._recent) if j.name == "slow_test_job")
+    assert job.wait(2), "job kept running after 'cancel that'"
+    assert job.state == CANCELLED
+    assert job.finished_at is not None and time.monotonic() - submitted < JOB_SECONDS
+    assert len(scripted.listened_at) == 3
+
+
+if __name__ == "__main__":
+    tests = [test_running_job_does_not_delay_the_next_listen, test_cancel_is_heard_while_the_job_runs]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
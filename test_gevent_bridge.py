@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tests for engine/gevent_bridge.py
+Measures how late UI messages reach eel's hub while an exposed function runs
+a 5-second blocking handler, with and without the bridge.
+Run with: python test_gevent_bridge.py   (or pytest test_gevent_bridge.py)
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('JARVIS_TRACE', '0')
+
+from engine import tracing
+from engine.gevent_bridge import GeventBridge
+
+try:
+    import gevent
+except ImportError:
+    gevent = None
+
+HANDLER_SECONDS = 5.0
+MESSAGE_INTERVAL = 0.1
+# a message or hub tick later than this means the hub was blocked
+MAX_UI_DELAY = 0.25
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def ui_ticker(done, lateness, interval=0.02):
+    """Stands in for eel's websocket greenlet: wakes every interval and notes how late it was"""
+    while not done.is_set():
+        started = time.perf_counter()
+        gevent.sleep(interval)
+        lateness.append(time.perf_counter() - started - interval)
+
+
+def run_with_ui(bridge, handler):
+    """Run handler the way an exposed function would, with a UI greenlet alongside"""
+    done = threading.Event()
+    lateness = []
+    ticker = gevent.spawn(ui_ticker, done, lateness)
+    started = time.perf_counter()
+    call = gevent.spawn(bridge.run, handler)
+    call.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    ticker.join()
+    return call, elapsed, lateness
+
+
+def test_plain_call_when_not_bound():
+    bridge = GeventBridge()
+    caller = threading.get_ident()
+    assert bridge.run(threading.get_ident) == caller
+    seen = []
+    bridge.to_hub(seen.append, "shown")
+    assert seen == ["shown"]
+    assert bridge.offloaded == 0
+
+
+def test_ui_messages_keep_flowing_during_5s_blocking_handler():
+    if gevent is None:
+        print("  gevent not installed, skipped")
+        return
+    bridge = GeventBridge()
+    bridge.bind()
+    delays = []
+
+    def display_message(sent_at):
+        # runs on the hub, like eel.DisplayMessage reaching the websocket
+        delays.append(time.perf_counter() - sent_at)
+
+    def handler():
+        # blocking work (sqlite, HTTP, microphone) that reports progress to the UI as it goes
+        deadline = time.perf_counter() + HANDLER_SECONDS
+        while time.perf_counter() < deadline:
+            bridge.to_hub(display_message, time.perf_counter())
+            time.sleep(MESSAGE_INTERVAL)
+        return "done"
+
+    try:
+        call, elapsed, lateness = run_with_ui(bridge, handler)
+    finally:
+        bridge.unbind()
+    assert call.value == "done"
+    assert elapsed >= HANDLER_SECONDS
+    assert len(delays) >= HANDLER_SECONDS / MESSAGE_INTERVAL * 0.8, f"only {len(delays)} messages delivered"
+    print(f"  UI message delay over {len(delays)} messages: p50 {percentile(delays, 50) * 1000:.1f} ms, "
+          f"p99 {percentile(delays, 99) * 1000:.1f} ms, max {max(delays) * 1000:.1f} ms")
+    print(f"  hub tick lateness: max {max(lateness) * 1000:.1f} ms over {len(lateness)} ticks")
+    assert max(delays) < MAX_UI_DELAY
+    assert max(lateness) < MAX_UI_DELAY
+
+
+def test_unbridged_handler_stalls_the_hub():
+    if gevent is None:
+        print("  gevent not installed, skipped")
+        return
+    # the same kind of handler called straight on the hub (shorter, it's only the control)
+    blocking = 1.0
+    call, elapsed, lateness = run_with_ui(GeventBridge(), lambda: time.sleep(blocking))
+    print(f"  without the bridge: hub tick lateness max {max(lateness) * 1000:.0f} ms")
+    assert max(lateness) >= blocking * 0.9
+
+
+def test_errors_and_trace_turn_cross_the_thread():
+    if gevent is None:
+        print("  gevent not installed, skipped")
+        return
+    bridge = GeventBridge()
+    bridge.bind()
+    hub_thread = threading.get_ident()
+    seen = {}
+
+    def handler():
+        seen["thread"] = threading.get_ident()
+        seen["turn"] = tracing.current_turn()
+        bridge.to_hub(lambda: seen.setdefault("ui_thread", threading.get_ident()))
+        raise ValueError("no such contact")
+
+    def exposed():
+        turn = tracing.new_turn()
+        try:
+            bridge.run(handler)
+        except ValueError as e:
+            return turn, str(e)
+
+    try:
+        greenlet = gevent.spawn(exposed)
+        greenlet.join()
+        gevent.sleep(0.05)
+    finally:
+        bridge.unbind()
+    turn, error = greenlet.value
+    assert error == "no such contact"
+    assert seen["thread"] != hub_thread, "handler ran on the hub"
+    assert seen["turn"] == turn
+    assert seen["ui_thread"] == hub_thread, "UI call wasn't sent back to the hub"
+    assert bridge.offloaded == 1
+
+
+def test_ui_calls_from_threads_may_block_on_the_hub():
+    if gevent is None:
+        print("  gevent not installed, skipped")
+        return
+    bridge = GeventBridge()
+    bridge.bind()
+    sent = []
+
+    def send(text):
+        # like eel's websocket send waiting on a slow socket: it yields to the hub
+        gevent.sleep(0.01)
+        sent.append(text)
+
+    def handler():
+        bridge.to_hub(send, "Listening...")
+        bridge.to_hub(send, "Recognizing...")
+
+    try:
+        gevent.spawn(bridge.run, handler).join()
+        gevent.sleep(0.1)
+    finally:
+        bridge.unbind()
+    assert sent == ["Listening...", "Recognizing..."]
+
+
+if __name__ == "__main__":
+    tests = [test_plain_call_when_not_bound, test_ui_messages_keep_flowing_during_5s_blocking_handler,
+             test_unbridged_handler_stalls_the_hub, test_errors_and_trace_turn_cross_the_thread,
+             test_ui_calls_from_threads_may_block_on_the_hub]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
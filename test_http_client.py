@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for engine/http_client.py against a local stub HTTP server
+Run with: python test_http_client.py   (or pytest test_http_client.py)
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from engine.http_client import HTTPClient, base_url
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers /ok, /flaky (503 twice, then 200) and /slow (sleeps past the timeout)"""
+
+    protocol_version = 'HTTP/1.1'
+    client_ports = set()
+    flaky_calls = 0
+    posts = 0
+
+    def do_POST(self):
+        StubHandler.posts += 1
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.do_GET()
+
+    def do_GET(self):
+        StubHandler.client_ports.add(self.client_address[1])
+        if self.path.startswith('/flaky'):
+            StubHandler.flaky_calls += 1
+            status = 503 if StubHandler.flaky_calls <= 2 else 200
+        elif self.path.startswith('/slow'):
+            time.sleep(0.5)
+            status = 200
+        else:
+            status = 200
+
+        body = json.dumps({"path": self.path}).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client already gave up on a /slow request
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def make_client():
+    return HTTPClient(timeouts={'stub': (1, 0.2)}, backoff_base=0.01, backoff_cap=0.02)
+
+
+def test_keep_alive_reuses_connection():
+    server, url = start_stub_server()
+    try:
+        StubHandler.client_ports = set()
+        client = make_client()
+        for _ in range(5):
+            assert client.get(f"{url}/ok", provider='stub').status_code == 200
+        assert len(StubHandler.client_ports) == 1
+    finally:
+        server.shutdown()
+
+
+def test_retries_5xx_then_succeeds():
+    server, url = start_stub_server()
+    try:
+        StubHandler.flaky_calls = 0
+        client = make_client()
+        response = client.get(f"{url}/flaky", provider='stub')
+        assert response.status_code == 200
+        assert StubHandler.flaky_calls == 3
+        stats = client.latency_stats()[f"stub 127.0.0.1:{server.server_address[1]}/flaky"]
+        assert stats["count"] == 3 and stats["errors"] == 2
+    finally:
+        server.shutdown()
+
+
+def test_timeout_is_bounded():
+    server, url = start_stub_server()
+    try:
+        client = make_client()
+        start = time.perf_counter()
+        try:
+            client.get(f"{url}/slow", provider='stub')
+            raise AssertionError("expected a timeout")
+        except Exception as e:
+            assert "timed out" in str(e).lower() or "timeout" in type(e).__name__.lower()
+        # three attempts of 0.2 s plus tiny backoffs, never the full 0.5 s each
+        assert time.perf_counter() - start < 1.2
+    finally:
+        server.shutdown()
+
+
+def test_post_is_not_repeated_once_sent():
+    server, url = start_stub_server()
+    try:
+        StubHandler.posts = 0
+        StubHandler.flaky_calls = 0
+        client = make_client()
+        # a 503 or a read timeout may come after the server acted on the request
+        assert client.post(f"{url}/flaky", provider='stub', json={"to": "mom"}).status_code == 503
+        try:
+            client.post(f"{url}/slow", provider='stub', json={"to": "mom"})
+            raise AssertionError("expected a timeout")
+        except Exception as e:
+            assert "timeout" in type(e).__name__.lower()
+        assert StubHandler.posts == 2
+    finally:
+        server.shutdown()
+        server.server_close()
+    # nothing listening: the connection failed before anything was sent, so it is retried
+    calls = []
+    client = make_client()
+    send = client.session.request
+    client.session.request = lambda *args, **kwargs: calls.append(args) or send(*args, **kwargs)
+    try:
+        client.post(url, provider='stub', json={})
+        raise AssertionError("expected a connection error")
+    except Exception as e:
+        assert "connection" in type(e).__name__.lower()
+    assert len(calls) == 3
+
+
+def test_base_url_override():
+    os.environ['JARVIS_NEWSAPI_URL'] = 'http://127.0.0.1:9/'
+    try:
+        assert base_url('newsapi') == 'http://127.0.0.1:9'
+    finally:
+        del os.environ['JARVIS_NEWSAPI_URL']
+    assert base_url('newsapi') == 'https://newsapi.org'
+
+
+if __name__ == "__main__":
+    tests = [test_keep_alive_reuses_connection, test_retries_5xx_then_succeeds,
+             test_timeout_is_bounded, test_post_is_not_repeated_once_sent, test_base_url_override]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
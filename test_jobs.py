@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Tests for engine/jobs.py's scheduler
+Run with: python test_jobs.py   (or pytest test_jobs.py)
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('JARVIS_TRACE', '0')
+
+from engine import tracing
+from engine.jobs import (BACKGROUND, CANCELLED, DONE, FAILED, INTERACTIVE, QUEUED, TIMED_OUT, JobCancelled,
+                         JobScheduler)
+
+
+def test_interactive_jobs_run_before_background_ones():
+    scheduler = JobScheduler(workers=1)
+    release = threading.Event()
+    order = []
+    blocker = scheduler.submit(release.wait, name="blocker")
+    time.sleep(0.05)
+    # the only worker is busy: both wait in the queue
+    scheduler.submit(order.append, "refresh", priority=BACKGROUND)
+    scheduler.submit(order.append, "reply", priority=INTERACTIVE)
+    release.set()
+    assert scheduler.wait_idle(2)
+    assert blocker.state == DONE
+    assert order == ["reply", "refresh"]
+
+
+def test_pool_is_bounded():
+    scheduler = JobScheduler(workers=2)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    for _ in range(6):
+        scheduler.submit(work)
+    assert scheduler.wait_idle(2)
+    assert peak[0] == 2
+    assert scheduler.status()["workers"] == 2
+
+
+def test_cancel_queued_and_running_jobs():
+    scheduler = JobScheduler(workers=1)
+    ran = []
+
+    def automation():
+        # stands in for whatsApp(): wait for the page, then press keys
+        scheduler.sleep(5)
+        ran.append("pressed enter")
+
+    running = scheduler.submit(automation, name="whatsapp message")
+    queued = scheduler.submit(ran.append, "queued", name="queued")
+    time.sleep(0.05)
+    assert scheduler.cancel(queued.id)
+    started = time.perf_counter()
+    assert scheduler.cancel(running.id)
+    assert running.wait(1), "sleep didn't wake up on cancel"
+    assert time.perf_counter() - started < 0.5
+    assert scheduler.wait_idle(1)
+    assert running.state == CANCELLED and queued.state == CANCELLED
+    assert ran == []
+    assert not scheduler.cancel(running.id), "cancelling a finished job should report False"
+
+
+def test_cancellation_is_not_swallowed_by_broad_excepts():
+    scheduler = JobScheduler(workers=1)
+    fallbacks = []
+
+    def handler():
+        try:
+            scheduler.sleep(5)
+        except Exception:
+            fallbacks.append("fallback ran")
+
+    job = scheduler.submit(handler)
+    time.sleep(0.05)
+    scheduler.cancel(job.id)
+    assert job.wait(1)
+    assert fallbacks == [] and job.state == CANCELLED
+    assert issubclass(JobCancelled, BaseException) and not issubclass(JobCancelled, Exception)
+
+
+def test_timeout_frees_the_slot_for_the_next_job():
+    scheduler = JobScheduler(workers=1)
+    stuck = threading.Event()
+    finished = []
+    # ignores cancellation entirely, like a hung HTTP call
+    hung = scheduler.submit(stuck.wait, 5, name="hung", timeout=0.1, on_done=finished.append)
+    after = scheduler.submit(lambda: "answer", name="next")
+    assert after.wait(1), "next job starved behind a timed-out one"
+    assert hung.state == TIMED_OUT and "0.1" in str(hung.error)
+    assert after.state == DONE and after.result == "answer"
+    assert finished == [hung]
+    stuck.set()
+
+
+def test_stuck_workers_are_replaced_only_up_to_the_cap():
+    scheduler = JobScheduler(workers=1, max_stuck=2)
+    stuck = threading.Event()
+    hung = [scheduler.submit(stuck.wait, 5, name=f"hung {i}", timeout=0.05) for i in range(4)]
+    # two replacements, then the third hung job keeps the only slot it has
+    after = scheduler.submit(lambda: "answer", name="next")
+    time.sleep(0.5)
+    assert [job.state for job in hung] == [TIMED_OUT, TIMED_OUT, TIMED_OUT, QUEUED]
+    assert not after.finished
+    assert threading.active_count() < 20
+    stuck.set()
+    assert after.wait(1) and after.result == "answer"
+    assert scheduler.wait_idle(1)
+
+
+def test_cancel_never_marks_a_job_that_ran_as_cancelled():
+    scheduler = JobScheduler(workers=1)
+    ran = set()
+    submitted = []
+    for i in range(300):
+        # cancel races the worker picking the job up
+        job = scheduler.submit(ran.add, i, name=f"job {i}")
+        scheduler.cancel(job.id)
+        submitted.append(job)
+    assert scheduler.wait_idle(2)
+    for i, job in enumerate(submitted):
+        assert (job.state == DONE) == (i in ran), f"{job} ran={i in ran}"
+        assert job.state in (DONE, CANCELLED)
+
+
+def test_waiting_on_a_job_includes_its_on_done_report():
+    scheduler = JobScheduler(workers=1)
+    reported = []
+    job = scheduler.submit(lambda: "sunny", name="weather",
+                           on_done=lambda j: time.sleep(0.1) or reported.append(j.result))
+    assert job.wait(1)
+    assert reported == ["sunny"]
+
+
+def test_failures_are_reported_through_on_done():
+    scheduler = JobScheduler(workers=1)
+    reports = []
+
+    def broken():
+        raise RuntimeError("API down")
+
+    job = scheduler.submit(broken, name="weather", on_done=lambda j: reports.append((j.name, j.state)))
+    assert job.wait(1)
+    assert job.state == FAILED and "API down" in str(job.error)
+    assert reports == [("weather", FAILED)]
+
+
+def test_status_is_json_for_the_ui_and_keeps_the_trace_turn():
+    scheduler = JobScheduler(workers=1)
+    release = threading.Event()
+    turn = tracing.new_turn()
+    seen = []
+    running = scheduler.submit(lambda: seen.append(tracing.current_turn()) or release.wait(1), name="news")
+    queued = scheduler.submit(lambda: None, name="refresh newsapi", priority=BACKGROUND)
+    time.sleep(0.05)
+    status = json.loads(json.dumps(scheduler.status()))
+    assert status["running"] == 1 and status["queued"] == 1
+    assert [job["name"] for job in status["active"]] == ["news", "refresh newsapi"]
+    release.set()
+    assert scheduler.wait_idle(1)
+    assert seen == [turn]
+    recent = scheduler.status()["recent"]
+    assert {job["id"] for job in recent} == {running.id, queued.id}
+    assert all(job["state"] == DONE and job["run_ms"] is not None for job in recent)
+
+
+if __name__ == "__main__":
+    tests = [test_interactive_jobs_run_before_background_ones, test_pool_is_bounded,
+             test_cancel_queued_and_running_jobs, test_cancellation_is_not_swallowed_by_broad_excepts,
+             test_timeout_frees_the_slot_for_the_next_job, test_stuck_workers_are_replaced_only_up_to_the_cap,
+             test_cancel_never_marks_a_job_that_ran_as_cancelled, test_waiting_on_a_job_includes_its_on_done_report,
+             test_failures_are_reported_through_on_done,
+             test_status_is_json_for_the_ui_and_keeps_the_trace_turn]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for engine/phonetic.py's contact lookup
+Run with: python test_phonetic.py   (or pytest test_phonetic.py)
+"""
+
+import os
+import sqlite3
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from engine.phonetic import PHONETIC_SCHEMA, phonetic_key, phonetic_lookup
+
+
+def contacts_db(names, indexed=True):
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE contacts (id integer primary key, name VARCHAR(200), mobile_no VARCHAR(255), "
+                 "phonetic_key VARCHAR(200))")
+    if indexed:
+        conn.execute(PHONETIC_SCHEMA[1])
+    conn.executemany("INSERT INTO contacts (name, mobile_no, phonetic_key) VALUES (?, ?, ?)",
+                     [(name, f"98{i:08d}", phonetic_key(name)) for i, name in enumerate(names)])
+    return conn
+
+
+def test_exact_key_beats_an_earlier_prefix_match():
+    # the longer names were added first, so rowid order would put them ahead
+    names = ["Mitali Sharma", "Mitali Kapoor Singh", "Mitali"]
+    for indexed in (True, False):
+        matches = phonetic_lookup(contacts_db(names, indexed).cursor(), "meetali")
+        assert [name for name, _ in matches] == ["Mitali", "Mitali Sharma", "Mitali Kapoor Singh"], (indexed, matches)
+
+
+def test_exact_key_survives_the_limit():
+    names = [f"Aahan {surname}" for surname in ("Mehta", "Rao", "Jain", "Das", "Bose", "Roy")] + ["Ahan"]
+    matches = phonetic_lookup(contacts_db(names, indexed=False).cursor(), "aahan", limit=3)
+    assert matches[0][0] == "Ahan"
+    assert len(matches) == 3
+
+
+def test_no_match_for_other_keys():
+    assert phonetic_lookup(contacts_db(["Mitali", "Akshat"]).cursor(), "rohan") == []
+    assert phonetic_lookup(contacts_db(["Mitali"]).cursor(), "!!") == []
+
+
+if __name__ == "__main__":
+    tests = [test_exact_key_beats_an_earlier_prefix_match, test_exact_key_survives_the_limit,
+             test_no_match_for_other_keys]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
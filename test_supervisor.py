@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Tests for engine/supervisor.py with real worker processes
+Run with: python test_supervisor.py   (or pytest test_supervisor.py)
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from engine.audio_bus import AudioBus
+from engine.supervisor import BACKOFF, HEARTBEAT_INTERVAL, RUNNING, STOPPED, Supervisor, _worker_main, worker
+
+
+# worker targets; top-level so they can be pickled for the child process
+
+def crashOnFirstRun():
+    # like a hotword loop hitting a device error after it had detected a wake
+    if not worker.warm_state.get("last_wake"):
+        worker.report(last_wake=123.0)
+        worker.beat(force=True)
+        sys.exit(3)
+    while True:
+        worker.beat()
+        time.sleep(0.02)
+
+
+def hangAfterStarting():
+    worker.beat(force=True)
+    time.sleep(60)
+
+
+def crashImmediately():
+    sys.exit(2)
+
+
+def beatForever():
+    while True:
+        worker.beat()
+        time.sleep(0.02)
+
+
+def finishSoon():
+    worker.beat(force=True)
+    time.sleep(0.3)
+
+
+def readBusLikeHotword(bus_name):
+    # engine.hotword's bus loop without porcupine
+    reader = AudioBus.attach(bus_name).reader()
+    while True:
+        worker.beat()
+        reader.read(timeout=HEARTBEAT_INTERVAL)
+
+
+def burnCpuAndWatchStatus(seen):
+    reported = False
+    while True:
+        worker.beat()
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        if worker.workers and not reported:
+            seen.put([w["name"] for w in worker.workers])
+            reported = True
+
+
+def supervise(supervisor, until, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        supervisor.poll(0.05)
+        if until():
+            return True
+    return False
+
+
+def status_path():
+    return os.path.join(tempfile.mkdtemp(prefix="jarvis-supervisor-"), "status.json")
+
+
+def test_crashed_worker_is_back_within_seconds_with_its_warm_state():
+    supervisor = Supervisor(status_path=status_path(), backoff_initial=0.2)
+    hotword = supervisor.add('hotword', crashOnFirstRun)
+    supervisor.start()
+    try:
+        assert supervise(supervisor, lambda: hotword.restarts == 1, 10), "crash not noticed"
+        crashed_at = time.monotonic()
+        assert hotword.last_exit == 3 and "status 3" in hotword.last_failure
+        assert supervise(supervisor, lambda: hotword.state == RUNNING, 10), "not restarted"
+        downtime = time.monotonic() - crashed_at
+        print(f"  back up {downtime:.2f}s after the crash")
+        assert downtime < 3
+        # the restarted process only reaches its loop if it got last_wake back
+        assert hotword.warm_state == {"last_wake": 123.0}
+    finally:
+        supervisor.stop()
+
+
+def test_hung_worker_is_killed_and_restarted():
+    supervisor = Supervisor(status_path=status_path(), backoff_initial=0.1)
+    hung = supervisor.add('capture', hangAfterStarting, heartbeat_timeout=0.5)
+    supervisor.start()
+    try:
+        first_pid = hung.pid
+        assert supervise(supervisor, lambda: hung.restarts >= 1, 10), "hang not detected"
+        assert "no heartbeat" in hung.last_failure
+        assert supervise(supervisor, lambda: hung.state == RUNNING, 10)
+        assert hung.pid != first_pid
+    finally:
+        supervisor.stop()
+
+
+def test_hotword_waiting_on_a_bus_with_capture_down_is_not_hung():
+    # the capture process owns the writing end; with it down no frame ever arrives
+    bus = AudioBus.create()
+    supervisor = Supervisor(status_path=status_path(), backoff_initial=0.1)
+    hotword = supervisor.add('hotword', readBusLikeHotword, args=(bus.name,), heartbeat_timeout=HEARTBEAT_INTERVAL * 3)
+    supervisor.start()
+    try:
+        assert supervise(supervisor, lambda: hotword.state == RUNNING, 10)
+        supervise(supervisor, lambda: hotword.restarts > 0, HEARTBEAT_INTERVAL * 6)
+        assert hotword.restarts == 0, hotword.last_failure
+        assert hotword.state == RUNNING
+    finally:
+        supervisor.stop()
+        bus.close()
+
+
+def test_backoff_doubles_while_crash_looping():
+    supervisor = Supervisor(status_path=status_path(), backoff_initial=0.05, backoff_max=0.2)
+    broken = supervisor.add('stt', crashImmediately)
+    supervisor.start()
+    try:
+        delays = []
+
+        def record():
+            if broken.state == BACKOFF and (not delays or delays[-1][0] != broken.restarts):
+                delays.append((broken.restarts, broken.backoff))
+            return broken.restarts >= 4
+
+        assert supervise(supervisor, record, 10)
+        assert [delay for _, delay in delays[:4]] == [0.05, 0.1, 0.2, 0.2]
+    finally:
+        supervisor.stop()
+
+
+def test_clean_exit_of_critical_worker_stops_everything():
+    path = status_path()
+    supervisor = Supervisor(status_path=path)
+    ui = supervisor.add('ui', finishSoon, critical=True)
+    hotword = supervisor.add('hotword', beatForever)
+    started = time.monotonic()
+    supervisor.run()
+    assert time.monotonic() - started < 10
+    assert ui.state == STOPPED and ui.last_exit == 0 and ui.restarts == 0
+    assert hotword.state == STOPPED and hotword.process is None
+    with open(path, encoding='utf-8') as f:
+        snapshot = json.load(f)
+    assert [w["state"] for w in snapshot["workers"]] == [STOPPED, STOPPED]
+
+
+def test_status_has_cpu_rss_and_uptime_and_reaches_the_workers():
+    seen = multiprocessing.Queue()
+    supervisor = Supervisor(status_path=status_path(), status_interval=0.2)
+    supervisor.add('ui', burnCpuAndWatchStatus, args=(seen,))
+    supervisor.add('hotword', beatForever)
+    supervisor.start()
+    try:
+        ready = lambda: all(w["cpu_percent"] is not None and w["rss_mb"] for w in supervisor.status())
+        assert supervise(supervisor, ready, 10), supervisor.status()
+        ui, hotword = supervisor.status()
+        print(f"  ui: {ui['cpu_percent']}% cpu, {ui['rss_mb']} MB; hotword: {hotword['cpu_percent']}% cpu")
+        assert ui["cpu_percent"] > hotword["cpu_percent"]
+        assert ui["uptime_s"] >= 1 and ui["pid"] and ui["restarts"] == 0
+        assert seen.get(timeout=5) == ["ui", "hotword"]
+    finally:
+        supervisor.stop()
+
+
+def test_worker_exits_when_the_supervisor_is_gone():
+    # e.g. run.py killed outright: the hotword worker must not keep the microphone forever
+    parent_conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_worker_main, args=(child_conn, 'hotword', beatForever, (), {}, parent_conn))
+    process.start()
+    child_conn.close()
+    assert parent_conn.poll(5), "worker never beat"
+    parent_conn.close()
+    process.join(5)
+    alive = process.is_alive()
+    if alive:
+        process.kill()
+        process.join()
+    assert not alive, "orphaned worker kept running"
+    assert process.exitcode != 0
+
+
+if __name__ == "__main__":
+    tests = [test_crashed_worker_is_back_within_seconds_with_its_warm_state,
+             test_hung_worker_is_killed_and_restarted, test_hotword_waiting_on_a_bus_with_capture_down_is_not_hung,
+             test_backoff_doubles_while_crash_looping,
+             test_clean_exit_of_critical_worker_stops_everything,
+             test_status_has_cpu_rss_and_uptime_and_reaches_the_workers,
+             test_worker_exits_when_the_supervisor_is_gone]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
@@ -8,6 +8,13 @@ $(document).ready(function () {
         console.log("DisplayMessage called:", message); // debug
     }
 
+    eel.expose(onWakeWord);
+    function onWakeWord() {
+        // wake word arrived over the hotword channel; Python starts listening itself
+        $("#Oval").attr("hidden", true);
+        $("#SiriWave").attr("hidden", false);
+    }
+
     eel.expose(ShowHood);
     function ShowHood() {
         console.log("ShowHood called - returning to main screen");